@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Benchmark of maze generation: cell-by-cell generators (random module) against the
+vectorized NumPy generators, for every maze type and several sizes. The last column is
+the time to build a whole vectorized Maze, including its adjacency table and components.
+
+Run from the lab1_search directory:
+    python benchmarks/bench_maze_generation.py --sizes 100 500 1000 2000
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+import numpy as np
+from rich import print
+
+# Add the lab directory to the path so we can import vacuum_world
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from vacuum_world.world.maze import Maze, MazeType  # noqa: E402
+
+
+def time_generation(size: int, maze_type: MazeType, vectorized: bool, seed: int) -> float:
+    """Run only the generator of a maze and return the elapsed time in seconds.
+
+    The maze is set up by hand, so that building its adjacency table and component
+    labels (the same for both generators) is not part of the measurement.
+    """
+    random.seed(seed)
+    maze = Maze.__new__(Maze)
+    maze.width = maze.height = size
+    maze.maze_type = maze_type
+    maze.rng = np.random.default_rng(seed) if vectorized else None
+    maze.grid = bytearray(size * size)
+
+    start_time = time.perf_counter()
+    maze._generate_maze()
+    return time.perf_counter() - start_time
+
+
+def time_construction(size: int, maze_type: MazeType, seed: int) -> float:
+    """Build a whole vectorized Maze and return the elapsed time in seconds."""
+    start_time = time.perf_counter()
+    Maze(size, size, maze_type, rng=np.random.default_rng(seed))
+    return time.perf_counter() - start_time
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Maze generation benchmark")
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=[100, 500, 1000, 2000],
+        help="Maze sizes to benchmark (default: 100 500 1000 2000)",
+    )
+    parser.add_argument(
+        "--repeats", type=int, default=3, help="Runs per measurement, best is kept (default: 3)"
+    )
+    parser.add_argument(
+        "--python-max-size",
+        type=int,
+        default=1000,
+        help="Largest size for the cell-by-cell generators, which are slow (default: 1000)",
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Random seed (default: 0)")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_arguments()
+
+    print(
+        f"[bold]{'maze type':<12} {'size':>6} {'python (s)':>11} {'numpy (s)':>10} "
+        f"{'speedup':>8} {'whole maze (s)':>15}"
+    )
+    for maze_type in MazeType:
+        for size in args.sizes:
+            vectorized_time = min(
+                time_generation(size, maze_type, True, args.seed) for _ in range(args.repeats)
+            )
+            construction_time = min(
+                time_construction(size, maze_type, args.seed) for _ in range(args.repeats)
+            )
+
+            if size <= args.python_max_size:
+                python_time = min(
+                    time_generation(size, maze_type, False, args.seed)
+                    for _ in range(args.repeats)
+                )
+                python_column = f"{python_time:11.3f}"
+                speedup_column = f"{python_time / vectorized_time:7.0f}x"
+            else:
+                python_column = f"{'-':>11}"
+                speedup_column = f"{'-':>8}"
+
+            print(
+                f"{maze_type.value:<12} {size:>6} {python_column} {vectorized_time:10.3f} "
+                f"{speedup_column} {construction_time:15.3f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Regression benchmark of the search algorithms over a fixed corpus of seeded mazes.
+
+Every maze type is generated at several sizes from fixed seeds, and every maze gets a
+few fixed start/goal pairs drawn from one connected component. For each algorithm the
+benchmark measures the wall time (best of several runs), the number of expanded nodes,
+the peak frontier size and the peak memory allocated during the search.
+
+Save a baseline, then compare later runs against it. The comparison fails (exit code 1)
+when a total grows by more than the threshold, or when a path length changes:
+    python benchmarks/bench_search.py --save-baseline benchmarks/baseline.json
+    python benchmarks/bench_search.py --baseline benchmarks/baseline.json --threshold 0.2
+
+Run from the lab1_search directory.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from rich import print
+
+# Add the repository root to the path so we can import lab1_search
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from lab1_search.vacuum_world.world.world import World  # noqa: E402
+from lab1_search.vacuum_world.world.maze import MazeType  # noqa: E402
+from lab1_search.vacuum_world.search.problem import SearchProblem  # noqa: E402
+from lab1_search.vacuum_world.search.breadth_first_search import BreadthFirstSearch  # noqa: E402
+from lab1_search.vacuum_world.search.depth_first_search import DepthFirstSearch  # noqa: E402
+from lab1_search.vacuum_world.search.a_star_search import AStarSearch  # noqa: E402
+
+ALGORITHMS = {
+    "bfs": BreadthFirstSearch,
+    "dfs": DepthFirstSearch,
+    "astar": AStarSearch,
+}
+
+# Totals compared against the baseline, and how they are aggregated over the corpus
+METRICS = {
+    "time_ms": sum,
+    "expanded_nodes": sum,
+    "peak_frontier": max,
+    "peak_memory_kb": max,
+}
+
+
+def build_corpus(sizes, seed: int, pairs: int) -> list:
+    """Generate the mazes of the corpus and their start/goal pairs.
+
+    Returns:
+        List of (name, world, start, goal) cases
+    """
+    corpus = []
+    for maze_type in MazeType:
+        for size in sizes:
+            world = World(size, size, num_dirt=0, maze_type=maze_type, seed=seed)
+            maze = world.maze
+
+            # Pairs are drawn from the largest component, so that every search succeeds
+            free_indices = maze.get_free_indices()
+            labels = [maze.component_of(int(index)) for index in free_indices]
+            largest = max(set(labels), key=labels.count)
+            cells = [int(index) for index, label in zip(free_indices, labels) if label == largest]
+
+            pair_random = random.Random(seed)
+            for pair in range(pairs):
+                start, goal = pair_random.sample(cells, 2)
+                name = f"{maze_type.value}-{size}-{pair}"
+                corpus.append((name, world, maze.position_of(start), maze.position_of(goal)))
+    return corpus
+
+
+def measure(algorithm: str, world: World, start, goal, repeats: int) -> dict:
+    """Run one search of the corpus and return its measurements."""
+    search_class = ALGORITHMS[algorithm]
+
+    # Counting run: expansions, frontier size and path length are deterministic
+    metrics = search_class().run(SearchProblem(world, start, goal))
+
+    best_time = float("inf")
+    for _ in range(repeats):
+        search = search_class()
+        problem = SearchProblem(world, start, goal)
+        start_time = time.perf_counter()
+        search.search(problem)
+        best_time = min(best_time, time.perf_counter() - start_time)
+
+    # Memory run, separate since tracing allocations slows the search down
+    search = search_class()
+    tracemalloc.start()
+    search.search(SearchProblem(world, start, goal))
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "time_ms": best_time * 1000,
+        "expanded_nodes": metrics.generated,
+        "peak_frontier": metrics.peak_frontier,
+        "peak_memory_kb": peak_memory / 1024,
+        "path_length": metrics.path_length,
+    }
+
+
+def run_benchmark(args) -> dict:
+    corpus = build_corpus(args.sizes, args.seed, args.pairs)
+    results = {}
+
+    for algorithm in args.search:
+        cases = {}
+        for name, world, start, goal in corpus:
+            cases[name] = measure(algorithm, world, start, goal, args.repeats)
+        totals = {
+            metric: aggregate(case[metric] for case in cases.values())
+            for metric, aggregate in METRICS.items()
+        }
+        results[algorithm] = {"totals": totals, "cases": cases}
+
+    return {
+        "corpus": {"sizes": args.sizes, "seed": args.seed, "pairs": args.pairs},
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": results,
+    }
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list:
+    """Compare a benchmark run against a baseline.
+
+    Returns:
+        Descriptions of the regressions, empty if there is none
+    """
+    regressions = []
+    for algorithm, result in current["results"].items():
+        if algorithm not in baseline["results"]:
+            continue
+        base_result = baseline["results"][algorithm]
+
+        for metric in METRICS:
+            value = result["totals"][metric]
+            base_value = base_result["totals"][metric]
+            if value > base_value * (1 + threshold):
+                change = (value / base_value - 1) * 100 if base_value else float("inf")
+                regressions.append(
+                    f"{algorithm}: {metric} {base_value:.1f} -> {value:.1f} (+{change:.0f}%)"
+                )
+
+        for name, case in result["cases"].items():
+            base_case = base_result["cases"].get(name)
+            if base_case and case["path_length"] != base_case["path_length"]:
+                regressions.append(
+                    f"{algorithm}: path length of {name} "
+                    f"{base_case['path_length']} -> {case['path_length']}"
+                )
+    return regressions
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Search algorithm regression benchmark")
+    parser.add_argument(
+        "--search",
+        choices=list(ALGORITHMS),
+        nargs="+",
+        default=list(ALGORITHMS),
+        help="Algorithms to benchmark (default: all)",
+    )
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=[15, 25, 35],
+        help="Maze sizes of the corpus (default: 15 25 35)",
+    )
+    parser.add_argument(
+        "--pairs", type=int, default=3, help="Start/goal pairs per maze (default: 3)"
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the corpus (default: 0)")
+    parser.add_argument(
+        "--repeats", type=int, default=3, help="Timed runs per search, best is kept (default: 3)"
+    )
+    parser.add_argument(
+        "--baseline", default=None, metavar="FILE", help="Baseline JSON to compare against"
+    )
+    parser.add_argument(
+        "--save-baseline", default=None, metavar="FILE", help="Write the results as a baseline"
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.25,
+        help="Allowed relative growth of a total before failing (default: 0.25)",
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_arguments()
+
+    baseline = None
+    if args.baseline is not None:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        # Compare on the corpus of the baseline
+        args.sizes = baseline["corpus"]["sizes"]
+        args.seed = baseline["corpus"]["seed"]
+        args.pairs = baseline["corpus"]["pairs"]
+
+    current = run_benchmark(args)
+
+    print(
+        f"[bold]{'algorithm':<10} {'time (ms)':>10} {'expanded':>10} "
+        f"{'peak frontier':>14} {'peak memory (KB)':>17}"
+    )
+    for algorithm, result in current["results"].items():
+        totals = result["totals"]
+        print(
+            f"{algorithm:<10} {totals['time_ms']:10.1f} {totals['expanded_nodes']:10d} "
+            f"{totals['peak_frontier']:14d} {totals['peak_memory_kb']:17.1f}"
+        )
+
+    if args.save_baseline is not None:
+        with open(args.save_baseline, "w") as file:
+            json.dump(current, file, indent=2)
+        print(f"Baseline saved to {args.save_baseline}")
+
+    if baseline is not None:
+        if (baseline["python"], baseline["machine"]) != (current["python"], current["machine"]):
+            print(
+                f"[yellow]Warning: the baseline was recorded with Python {baseline['python']} "
+                f"on {baseline['machine']}, times may not be comparable"
+            )
+
+        regressions = compare(current, baseline, args.threshold)
+        if regressions:
+            print(f"[bold red]{len(regressions)} regression(s) above {args.threshold:.0%}:")
+            for regression in regressions:
+                print(f"[red]  {regression}")
+            sys.exit(1)
+        print(f"[bold green]No regression above {args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+"""
+Tour planning: choosing the order in which the agent visits all the dirt.
+
+Distances are true shortest-path distances through the maze (not straight-line ones),
+taken from wavefront distance fields. Small tours are solved exactly with Held-Karp,
+larger ones with nearest neighbour followed by 2-opt and Or-opt improvements.
+"""
+
+from typing import List, Optional
+import numpy as np
+from ..world.maze import Maze
+from ..search.distance_cache import DistanceFieldCache
+from ..search.wavefront_search import UNREACHED, compute_distance_field
+
+# Largest number of dirt particles solved exactly with Held-Karp
+HELD_KARP_LIMIT = 10
+
+
+def compute_distance_matrix(
+    maze: Maze, cells: List[int], cache: Optional[DistanceFieldCache] = None
+) -> np.ndarray:
+    """Compute the pairwise shortest-path distances between maze cells.
+
+    Args:
+        maze: The maze to measure distances in
+        cells: Cell indices of the points
+        cache: Optional distance field cache to read fields from and fill
+
+    Returns:
+        (n, n) float array of distances, inf between disconnected cells
+    """
+    matrix = np.empty((len(cells), len(cells)), dtype=np.float64)
+    targets = np.array(cells, dtype=np.int64)
+
+    for row, cell in enumerate(cells):
+        if cache is not None:
+            field, _ = cache.get_field(maze, cell)
+        else:
+            field = compute_distance_field(maze, cell)
+        distances = field.reshape(-1)[targets].astype(np.float64)
+        distances[distances == UNREACHED] = np.inf
+        matrix[row] = distances
+
+    return matrix
+
+
+def path_length(distances: np.ndarray, order: List[int]) -> float:
+    """Length of an open path visiting the points in the given order."""
+    return float(sum(distances[a, b] for a, b in zip(order, order[1:])))
+
+
+def solve_held_karp(distances: np.ndarray) -> List[int]:
+    """Exact shortest open path starting at point 0 and visiting every point once.
+
+    Args:
+        distances: (n, n) distance matrix, point 0 being the start
+
+    Returns:
+        Visiting order, starting with 0
+    """
+    n = len(distances) - 1
+    if n <= 0:
+        return [0]
+
+    # dp[mask, j]: shortest path from the start through the points of mask, ending at j
+    costs = distances[1:, 1:]
+    dp = np.full((1 << n, n), np.inf)
+    parent = np.full((1 << n, n), -1, dtype=np.int64)
+    for j in range(n):
+        dp[1 << j, j] = distances[0, j + 1]
+
+    bits = 1 << np.arange(n)
+    for mask in range(1, 1 << n):
+        row = dp[mask]
+        if not np.isfinite(row).any():
+            continue
+        # candidates[j, k]: end at j, then go to k
+        candidates = row[:, None] + costs
+        best_from = candidates.argmin(axis=0)
+        best = candidates[best_from, np.arange(n)]
+        for k in np.flatnonzero((mask & bits) == 0):
+            next_mask = mask | (1 << k)
+            if best[k] < dp[next_mask, k]:
+                dp[next_mask, k] = best[k]
+                parent[next_mask, k] = best_from[k]
+
+    full = (1 << n) - 1
+    last = int(dp[full].argmin())
+    order = []
+    mask = full
+    while last != -1:
+        order.append(last + 1)
+        previous = int(parent[mask, last])
+        mask ^= 1 << last
+        last = previous
+    order.append(0)
+    order.reverse()
+    return order
+
+
+def solve_nearest_neighbour(distances: np.ndarray) -> List[int]:
+    """Greedy open path from point 0, always going to the closest unvisited point."""
+    unvisited = set(range(1, len(distances)))
+    order = [0]
+
+    while unvisited:
+        current = order[-1]
+        nearest = min(unvisited, key=lambda point: (distances[current, point], point))
+        unvisited.remove(nearest)
+        order.append(nearest)
+
+    return order
+
+
+def improve_two_opt(distances: np.ndarray, order: List[int]) -> List[int]:
+    """Reverse segments of an open path (keeping the start fixed) while it gets shorter."""
+    order = list(order)
+    distances = distances.tolist()
+    improved = True
+
+    while improved:
+        improved = False
+        for i in range(1, len(order) - 1):
+            for j in range(i + 1, len(order)):
+                a, b, c = order[i - 1], order[i], order[j]
+                before = distances[a][b]
+                after = distances[a][c]
+                if j + 1 < len(order):
+                    d = order[j + 1]
+                    before += distances[c][d]
+                    after += distances[b][d]
+                if after < before - 1e-9:
+                    order[i:j + 1] = reversed(order[i:j + 1])
+                    improved = True
+
+    return order
+
+
+def improve_or_opt(distances: np.ndarray, order: List[int], max_segment: int = 3) -> List[int]:
+    """Move short segments of an open path elsewhere, possibly reversed (keeping the start
+    fixed), while it gets shorter."""
+    order = list(order)
+    distances = distances.tolist()
+    improved = True
+
+    while improved:
+        improved = False
+        for length in range(1, max_segment + 1):
+            for i in range(1, len(order) - length + 1):
+                first, last = order[i], order[i + length - 1]
+                before = order[i - 1]
+                after = order[i + length] if i + length < len(order) else None
+
+                removal_gain = distances[before][first]
+                if after is not None:
+                    removal_gain += distances[last][after] - distances[before][after]
+
+                rest = order[:i] + order[i + length:]
+                for position in range(1, len(rest) + 1):
+                    if position == i:
+                        continue
+                    u = rest[position - 1]
+                    v = rest[position] if position < len(rest) else None
+                    for head, tail, reverse in ((first, last, False), (last, first, True)):
+                        insertion_cost = distances[u][head]
+                        if v is not None:
+                            insertion_cost += distances[tail][v] - distances[u][v]
+                        if insertion_cost < removal_gain - 1e-9:
+                            segment = order[i:i + length]
+                            if reverse:
+                                segment.reverse()
+                            order = rest[:position] + segment + rest[position:]
+                            improved = True
+                            break
+                    if improved:
+                        break
+                if improved:
+                    break
+            if improved:
+                break
+
+    return order
+
+
+def plan_tour(distances: np.ndarray, exact_limit: int = HELD_KARP_LIMIT) -> List[int]:
+    """Choose a visiting order for all points, starting at point 0.
+
+    Unreachable points are left out of the optimization and appended at the end.
+
+    Args:
+        distances: (n, n) distance matrix, point 0 being the start
+        exact_limit: Largest number of points (besides the start) solved exactly
+
+    Returns:
+        Visiting order, starting with 0
+    """
+    reachable = [0] + [p for p in range(1, len(distances)) if np.isfinite(distances[0, p])]
+    unreachable = [p for p in range(1, len(distances)) if not np.isfinite(distances[0, p])]
+    sub_distances = distances[np.ix_(reachable, reachable)]
+
+    if len(reachable) - 1 <= exact_limit:
+        sub_order = solve_held_karp(sub_distances)
+    else:
+        sub_order = solve_nearest_neighbour(sub_distances)
+        sub_order = improve_two_opt(sub_distances, sub_order)
+        sub_order = improve_or_opt(sub_distances, sub_order)
+
+    return [reachable[p] for p in sub_order] + unreachable
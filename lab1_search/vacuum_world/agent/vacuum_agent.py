@@ -2,22 +2,41 @@
 Intelligent vacuum agent that uses search algorithms to clean dirt.
 """
 
+import math
 import time
-from typing import List, Optional
+from typing import List, Optional, Set, Tuple
 from enum import Enum
-from rich import print
+from ..events import Level, emit
 from ..world.world import World, Action
 from ..world.grid_pos import GridPos
+from ..world.dirt import Dirt
 from ..search.search_node import SearchNode
-from ..search.problem import SearchProblem
+from ..search.problem import NearestDirtProblem, SearchProblem
+from ..search.metrics import SearchHooks, SearchMetrics
 from ..search.breadth_first_search import BreadthFirstSearch
 from ..search.depth_first_search import DepthFirstSearch
 from ..search.a_star_search import AStarSearch
+from ..search.bucket_a_star_search import BucketAStarSearch
 from ..search.random_search import RandomSearch
-
-
-def agent_print(message: str):
-    print(f"[bold cyan]Agent:[/bold cyan] {message}")
+from ..search.jump_point_search import JumpPointSearch
+from ..search.bidirectional_search import (
+    BidirectionalAStarSearch,
+    BidirectionalBreadthFirstSearch,
+)
+from ..search.distance_cache import DistanceFieldCache, DistanceFieldSearch
+from ..search.d_star_lite import DStarLiteSearch
+from ..search.hierarchical_search import HierarchicalSearch
+from .tour_planner import compute_distance_matrix, path_length, plan_tour
+from ..search.pooled_search import (
+    PooledAStarSearch,
+    PooledBreadthFirstSearch,
+    PooledDepthFirstSearch,
+)
+from ..search.wavefront_search import WavefrontSearch
+
+
+def agent_print(message: str, level: Level = Level.INFO, **fields):
+    emit("Agent", message, level, **fields)
 
 
 class SearchMethod(Enum):
@@ -25,6 +44,17 @@ class SearchMethod(Enum):
     DEPTH_FIRST_SEARCH = "dfs"
     A_STAR_SEARCH = "astar"
     RANDOM_SEARCH = "random"
+    POOLED_BREADTH_FIRST_SEARCH = "bfs-pool"
+    POOLED_DEPTH_FIRST_SEARCH = "dfs-pool"
+    POOLED_A_STAR_SEARCH = "astar-pool"
+    WAVEFRONT_BREADTH_FIRST_SEARCH = "wavefront"
+    BUCKET_A_STAR_SEARCH = "astar-bucket"
+    JUMP_POINT_SEARCH = "jps"
+    BIDIRECTIONAL_BREADTH_FIRST_SEARCH = "bibfs"
+    BIDIRECTIONAL_A_STAR_SEARCH = "biastar"
+    CACHED_DISTANCE_FIELD = "cached"
+    D_STAR_LITE = "dstar"
+    HIERARCHICAL_A_STAR = "hpa"
 
 
 class IntelligentVacuumAgent:
@@ -35,10 +65,43 @@ class IntelligentVacuumAgent:
         self.current_path: List[SearchNode] = []
         self.current_path_index = 0
         self.max_depth = 1000000
+        # Goal distance fields reused across plans by SearchMethod.CACHED_DISTANCE_FIELD
+        self.distance_cache = DistanceFieldCache()
+        # When enabled, dirt is visited in the order of a tour planned over path distances
+        self.use_tour = False
+        self.tour: List[Dirt] = []
+        # When enabled, one search finds the dirt nearest by path distance and the path to it
+        self.use_nearest = False
+        # State of the world when the last nearest-dirt search found nothing
+        self.nearest_failed_at: Optional[Tuple[int, int]] = None
+        self.planning_time_ms = 0.0
+        # Totals over all plans, for reporting (see batch.py and the GUI)
+        self.metrics = SearchMetrics()
+        self.last_metrics: Optional[SearchMetrics] = None
+        self.path_lengths: List[int] = []
+        # Callbacks installed on every search problem
+        self.search_hooks: Optional[SearchHooks] = None
+        # Kept across plans, so that SearchMethod.D_STAR_LITE can repair its last search
+        self.d_star_lite = DStarLiteSearch()
+        # Kept across plans, so that SearchMethod.HIERARCHICAL_A_STAR reuses its cluster graph
+        self.hierarchical_search = HierarchicalSearch()
+        # Maze version the current path was planned on, to replan when walls change
+        self.plan_version = world.maze.version
+        # Targets no path was found to, skipped until the maze changes. Component labels
+        # already rule out most of them, this covers mazes without labels (TiledMaze).
+        self.unreachable_targets: Set[GridPos] = set()
+        self.unreachable_version = world.maze.version
 
     def set_search_method(self, method: SearchMethod):
         self.search_method = method
 
+    def set_tour_planning(self, enabled: bool):
+        self.use_tour = enabled
+        self.tour = []
+
+    def set_nearest_planning(self, enabled: bool):
+        self.use_nearest = enabled
+
     def step(self, real_world: World):
         if real_world.is_terminated():
             return
@@ -68,24 +131,49 @@ class IntelligentVacuumAgent:
                 return Action.SUCK_DIRT
 
         # Do we need to select a new target dirt?
-        target = self.select_target(self.target)
+        nearest_path = None
+        if self.use_nearest and self.target is None:
+            target, nearest_path = self.plan_to_nearest_dirt()
+        else:
+            target = self.select_target(self.target)
         if target is None:
-            agent_print("No more dirt, the maze is shining clean!")
+            if not self.world.is_terminated():
+                agent_print("The remaining dirt cannot be reached!", Level.WARNING)
+            else:
+                agent_print("No more dirt, the maze is shining clean!")
             return Action.NO_OPERATION
         elif target != self.target:
             self.target = target
             self.reset_plan()
+            if nearest_path:
+                self.current_path = nearest_path
+
+        # Did the maze change since the path was planned?
+        if self.current_path and self.plan_version != self.world.maze.version:
+            agent_print("maze changed, replanning")
+            self.reset_plan()
+
+        # Was the path only the first part of the plan (see HierarchicalSearch)?
+        continues_path = bool(self.current_path) and self.current_path_index >= len(
+            self.current_path
+        )
+        if continues_path:
+            self.reset_plan()
 
         # Do we need to plan a path?
         if not self.current_path:
             if self.target is not None:
                 path = self.plan_to_target(self.target, self.world)
                 self.current_path = path
-                self.current_path_index = 0
+                # The new path starts where the agent already stands, skip that node
+                self.current_path_index = 1 if continues_path else 0
 
         # If we still have no path, then path planning failed (check if the target was unreachable?)
         if not self.current_path:
-            agent_print("No path found!")
+            agent_print("No path found!", Level.WARNING)
+            if self.target is not None:
+                self.unreachable_targets.add(self.target)
+                self.target = None
             return Action.NO_OPERATION
         else:
             # Follow the plan
@@ -111,42 +199,100 @@ class IntelligentVacuumAgent:
         elif action == Action.GO_WEST:
             world.move_agent(Action.GO_WEST)
         elif action == Action.NO_OPERATION:
-            agent_print("NO-OP Action")
+            agent_print("NO-OP Action", Level.DEBUG)
         else:
-            agent_print(f"Unknown Action: {action}")
+            agent_print(f"Unknown Action: {action}", Level.WARNING)
 
     def select_target(self, last_target: Optional[GridPos]) -> Optional[GridPos]:
         """Select the closest dirt particle as target.
 
+        Dirt outside the agent's connected component is skipped, since no path leads there.
+
         Args:
             last_target: The previous target (None to select new)
 
         Returns:
-            Selected target or None if no dirt available
+            Selected target or None if no reachable dirt is available
         """
-        uncleaned_dirt = self.world.get_all_uncleaned_dirt()
-
-        if len(uncleaned_dirt) == 0:
+        if self.world.is_terminated():
             return None
 
         if last_target is None:
             if not self.world.agent:
-                return uncleaned_dirt[0]
+                return next(self.world.iter_uncleaned_dirt())
 
-            agent_pos = GridPos(self.world.agent.x, self.world.agent.y)
-            best_dist = float("inf")
-            target = None
+            if self.use_tour:
+                return self.next_tour_target()
 
-            for dirt in uncleaned_dirt:
-                dist = agent_pos.distance_euclidean(dirt)
-                if dist < best_dist:
-                    best_dist = dist
-                    target = dirt
+            # Closest reachable dirt, found through the world's spatial index of the dirt
+            agent_pos = GridPos(self.world.agent.x, self.world.agent.y)
+            for dirt in self.world.iter_nearest_dirt(agent_pos):
+                if self.is_reachable(dirt):
+                    return dirt
 
-            return target
+            return None
         else:
             return last_target
 
+    def is_reachable(self, target: GridPos) -> bool:
+        """Check whether a path may lead from the agent to a target.
+
+        Returns:
+            False if the target is in another connected component, or if no path to it was
+            found since the maze last changed
+        """
+        maze = self.world.maze
+        if self.unreachable_version != maze.version:
+            self.unreachable_targets.clear()
+            self.unreachable_version = maze.version
+        return target not in self.unreachable_targets and maze.same_component(
+            self.world.agent, target
+        )
+
+    def next_tour_target(self) -> Optional[Dirt]:
+        """Get the next uncleaned dirt of the tour, planning a new tour if needed.
+
+        Returns:
+            The next dirt to visit, or None if there is no reachable dirt left
+        """
+        while self.tour and (self.tour[0].is_cleaned() or not self.is_reachable(self.tour[0])):
+            self.tour.pop(0)
+
+        if not self.tour:
+            self.plan_dirt_tour()
+            # Unreachable dirt is at the end of the tour, stop the tour before it
+            self.tour = [d for d in self.tour if self.is_reachable(d)]
+
+        return self.tour[0] if self.tour else None
+
+    def plan_dirt_tour(self):
+        """Plan the order in which to visit all uncleaned dirt.
+
+        The pairwise shortest-path distances between the agent and the dirt are computed
+        from distance fields (stored in the agent's distance cache, so later plans to the
+        dirt can reuse them), then the visiting order is solved by plan_tour.
+        """
+        start_time = time.perf_counter_ns()
+
+        dirt = self.world.get_all_uncleaned_dirt()
+        maze = self.world.maze
+        cells = [maze.index_of(self.world.agent)] + [maze.index_of(d) for d in dirt]
+
+        distances = compute_distance_matrix(maze, cells, self.distance_cache)
+        order = plan_tour(distances)
+        self.tour = [dirt[point - 1] for point in order[1:]]
+        reachable = [point for point in order if math.isfinite(distances[0, point])]
+
+        elapsed_time = (time.perf_counter_ns() - start_time) / 1e6
+        self.planning_time_ms += elapsed_time
+        agent_print(
+            f"planned a tour over {len(dirt)} dirt particles in {elapsed_time:.1f} msec, "
+            f"TourLength: {path_length(distances, reachable):.0f}, "
+            f"Unreachable: {len(order) - len(reachable)}",
+            elapsed_ms=elapsed_time,
+            num_dirt=len(dirt),
+        )
+
     def step_to_target(self, path: List[SearchNode], world: World) -> Action:
         """Make one step towards the target following the path.
 
@@ -158,7 +304,7 @@ class IntelligentVacuumAgent:
             The action to take
         """
         if not path:
-            agent_print("NO PATH FOUND!")
+            agent_print("NO PATH FOUND!", Level.WARNING)
             return Action.NO_OPERATION
 
         if self.current_path_index >= len(path):
@@ -200,34 +346,84 @@ class IntelligentVacuumAgent:
         if not world.agent:
             return []
 
-        start = GridPos(world.agent.x, world.agent.y)
+        start = world.maze.get_position(world.agent.x, world.agent.y)
         goal = dest
 
         if start is None or goal is None:
             return []
 
-        agent_print(f"planning from {start} to {goal}")
+        agent_print(
+            f"planning from {start} to {goal}", start=(start.x, start.y), goal=(goal.x, goal.y)
+        )
+        self.plan_version = world.maze.version
 
         search_result = self.search_plan(world, start, goal, self.search_method, True)
+        return self.show_search_result(search_result, world)
 
+    def show_search_result(self, search_result, world: World) -> List[SearchNode]:
+        """Record the path of a search and mark it and the expanded nodes in the world.
+
+        Returns:
+            The path of the search, empty if it failed
+        """
         if search_result:
             path = search_result.get_path()
+            # A path continuing the previous plan was already counted with it
+            if not search_result.continues_plan:
+                self.path_lengths.append(search_result.get_plan_length())
 
             # Update path graphics in world
             if path:
                 path_positions = [node.get_state() for node in path]
                 world.mark_current_path(path_positions)
 
-            # Update explored state graphics in world
-            expanded_positions = [
-                node.get_state() for node in search_result.get_all_expanded_nodes()
-            ]
-            world.mark_expanded_nodes(expanded_positions)
+            # Update explored state graphics in world, building the nodes only if shown
+            if world.observers:
+                expanded_positions = [
+                    node.get_state() for node in search_result.get_all_expanded_nodes()
+                ]
+                world.mark_expanded_nodes(expanded_positions)
 
             return path
 
         return []
 
+    def plan_to_nearest_dirt(self) -> Tuple[Optional[Dirt], List[SearchNode]]:
+        """Find the dirt nearest by path distance, and the path to it, in one search.
+
+        A breadth-first search on a NearestDirtProblem stops at the first uncleaned dirt it
+        generates, which is the closest one along the maze (unlike the straight-line
+        closest dirt of select_target). The node-pool BFS is used whatever the search
+        method, since the goal-directed searches need a single goal; its pool grows with
+        the nodes it generates and it reuses the maze's visited marks, so a nearby dirt
+        costs only the few cells around the agent, not the whole maze.
+
+        Returns:
+            The dirt and the path to it, or (None, []) if no dirt can be reached
+        """
+        world = self.world
+        if not world.agent:
+            return None, []
+
+        # Nothing changed since the last search found no dirt, it would find none again
+        state = (world.maze.version, world.num_uncleaned_dirt())
+        if state == self.nearest_failed_at:
+            return None, []
+
+        start = world.maze.get_position(world.agent.x, world.agent.y)
+        agent_print(f"planning from {start} to the nearest dirt", start=(start.x, start.y))
+        self.plan_version = world.maze.version
+
+        search_result = self.search_plan(
+            world, start, None, SearchMethod.POOLED_BREADTH_FIRST_SEARCH, True
+        )
+        path = self.show_search_result(search_result, world)
+        if not path:
+            self.nearest_failed_at = state
+            return None, []
+
+        return world.get_dirt_at_position(path[-1].get_state()), path
+
     def reset_plan(self):
         self.current_path = []
         self.current_path_index = 0
@@ -245,15 +441,18 @@ class IntelligentVacuumAgent:
         Args:
             world: The world to search in
             start: The start position
-            goal: The goal position
+            goal: The goal position, None for the nearest uncleaned dirt (NearestDirtProblem)
             method: The search method to use
             print_result: Whether to print timing results
 
         Returns:
             The search object with results, or None if failed
         """
-        start_time = time.time()
-        problem = SearchProblem(world, start, goal)
+        start_time = time.perf_counter_ns()
+        if goal is None:
+            problem = NearestDirtProblem(world, start, self.search_hooks)
+        else:
+            problem = SearchProblem(world, start, goal, self.search_hooks)
 
         if method == SearchMethod.RANDOM_SEARCH:
             if print_result:
@@ -271,20 +470,83 @@ class IntelligentVacuumAgent:
             if print_result:
                 agent_print("starting A*")
             search_run = AStarSearch()
+        elif method == SearchMethod.POOLED_BREADTH_FIRST_SEARCH:
+            if print_result:
+                agent_print("starting Breadth First Search Method (BFS, node pool)")
+            search_run = PooledBreadthFirstSearch()
+        elif method == SearchMethod.POOLED_DEPTH_FIRST_SEARCH:
+            if print_result:
+                agent_print("starting Depth First Search Method (DFS, node pool)")
+            search_run = PooledDepthFirstSearch()
+        elif method == SearchMethod.POOLED_A_STAR_SEARCH:
+            if print_result:
+                agent_print("starting A* (node pool)")
+            search_run = PooledAStarSearch()
+        elif method == SearchMethod.WAVEFRONT_BREADTH_FIRST_SEARCH:
+            if print_result:
+                agent_print("starting Wavefront Breadth First Search (vectorized BFS)")
+            search_run = WavefrontSearch()
+        elif method == SearchMethod.BUCKET_A_STAR_SEARCH:
+            if print_result:
+                agent_print("starting A* (bucket queue)")
+            search_run = BucketAStarSearch()
+        elif method == SearchMethod.JUMP_POINT_SEARCH:
+            if print_result:
+                agent_print("starting Jump Point Search (JPS)")
+            search_run = JumpPointSearch()
+        elif method == SearchMethod.BIDIRECTIONAL_BREADTH_FIRST_SEARCH:
+            if print_result:
+                agent_print("starting Bidirectional Breadth First Search")
+            search_run = BidirectionalBreadthFirstSearch()
+        elif method == SearchMethod.BIDIRECTIONAL_A_STAR_SEARCH:
+            if print_result:
+                agent_print("starting Bidirectional A*")
+            search_run = BidirectionalAStarSearch()
+        elif method == SearchMethod.CACHED_DISTANCE_FIELD:
+            if print_result:
+                agent_print("starting Cached Distance Field planning")
+            search_run = DistanceFieldSearch(self.distance_cache)
+        elif method == SearchMethod.D_STAR_LITE:
+            if print_result:
+                agent_print("starting D* Lite (incremental)")
+            search_run = self.d_star_lite
+        elif method == SearchMethod.HIERARCHICAL_A_STAR:
+            if print_result:
+                agent_print("starting Hierarchical A* (HPA*)")
+            search_run = self.hierarchical_search
         else:
-            agent_print(f"Unknown search method: {method}")
+            agent_print(f"Unknown search method: {method}", Level.WARNING)
             return None
 
         problem.reset_expanded_count()
-        path = search_run.search(problem)
-
-        end_time = time.time()
-        elapsed_time = (end_time - start_time) * 1000
+        if problem.is_solvable():
+            metrics = search_run.run(problem)
+            path = search_run.get_path()
+        else:
+            # Start and goal are in different components, no search can succeed
+            if print_result:
+                agent_print("goal is in another connected component, skipping the search")
+            search_run.path = []
+            search_run.continues_plan = False
+            metrics = problem.metrics
+            path = []
+
+        end_time = time.perf_counter_ns()
+        elapsed_time = (end_time - start_time) / 1e6
+        self.planning_time_ms += elapsed_time
+        self.last_metrics = metrics
+        self.metrics.add(metrics)
 
         if print_result:
-            print(
+            message = (
                 f"\tNeeded {elapsed_time:.1f} msec, PathLength: {len(path)}, "
                 f"NumExpNodes: {problem.get_num_expanded_nodes()}"
             )
+            if method == SearchMethod.CACHED_DISTANCE_FIELD:
+                message += (
+                    f", CacheHits: {self.distance_cache.hits}, "
+                    f"CacheMisses: {self.distance_cache.misses}"
+                )
+            emit("", message, Level.INFO, method=method.value, **metrics.as_dict())
 
         return search_run
@@ -0,0 +1,279 @@
+"""
+Headless batch experiments.
+
+Every combination of seeds, maze sizes, maze types and search methods is run without GUI
+in a pool of processes. One result row per run is written to a CSV or JSON Lines file as
+soon as the run finishes, so partial results survive an interrupted batch.
+
+Run from the repository root:
+    python -m lab1_search.vacuum_world.batch --seeds 0 1 2 --sizes 20 50 \\
+        --maze default caves --search bfs astar --output results.csv
+"""
+
+import argparse
+import contextlib
+import csv
+import itertools
+import json
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from rich import print
+from .world.world import World
+from .world.maze import MazeType
+from .agent.vacuum_agent import IntelligentVacuumAgent, SearchMethod
+from .events import NullSink, set_sink
+
+MAZE_TYPES = {
+    "default": MazeType.MAZE_LABYRINTH,
+    "simple": MazeType.MAZE_ONLY_BORDER,
+    "office": MazeType.MAZE_OFFICE,
+    "caves": MazeType.MAZE_CAVES,
+}
+
+FIELDS = [
+    "seed", "size", "maze", "search", "dirt",
+    "steps", "success", "dirt_collected", "planning_ms", "search_ms", "expanded_nodes",
+    "expansions", "duplicates", "heuristic_evaluations", "peak_frontier", "peak_explored",
+    "num_plans", "total_path_length", "mean_path_length", "max_path_length",
+    "wall_time_s", "error",
+]
+
+
+def run_experiment(config: dict) -> dict:
+    """Run one world until all dirt is cleaned or the step limit is reached.
+
+    Args:
+        config: seed, size, maze, search, dirt, max_steps, dynamic_walls, connected,
+            vectorized, tour, nearest and maze_cache of the run
+
+    Returns:
+        The result row, with the FIELDS keys. If the run raised, ``error`` holds the
+        exception and the measurements are left empty.
+    """
+    row = dict.fromkeys(FIELDS, "")
+    for key in ("seed", "size", "maze", "search", "dirt"):
+        row[key] = config[key]
+
+    start_time = time.perf_counter()
+    # The events of the world and the agent would interleave across workers
+    previous_sink = set_sink(NullSink())
+    try:
+        world = World(
+            width=config["size"],
+            height=config["size"],
+            num_dirt=config["dirt"],
+            maze_type=MAZE_TYPES[config["maze"]],
+            seed=config["seed"],
+            connected=config["connected"],
+            vectorized=config["vectorized"],
+            cache_dir=config["maze_cache"],
+        )
+        agent = IntelligentVacuumAgent(world)
+        agent.set_search_method(SearchMethod(config["search"]))
+        agent.set_tour_planning(config["tour"])
+        agent.set_nearest_planning(config["nearest"])
+
+        step_count = 0
+        while not world.is_terminated() and step_count < config["max_steps"]:
+            agent.step(world)
+            step_count += 1
+
+            if config["dynamic_walls"] and step_count % config["dynamic_walls"] == 0:
+                world.toggle_random_wall()
+    except Exception as error:
+        row["error"] = f"{type(error).__name__}: {error}"
+        row["wall_time_s"] = round(time.perf_counter() - start_time, 3)
+        return row
+    finally:
+        set_sink(previous_sink)
+
+    path_lengths = agent.path_lengths
+    metrics = agent.metrics
+    row.update(
+        steps=step_count,
+        success=world.is_terminated(),
+        dirt_collected=world.agent.get_dirt_collected() if world.agent else 0,
+        planning_ms=round(agent.planning_time_ms, 3),
+        search_ms=round(metrics.elapsed_ms, 3),
+        expanded_nodes=metrics.generated,
+        expansions=metrics.expansions,
+        duplicates=metrics.duplicates,
+        heuristic_evaluations=metrics.heuristic_evaluations,
+        peak_frontier=metrics.peak_frontier,
+        peak_explored=metrics.peak_explored,
+        num_plans=len(path_lengths),
+        total_path_length=sum(path_lengths),
+        mean_path_length=round(sum(path_lengths) / len(path_lengths), 2) if path_lengths else 0,
+        max_path_length=max(path_lengths, default=0),
+        wall_time_s=round(time.perf_counter() - start_time, 3),
+    )
+    return row
+
+
+class ResultWriter:
+    """Writes result rows to a CSV or JSON Lines stream, flushing after every row."""
+
+    def __init__(self, file, output_format: str):
+        self.file = file
+        self.output_format = output_format
+        if output_format == "csv":
+            self.csv_writer = csv.DictWriter(file, fieldnames=FIELDS)
+            self.csv_writer.writeheader()
+
+    def write(self, row: dict):
+        if self.output_format == "csv":
+            self.csv_writer.writerow(row)
+        else:
+            self.file.write(json.dumps(row) + "\n")
+        self.file.flush()
+
+
+def build_configs(args) -> list:
+    """One run configuration for every combination of the grid arguments."""
+    return [
+        {
+            "seed": seed,
+            "size": size,
+            "maze": maze,
+            "search": search,
+            "dirt": args.dirt,
+            "max_steps": args.max_steps,
+            "dynamic_walls": args.dynamic_walls,
+            "connected": args.connected,
+            "vectorized": args.vectorized,
+            "tour": args.tour,
+            "nearest": args.nearest,
+            "maze_cache": args.maze_cache,
+        }
+        for seed, size, maze, search in itertools.product(
+            args.seeds, args.sizes, args.maze, args.search
+        )
+    ]
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Vacuum World - batch experiments")
+
+    parser.add_argument(
+        "--seeds", type=int, nargs="+", default=[0], help="Random seeds (default: 0)"
+    )
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[20], help="Maze sizes (default: 20)"
+    )
+    parser.add_argument(
+        "--maze",
+        choices=list(MAZE_TYPES),
+        nargs="+",
+        default=["default"],
+        help="Maze types (default: default)",
+    )
+    parser.add_argument(
+        "--search",
+        choices=[method.value for method in SearchMethod],
+        nargs="+",
+        default=["bfs"],
+        help="Search methods (default: bfs)",
+    )
+    parser.add_argument(
+        "--dirt", type=int, default=10, help="Number of dirt particles (default: 10)"
+    )
+    parser.add_argument(
+        "--max-steps", type=int, default=1000, help="Step limit of every run (default: 1000)"
+    )
+    parser.add_argument(
+        "--dynamic-walls",
+        type=int,
+        default=0,
+        help="Toggle a random wall every N steps (default: 0, static maze)",
+    )
+    parser.add_argument(
+        "--connected",
+        action="store_true",
+        help="Carve bridges through walls so that all dirt can be reached",
+    )
+    parser.add_argument(
+        "--vectorized",
+        action="store_true",
+        help="Generate the mazes with the NumPy generators",
+    )
+    parser.add_argument(
+        "--tour",
+        action="store_true",
+        help="Visit the dirt in the order of a tour planned over true path distances",
+    )
+    parser.add_argument(
+        "--nearest",
+        action="store_true",
+        help="Go to the dirt nearest by path distance, found with a single BFS per target",
+    )
+    parser.add_argument(
+        "--maze-cache",
+        default=None,
+        metavar="DIR",
+        help="Directory where generated mazes are cached and loaded from",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Number of worker processes (default: all CPUs, 1 runs in this process)",
+    )
+    parser.add_argument(
+        "--output",
+        "-o",
+        default="-",
+        help="Result file, .csv or .jsonl (default: CSV on standard output)",
+    )
+    parser.add_argument(
+        "--format",
+        choices=["csv", "jsonl"],
+        default=None,
+        help="Output format (default: from the extension of --output, else csv)",
+    )
+
+    return parser.parse_args()
+
+
+def main():
+    args = parse_arguments()
+
+    output_format = args.format
+    if output_format is None:
+        output_format = "jsonl" if args.output.endswith((".jsonl", ".json")) else "csv"
+
+    configs = build_configs(args)
+    # Progress goes to stderr, so that results can be piped from stdout
+    print(f"[bold]Running {len(configs)} experiments...", file=sys.stderr)
+
+    if args.output == "-":
+        output = contextlib.nullcontext(sys.stdout)
+    else:
+        output = open(args.output, "w", newline="")
+
+    with output as file:
+        writer = ResultWriter(file, output_format)
+
+        if args.workers == 1:
+            results = map(run_experiment, configs)
+        else:
+            executor = ProcessPoolExecutor(max_workers=args.workers)
+            futures = [executor.submit(run_experiment, config) for config in configs]
+            results = (future.result() for future in as_completed(futures))
+
+        try:
+            for count, row in enumerate(results, start=1):
+                writer.write(row)
+                status = row["error"] or ("solved" if row["success"] else "unsolved")
+                print(
+                    f"[{count}/{len(configs)}] seed {row['seed']}, size {row['size']}, "
+                    f"{row['maze']}, {row['search']}: {status}",
+                    file=sys.stderr,
+                )
+        finally:
+            if args.workers != 1:
+                executor.shutdown(cancel_futures=True)
+
+
+if __name__ == "__main__":
+    main()
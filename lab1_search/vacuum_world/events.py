@@ -0,0 +1,171 @@
+"""
+Event sinks for the messages of the agent and the world.
+
+Messages go through the current sink (see set_sink) instead of being printed directly,
+so that headless runs can choose how much console formatting they pay for:
+
+- RichSink: colored output through rich, the default, used with the GUI
+- PlainSink: plain text, buffered, the default of ``--no-gui`` runs
+- JsonlSink: one JSON object per event, buffered, for analysis
+- NullSink: drops everything, for benchmarks and batch runs
+
+Every event has a level, and sinks drop the events below their own level before any
+formatting happens.
+"""
+
+import atexit
+import json
+import sys
+import time
+from abc import ABC, abstractmethod
+from enum import IntEnum
+from typing import List, Optional, TextIO
+from rich import print as rich_print
+
+
+class Level(IntEnum):
+    DEBUG = 10
+    INFO = 20
+    WARNING = 30
+
+
+class EventSink:
+    """Base class of the sinks, writing nothing."""
+
+    def __init__(self, level: Level = Level.INFO):
+        self.level = level
+
+    def enabled(self, level: Level) -> bool:
+        """Check whether events of a level are written, to skip building them otherwise."""
+        return level >= self.level
+
+    def emit(self, source: str, message: str, level: Level = Level.INFO, **fields):
+        """Write an event.
+
+        Args:
+            source: Who emits the event ("Agent", "World"), empty for continuation lines
+            message: Human readable message
+            level: Level of the event
+            fields: Structured values of the event, only written by JsonlSink
+        """
+        if level >= self.level:
+            self._write(source, message, level, fields)
+
+    def _write(self, source: str, message: str, level: Level, fields: dict):
+        pass
+
+    def flush(self):
+        pass
+
+    def close(self):
+        """Write the pending events and release what the sink holds."""
+        self.flush()
+
+
+class NullSink(EventSink):
+    """Drops every event."""
+
+    def __init__(self):
+        super().__init__(Level.WARNING + 1)
+
+    def emit(self, source: str, message: str, level: Level = Level.INFO, **fields):
+        pass
+
+
+class RichSink(EventSink):
+    """Prints events immediately with rich markup."""
+
+    def _write(self, source: str, message: str, level: Level, fields: dict):
+        if source:
+            rich_print(f"[bold cyan]{source}:[/bold cyan] {message}")
+        else:
+            rich_print(message)
+
+
+class BufferedSink(EventSink, ABC):
+    """
+    Collects formatted lines and writes them in batches of ``buffer_size`` lines.
+
+    The buffer is also flushed at exit, unless the sink was closed. Without a file, lines
+    go to the standard output current at the time of the flush. The sink owns its file,
+    and close() closes it.
+    """
+
+    def __init__(
+        self, file: Optional[TextIO] = None, level: Level = Level.INFO, buffer_size: int = 256
+    ):
+        super().__init__(level)
+        self.file = file
+        self.buffer_size = buffer_size
+        self.lines: List[str] = []
+        atexit.register(self.flush)
+
+    def _write(self, source: str, message: str, level: Level, fields: dict):
+        self.lines.append(self._format(source, message, level, fields))
+        if len(self.lines) >= self.buffer_size:
+            self.flush()
+
+    @abstractmethod
+    def _format(self, source: str, message: str, level: Level, fields: dict) -> str:
+        """Turn an event into the line written for it."""
+        pass
+
+    def flush(self):
+        if not self.lines:
+            return
+        file = self.file if self.file is not None else sys.stdout
+        file.write("\n".join(self.lines) + "\n")
+        file.flush()
+        self.lines = []
+
+    def close(self):
+        self.flush()
+        atexit.unregister(self.flush)
+        if self.file is not None:
+            self.file.close()
+
+
+class PlainSink(BufferedSink):
+    """Writes events as plain text lines."""
+
+    def _format(self, source: str, message: str, level: Level, fields: dict) -> str:
+        return f"{source}: {message}" if source else message
+
+
+class JsonlSink(BufferedSink):
+    """Writes events as JSON objects, one per line, with their structured fields."""
+
+    def _format(self, source: str, message: str, level: Level, fields: dict) -> str:
+        event = {
+            "time": time.time(),
+            "level": level.name,
+            "source": source,
+            "message": message.strip(),
+        }
+        event.update(fields)
+        return json.dumps(event, default=str)
+
+
+_sink: EventSink = RichSink()
+
+
+def get_sink() -> EventSink:
+    return _sink
+
+
+def set_sink(sink: EventSink) -> EventSink:
+    """Install the sink all events go to.
+
+    Returns:
+        The previous sink, flushed
+    """
+    global _sink
+    previous = _sink
+    previous.flush()
+    _sink = sink
+    return previous
+
+
+def emit(source: str, message: str, level: Level = Level.INFO, **fields):
+    """Write an event to the current sink."""
+    _sink.emit(source, message, level, **fields)
@@ -8,7 +8,9 @@ from rich import print
 from .world.world import World
 from .world.maze import MazeType
 from .agent.vacuum_agent import IntelligentVacuumAgent, SearchMethod
+from .search.distance_cache import DistanceFieldCache
 from .visualization.pygame_viewer import PygameViewer
+from .events import JsonlSink, Level, NullSink, PlainSink, RichSink, emit, set_sink
 
 
 def parse_arguments():
@@ -29,15 +31,83 @@ def parse_arguments():
         default="default",
         help="Maze type to use (default: default)",
     )
+    parser.add_argument(
+        "--connected",
+        action="store_true",
+        help="Carve bridges through walls so that all dirt can be reached",
+    )
+    parser.add_argument(
+        "--vectorized",
+        action="store_true",
+        help="Generate the maze with the NumPy generators (much faster on large mazes)",
+    )
+    parser.add_argument(
+        "--maze-cache",
+        default=None,
+        metavar="DIR",
+        help="Directory where generated mazes are cached and loaded from",
+    )
+    parser.add_argument(
+        "--tiled",
+        default=None,
+        metavar="FILE",
+        help="Keep the maze in a memory-mapped tile file, for mazes too large for memory",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Number of processes generating the tiles of a --tiled maze (default: all CPUs)",
+    )
     parser.add_argument(
         "--search",
-        choices=["bfs", "dfs", "astar", "random"],
+        choices=[method.value for method in SearchMethod],
         default="bfs",
         help="Search method to use (default: bfs)",
     )
+    parser.add_argument(
+        "--cache-mb",
+        type=int,
+        default=64,
+        help="Memory cap in MB for cached distance fields, used by --search cached (default: 64)",
+    )
+    parser.add_argument(
+        "--tour",
+        action="store_true",
+        help="Visit the dirt in the order of a tour planned over true path distances",
+    )
+    parser.add_argument(
+        "--nearest",
+        action="store_true",
+        help="Go to the dirt nearest by path distance, found with a single BFS per target",
+    )
+    parser.add_argument(
+        "--dynamic-walls",
+        type=int,
+        default=0,
+        help="Toggle a random wall every N steps while running without GUI (default: 0, static maze)",
+    )
     parser.add_argument(
         "--no-gui", action="store_true", help="Run without graphical interface"
     )
+    parser.add_argument(
+        "--log",
+        choices=["rich", "plain", "jsonl", "none"],
+        default=None,
+        help="How agent and world events are written (default: rich, plain with --no-gui)",
+    )
+    parser.add_argument(
+        "--log-level",
+        choices=["debug", "info", "warning"],
+        default="info",
+        help="Lowest level of the events written (default: info)",
+    )
+    parser.add_argument(
+        "--log-file",
+        default=None,
+        metavar="FILE",
+        help="Write plain or jsonl events to this file instead of the standard output",
+    )
     parser.add_argument(
         "--cell-size",
         type=int,
@@ -48,9 +118,38 @@ def parse_arguments():
     return parser.parse_args()
 
 
+def create_sink(args):
+    """Create the event sink selected on the command line."""
+    log = args.log
+    if log is None:
+        log = "plain" if args.no_gui else "rich"
+    level = Level[args.log_level.upper()]
+
+    if log == "none":
+        return NullSink()
+    if log == "rich":
+        return RichSink(level)
+
+    file = open(args.log_file, "w") if args.log_file is not None else None
+    if log == "jsonl":
+        return JsonlSink(file, level)
+    return PlainSink(file, level)
+
+
 def main():
     args = parse_arguments()
+    sink = create_sink(args)
+    previous_sink = set_sink(sink)
+    try:
+        run(args)
+    finally:
+        # Writes the remaining events and closes the --log-file
+        set_sink(previous_sink)
+        sink.close()
 
+
+def run(args):
+    """Create the world and the agent of the command line, and run them."""
     maze_types = {
         "default": MazeType.MAZE_LABYRINTH,
         "simple": MazeType.MAZE_ONLY_BORDER,
@@ -65,33 +164,35 @@ def main():
         num_dirt=args.dirt,
         maze_type=maze_type,
         seed=args.seed,
+        connected=args.connected,
+        vectorized=args.vectorized,
+        cache_dir=args.maze_cache,
+        tiled_path=args.tiled,
+        workers=args.workers,
     )
 
-    print(
-        f"[bold]Created world: [/bold][white] {args.size}x{args.size}, {args.dirt} dirt particles"
-    )
-    print(f"[bold]Maze type: [/bold][white] {maze_type.value}")
-    print(f"[bold]Random seed: [/bold][white]{world.seed}")
+    # Through the sink, so that --no-gui runs print them without rich (see create_sink)
+    emit("", f"Created world: {args.size}x{args.size}, {args.dirt} dirt particles",
+         width=args.size, height=args.size, num_dirt=args.dirt)
+    emit("", f"Maze type: {maze_type.value}", maze_type=maze_type.value)
+    emit("", f"Random seed: {world.seed}", seed=world.seed)
 
     agent = IntelligentVacuumAgent(world)
-
-    search_methods = {
-        "bfs": SearchMethod.BREADTH_FIRST_SEARCH,
-        "dfs": SearchMethod.DEPTH_FIRST_SEARCH,
-        "astar": SearchMethod.A_STAR_SEARCH,
-        "random": SearchMethod.RANDOM_SEARCH,
-    }
-    agent.set_search_method(search_methods[args.search])
+    agent.set_search_method(SearchMethod(args.search))
+    agent.distance_cache = DistanceFieldCache(max_bytes=args.cache_mb * 1024 * 1024)
+    agent.set_tour_planning(args.tour)
+    agent.set_nearest_planning(args.nearest)
 
     if args.no_gui:
-        run_without_gui(world, agent)
+        run_without_gui(world, agent, args.dynamic_walls)
     else:
         run_with_gui(world, agent, args.cell_size)
 
 
-def run_without_gui(world: World, agent: IntelligentVacuumAgent):
-    print("Running without GUI...")
-    print("Initial state:", world.get_state_info())
+def run_without_gui(world: World, agent: IntelligentVacuumAgent, dynamic_walls: int = 0):
+    emit("", "Running without GUI...")
+    state = world.get_state_info()
+    emit("", f"Initial state: {state}", **state)
 
     max_steps = 1000
     step_count = 0
@@ -100,16 +201,24 @@ def run_without_gui(world: World, agent: IntelligentVacuumAgent):
         agent.step(world)
         step_count += 1
 
+        if dynamic_walls and step_count % dynamic_walls == 0:
+            world.toggle_random_wall()
+        world.flush_changes()
+
         if step_count % 100 == 0:
-            print(f"Step {step_count}: {world.get_state_info()}")
+            state = world.get_state_info()
+            emit("", f"Step {step_count}: {state}", step=step_count, **state)
 
-    print(f"\nSimulation completed after {step_count} steps")
-    print("Final state:", world.get_state_info())
+    emit("", f"\nSimulation completed after {step_count} steps", steps=step_count)
+    emit("", f"Total planning time: {agent.planning_time_ms:.1f} msec",
+         planning_time_ms=agent.planning_time_ms)
+    state = world.get_state_info()
+    emit("", f"Final state: {state}", **state)
 
     if world.is_terminated():
-        print("SUCCESS: All dirt cleaned!")
+        emit("", "SUCCESS: All dirt cleaned!")
     else:
-        print("FAILED: Simulation stopped witohut the problem being solved")
+        emit("", "FAILED: Simulation stopped witohut the problem being solved", Level.WARNING)
 
 
 def run_with_gui(world: World, agent: IntelligentVacuumAgent, cell_size: int):
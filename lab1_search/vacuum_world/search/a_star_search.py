@@ -8,6 +8,8 @@ import heapq
 
 
 class AStarNode(SearchNode):
+    __slots__ = ("h_cost", "f_cost")
+
     def __init__(
         self,
         state: GridPos,
@@ -35,8 +37,10 @@ class AStarSearch(BaseSearch):
         self.explored = set()
         heapq.heapify(self.frontier)
 
+        metrics = problem.metrics
         initial_state = problem.get_initial_state()
         initial_node = AStarNode(initial_state, None, 0.0, problem.goal_state)
+        metrics.heuristic_evaluations += 1
 
         if problem.is_goal_state(initial_state):
             self.path = [initial_node]
@@ -61,8 +65,11 @@ class AStarSearch(BaseSearch):
                 for state in problem.get_successors(current_state)
             ]
 
+            metrics.heuristic_evaluations += len(successors)
+
             for node in successors:
                 if node in self.explored:
+                    metrics.duplicates += 1
                     continue
                 heapq.heappush(self.frontier, node)
 
@@ -2,9 +2,10 @@
 Abstract base class for all search algorithms.
 """
 from abc import ABC, abstractmethod
-from typing import List
+from typing import List, Optional
 from .search_node import SearchNode
 from .problem import SearchProblem
+from .metrics import SearchMetrics
 
 
 class BaseSearch(ABC):
@@ -31,6 +32,13 @@ class BaseSearch(ABC):
         self.frontier = []
         self.explored = []
     
+        # True when the last path only continues the plan of the previous search, instead
+        # of being a plan of its own (see HierarchicalSearch)
+        self.continues_plan = False
+    
+        # Metrics of the last run (see run)
+        self.metrics: Optional[SearchMetrics] = None
+    
     @abstractmethod
     def search(self, problem: SearchProblem) -> List[SearchNode]:
         """
@@ -45,6 +53,46 @@ class BaseSearch(ABC):
         """
         pass
     
+    def run(self, problem: SearchProblem) -> SearchMetrics:
+        """
+        Run search on a problem and measure it.
+        
+        The counters are collected by the problem while the search runs, the peak frontier
+        size is sampled at every expansion through frontier_size.
+        
+        Args:
+            problem: The search problem to solve
+        
+        Returns:
+            The metrics of the run (also kept in ``metrics``), the path is in get_path
+        """
+        metrics = problem.metrics
+        problem.search = self
+        metrics.start()
+        try:
+            path = self.search(problem)
+        finally:
+            metrics.stop()
+            problem.search = None
+        
+        metrics.path_length = 0 if self.continues_plan else self.get_plan_length()
+        metrics.peak_frontier = max(metrics.peak_frontier, self.frontier_size())
+        metrics.peak_explored = max(metrics.peak_explored, self.explored_size())
+        self.metrics = metrics
+        return metrics
+    
+    def get_plan_length(self) -> int:
+        """Number of nodes of the whole plan the path belongs to, the path itself by default."""
+        return len(self.path)
+    
+    def frontier_size(self) -> int:
+        """Number of entries in the frontier, without building the nodes."""
+        return len(self.frontier)
+    
+    def explored_size(self) -> int:
+        """Number of explored entries, without building the nodes."""
+        return len(self.explored)
+    
     def get_path(self) -> List[SearchNode]:
         """
         Get the path found by the search.
@@ -0,0 +1,246 @@
+"""
+Bidirectional searches: one search from the start and one from the goal, meeting halfway.
+
+The grid is undirected, so the backward search reuses SearchProblem.get_successor_indices.
+"""
+
+import heapq
+import itertools
+from typing import Dict, List, Optional
+from .search_node import SearchNode
+from .problem import SearchProblem
+from .base_search import BaseSearch
+
+NO_PARENT = -1
+UNREACHED = -1
+
+
+class BidirectionalSearch(BaseSearch):
+    """
+    Common bookkeeping for bidirectional searches on maze cell indices.
+
+    Index 0 of the per-direction tables is the forward search (from the start) and index
+    1 the backward search (from the goal). The tables are dicts holding the reached cells
+    only, so a search costs what it explores rather than the size of the maze.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._problem: Optional[SearchProblem] = None
+        self.costs: List[Dict[int, int]] = []
+        self.parents: List[Dict[int, int]] = []
+
+    def _reset(self, problem: SearchProblem):
+        self.path = []
+        self.frontier = []
+        self.explored = []
+        self._problem = problem
+
+        start = problem.initial_index
+        goal = problem.goal_index
+        self.costs = [{start: 0}, {goal: 0}]
+        self.parents = [{start: NO_PARENT}, {goal: NO_PARENT}]
+
+    def _build_path(self, meeting_cell: int) -> List[SearchNode]:
+        cells = []
+        cell = meeting_cell
+        while cell != NO_PARENT:
+            cells.append(cell)
+            cell = self.parents[0][cell]
+        cells.reverse()
+
+        cell = self.parents[1][meeting_cell]
+        while cell != NO_PARENT:
+            cells.append(cell)
+            cell = self.parents[1][cell]
+
+        return SearchNode.path_from_states([self._problem.get_state(c) for c in cells])
+
+    def _make_node(self, cell: int, direction: int) -> SearchNode:
+        return SearchNode(
+            self._problem.get_state(cell), None, None, self.costs[direction][cell]
+        )
+
+    def get_explored_nodes(self) -> List[SearchNode]:
+        if self._problem is None:
+            return []
+        return [self._make_node(cell, direction) for direction, cell in self.explored]
+
+    def frontier_size(self) -> int:
+        # The frontier holds one open list per direction once the search started
+        return sum(len(open_list) for open_list in self.frontier)
+
+
+class BidirectionalBreadthFirstSearch(BidirectionalSearch):
+    """
+    Front-to-end bidirectional BFS.
+
+    Whole layers are expanded alternately, always on the side with the smaller frontier.
+    Once a layer touches the other search, the best meeting cell found in that layer
+    gives a shortest path.
+    """
+
+    def search(self, problem: SearchProblem) -> List[SearchNode]:
+        self._reset(problem)
+        start = problem.initial_index
+        goal = problem.goal_index
+
+        if start == goal:
+            self.path = [SearchNode(problem.get_state(start), None, None, 0.0)]
+            return self.path
+
+        metrics = problem.metrics
+        for direction, root in enumerate((start, goal)):
+            self.explored.append((direction, root))
+        self.frontier = [[start], [goal]]
+
+        while self.frontier[0] and self.frontier[1]:
+            direction = 0 if len(self.frontier[0]) <= len(self.frontier[1]) else 1
+            costs = self.costs[direction]
+            parents = self.parents[direction]
+            other_costs = self.costs[1 - direction]
+
+            best_length = -1
+            meeting_cell = NO_PARENT
+            layer = []
+
+            for cell in self.frontier[direction]:
+                cost = costs[cell] + 1
+                for child in problem.get_successor_indices(cell):
+                    if child in costs:
+                        metrics.duplicates += 1
+                        continue
+                    costs[child] = cost
+                    parents[child] = cell
+                    layer.append(child)
+                    self.explored.append((direction, child))
+
+                    other_cost = other_costs.get(child, UNREACHED)
+                    if other_cost != UNREACHED and (
+                        best_length == -1 or cost + other_cost < best_length
+                    ):
+                        best_length = cost + other_cost
+                        meeting_cell = child
+
+            self.frontier[direction] = layer
+            if meeting_cell != NO_PARENT:
+                self.path = self._build_path(meeting_cell)
+                return self.path
+
+        return []
+
+    def get_frontier_nodes(self) -> List[SearchNode]:
+        if self._problem is None or not self.frontier:
+            return []
+        return [
+            self._make_node(cell, direction)
+            for direction in range(2)
+            for cell in self.frontier[direction]
+        ]
+
+
+class BidirectionalAStarSearch(BidirectionalSearch):
+    """
+    Bidirectional A* with Manhattan heuristics towards the goal (forward search) and
+    towards the start (backward search).
+
+    ``best_length`` is the cost of the best path found so far through a cell reached by
+    both searches. Since the heuristics are consistent, the lowest f-cost on either open
+    list is a lower bound on any path that is still undiscovered, so the search stops as
+    soon as one of them reaches ``best_length``. Both closed sets share the maze's cell
+    marks.
+    """
+
+    def search(self, problem: SearchProblem) -> List[SearchNode]:
+        self._reset(problem)
+        maze = problem.world.maze
+        width = maze.width
+        start = problem.initial_index
+        goal = problem.goal_index
+        targets = ((goal % width, goal // width), (start % width, start // width))
+
+        metrics = problem.metrics
+        self.frontier = [[], []]
+
+        for direction, root in enumerate((start, goal)):
+            target_x, target_y = targets[direction]
+            h = abs(root % width - target_x) + abs(root // width - target_y)
+            metrics.heuristic_evaluations += 1
+            heapq.heappush(self.frontier[direction], (h, h, root, 0))
+
+        best_length = -1
+        meeting_cell = start if start == goal else NO_PARENT
+
+        # One closed bit per direction
+        closed = maze.acquire_cell_marks()
+        try:
+            while True:
+                # Drop stale and already closed entries from the top of both open lists
+                for direction in range(2):
+                    heap = self.frontier[direction]
+                    costs = self.costs[direction]
+                    bit = 1 << direction
+                    while heap and (
+                        closed[heap[0][2]] & bit or heap[0][3] != costs[heap[0][2]]
+                    ):
+                        heapq.heappop(heap)
+
+                if not self.frontier[0] or not self.frontier[1]:
+                    break
+                if meeting_cell != NO_PARENT and (
+                    self.frontier[0][0][0] >= best_length or self.frontier[1][0][0] >= best_length
+                ):
+                    break
+
+                direction = 0 if len(self.frontier[0]) <= len(self.frontier[1]) else 1
+                heap = self.frontier[direction]
+                costs = self.costs[direction]
+                parents = self.parents[direction]
+                other_costs = self.costs[1 - direction]
+                target_x, target_y = targets[direction]
+                bit = 1 << direction
+
+                _, _, cell, cost = heapq.heappop(heap)
+                closed[cell] |= bit
+                self.explored.append((direction, cell))
+
+                child_cost = cost + 1
+                for child in problem.get_successor_indices(cell):
+                    if closed[child] & bit:
+                        metrics.duplicates += 1
+                        continue
+                    known_cost = costs.get(child, UNREACHED)
+                    if known_cost != UNREACHED and known_cost <= child_cost:
+                        metrics.duplicates += 1
+                        continue
+                    costs[child] = child_cost
+                    parents[child] = cell
+                    h = abs(child % width - target_x) + abs(child // width - target_y)
+                    metrics.heuristic_evaluations += 1
+                    heapq.heappush(heap, (child_cost + h, h, child, child_cost))
+
+                    other_cost = other_costs.get(child, UNREACHED)
+                    if other_cost != UNREACHED and (
+                        meeting_cell == NO_PARENT or child_cost + other_cost < best_length
+                    ):
+                        best_length = child_cost + other_cost
+                        meeting_cell = child
+
+            if meeting_cell == NO_PARENT:
+                return []
+
+            self.path = self._build_path(meeting_cell)
+            return self.path
+        finally:
+            # Closed cells all have a cost
+            maze.release_cell_marks(closed, itertools.chain(*self.costs))
+
+    def get_frontier_nodes(self) -> List[SearchNode]:
+        if self._problem is None or not self.frontier:
+            return []
+        return [
+            self._make_node(cell, direction)
+            for direction in range(2)
+            for _, _, cell, cost in self.frontier[direction]
+            if cost == self.costs[direction][cell]
+        ]
@@ -13,6 +13,7 @@ class BreadthFirstSearch(BaseSearch):
         self.path = []
         self.frontier = deque()
 
+        metrics = problem.metrics
         initial_state = problem.get_initial_state()
         initial_node = SearchNode(initial_state, None, None, 0.0)
 
@@ -43,6 +44,8 @@ class BreadthFirstSearch(BaseSearch):
                 if child_node not in self.explored:
                     self.explored.append(child_node)
                     self.frontier.append(child_node)
+                else:
+                    metrics.duplicates += 1
 
         return []
 
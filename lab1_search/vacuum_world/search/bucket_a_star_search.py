@@ -0,0 +1,113 @@
+"""
+A* search on a bucket priority queue, for unit step costs.
+"""
+
+from typing import Dict, List, Optional
+from .search_node import SearchNode
+from .problem import SearchProblem
+from .base_search import BaseSearch
+from .bucket_queue import BucketQueue
+
+NO_PARENT = -1
+
+
+class BucketAStarSearch(BaseSearch):
+    """
+    A* with a Manhattan heuristic, working on maze cell indices.
+
+    - The frontier is a BucketQueue indexed by f-cost, with ties broken in favour of the
+      lowest h-cost (the entry closest to the goal).
+    - The best g-cost found so far is tracked per cell, so a cell is only pushed again
+      when its g-cost improves (decrease-key), and outdated entries are skipped on pop.
+    - Expanded cells are marked in the maze's cell marks (a real closed set) and are never
+      expanded twice. Costs and parents are dicts, so a search only pays for the cells it
+      reaches.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.frontier = BucketQueue()
+        self.best_g: Dict[int, int] = {}
+        self.parents: Dict[int, int] = {}
+        self._problem: Optional[SearchProblem] = None
+
+    def search(self, problem: SearchProblem) -> List[SearchNode]:
+        self.path = []
+        self.explored = []
+        self.frontier = BucketQueue()
+        self._problem = problem
+
+        maze = problem.world.maze
+        width = maze.width
+        goal_x = problem.goal_index % width
+        goal_y = problem.goal_index // width
+
+        start = problem.initial_index
+        self.best_g = best_g = {start: 0}
+        self.parents = parents = {start: NO_PARENT}
+        closed = maze.acquire_cell_marks()
+        frontier = self.frontier
+        metrics = problem.metrics
+
+        h = abs(start % width - goal_x) + abs(start // width - goal_y)
+        metrics.heuristic_evaluations += 1
+        frontier.push(h, h, (start, 0))
+
+        try:
+            while frontier:
+                _, (cell, g) = frontier.pop()
+                if closed[cell] or g != best_g[cell]:
+                    continue
+                closed[cell] = 1
+                self.explored.append(cell)
+
+                if problem.is_goal_index(cell):
+                    self.path = self._build_path(cell)
+                    return self.path
+
+                child_g = g + 1
+                for child in problem.get_successor_indices(cell):
+                    if closed[child]:
+                        metrics.duplicates += 1
+                        continue
+                    known_g = best_g.get(child)
+                    if known_g is not None and known_g <= child_g:
+                        metrics.duplicates += 1
+                        continue
+                    best_g[child] = child_g
+                    parents[child] = cell
+                    h = abs(child % width - goal_x) + abs(child // width - goal_y)
+                    metrics.heuristic_evaluations += 1
+                    frontier.push(child_g + h, h, (child, child_g))
+
+            return []
+        finally:
+            # Closed cells all have a best cost
+            maze.release_cell_marks(closed, best_g)
+
+    def _build_path(self, cell: int) -> List[SearchNode]:
+        cells = []
+        while cell != NO_PARENT:
+            cells.append(cell)
+            cell = self.parents[cell]
+        cells.reverse()
+        return SearchNode.path_from_states([self._problem.get_state(c) for c in cells])
+
+    def _make_node(self, cell: int) -> SearchNode:
+        return SearchNode(self._problem.get_state(cell), None, None, self.best_g[cell])
+
+    def get_frontier_nodes(self) -> List[SearchNode]:
+        if self._problem is None:
+            return []
+        # The cell marks went back to the maze, the expanded cells are in explored
+        closed = set(self.explored)
+        return [
+            self._make_node(cell)
+            for cell, g in self.frontier
+            if cell not in closed and g == self.best_g[cell]
+        ]
+
+    def get_explored_nodes(self) -> List[SearchNode]:
+        if self._problem is None:
+            return []
+        return [self._make_node(cell) for cell in self.explored]
@@ -0,0 +1,80 @@
+"""
+Bucket (Dial) priority queue for small non-negative integer priorities.
+"""
+
+from typing import Any, Iterator, List, Tuple
+
+
+class BucketQueue:
+    """
+    Priority queue with one bucket per integer priority.
+
+    Each bucket is further split by an integer tie-break key, so among the items with the
+    lowest priority the one with the lowest tie-break key is popped first (most recently
+    pushed first on a full tie). Push and pop are O(1) amortized as long as priorities
+    popped never decrease by much, which holds for A* with a consistent heuristic.
+    """
+
+    def __init__(self):
+        # buckets[priority][tie_break] is a stack of items
+        self.buckets: List[List[List[Any]]] = []
+        # Lowest tie-break key that may be non-empty in each bucket
+        self.lowest_tie: List[int] = []
+        self.current = 0
+        self.size = 0
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __iter__(self) -> Iterator[Any]:
+        for bucket in self.buckets:
+            for stack in bucket:
+                yield from stack
+
+    def push(self, priority: int, tie_break: int, item: Any):
+        """Add an item to the queue.
+
+        Args:
+            priority: Non-negative integer priority (lower is popped first)
+            tie_break: Non-negative integer key ordering items of equal priority
+            item: The item to store
+        """
+        while priority >= len(self.buckets):
+            self.buckets.append([])
+            self.lowest_tie.append(0)
+
+        bucket = self.buckets[priority]
+        while tie_break >= len(bucket):
+            bucket.append([])
+        bucket[tie_break].append(item)
+
+        if self.size == 0 or tie_break < self.lowest_tie[priority]:
+            self.lowest_tie[priority] = tie_break
+        if self.size == 0 or priority < self.current:
+            self.current = priority
+        self.size += 1
+
+    def pop(self) -> Tuple[int, Any]:
+        """Remove and return the item with the lowest priority.
+
+        Returns:
+            Tuple of (priority, item)
+        """
+        if self.size == 0:
+            raise IndexError("pop from an empty bucket queue")
+
+        while True:
+            bucket = self.buckets[self.current]
+            tie_break = self.lowest_tie[self.current]
+            while tie_break < len(bucket) and not bucket[tie_break]:
+                tie_break += 1
+            if tie_break < len(bucket):
+                break
+            # Bucket exhausted, reset it and move on to the next priority
+            bucket.clear()
+            self.lowest_tie[self.current] = 0
+            self.current += 1
+
+        self.lowest_tie[self.current] = tie_break
+        self.size -= 1
+        return self.current, bucket[tie_break].pop()
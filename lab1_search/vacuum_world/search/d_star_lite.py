@@ -0,0 +1,233 @@
+"""
+D* Lite incremental search.
+
+D* Lite searches backwards from the goal and keeps its g/rhs tables between plans. When
+the agent moves or walls change, only the part of the search tree affected by the change
+is repaired, instead of searching again from scratch.
+
+Reference: S. Koenig and M. Likhachev, "D* Lite", AAAI 2002.
+"""
+
+import heapq
+import math
+from typing import Dict, List, Optional, Tuple
+from ..world.maze import Maze
+from .search_node import SearchNode
+from .problem import SearchProblem
+from .base_search import BaseSearch
+
+INFINITY = math.inf
+
+
+class DStarLite:
+    """
+    D* Lite planner on the cells of a maze, for a fixed goal.
+
+    Every cell is a vertex, connected to its 4 neighbours with cost 1, or infinite cost
+    when either end is a wall. ``g`` and ``rhs`` only store the cells touched so far.
+    """
+
+    def __init__(self, maze: Maze, start: int, goal: int):
+        self.maze = maze
+        self.start = start
+        self.goal = goal
+        self.last_start = start
+        self.key_modifier = 0
+        self.maze_version = maze.version
+        maze.watch_changes(self)
+
+        self.g: Dict[int, float] = {}
+        self.rhs: Dict[int, float] = {goal: 0}
+        # Open list with lazy deletion: open_keys holds the current key of each open cell
+        self.open_list: List[Tuple[float, float, int]] = []
+        self.open_keys: Dict[int, Tuple[float, float]] = {}
+        self.num_expanded = 0
+        self.expanded: List[int] = []
+
+        self._push(goal)
+
+    def _heuristic(self, a: int, b: int) -> int:
+        width = self.maze.width
+        return abs(a % width - b % width) + abs(a // width - b // width)
+
+    def _neighbors(self, cell: int) -> List[int]:
+        width = self.maze.width
+        x, y = cell % width, cell // width
+        neighbors = []
+        if y > 0:
+            neighbors.append(cell - width)
+        if y < self.maze.height - 1:
+            neighbors.append(cell + width)
+        if x < width - 1:
+            neighbors.append(cell + 1)
+        if x > 0:
+            neighbors.append(cell - 1)
+        return neighbors
+
+    def _cost(self, a: int, b: int) -> float:
+        grid = self.maze.grid
+        return INFINITY if grid[a] or grid[b] else 1
+
+    def _key(self, cell: int) -> Tuple[float, float]:
+        best = min(self.g.get(cell, INFINITY), self.rhs.get(cell, INFINITY))
+        return (best + self._heuristic(self.start, cell) + self.key_modifier, best)
+
+    def _push(self, cell: int):
+        key = self._key(cell)
+        self.open_keys[cell] = key
+        heapq.heappush(self.open_list, (key[0], key[1], cell))
+
+    def _top(self) -> Optional[Tuple[Tuple[float, float], int]]:
+        while self.open_list:
+            k1, k2, cell = self.open_list[0]
+            if self.open_keys.get(cell) == (k1, k2):
+                return (k1, k2), cell
+            heapq.heappop(self.open_list)
+        return None
+
+    def _update_vertex(self, cell: int):
+        if cell != self.goal:
+            best = INFINITY
+            for neighbor in self._neighbors(cell):
+                best = min(best, self._cost(cell, neighbor) + self.g.get(neighbor, INFINITY))
+            self.rhs[cell] = best
+
+        self.open_keys.pop(cell, None)
+        if self.g.get(cell, INFINITY) != self.rhs.get(cell, INFINITY):
+            self._push(cell)
+
+    def compute_shortest_path(self):
+        """Expand cells until the start is locally consistent."""
+        self.expanded = []
+
+        while True:
+            top = self._top()
+            if top is None:
+                break
+            key, cell = top
+            start_g = self.g.get(self.start, INFINITY)
+            start_rhs = self.rhs.get(self.start, INFINITY)
+            if key >= self._key(self.start) and start_g == start_rhs:
+                break
+
+            heapq.heappop(self.open_list)
+            new_key = self._key(cell)
+            if key < new_key:
+                self._push(cell)
+                continue
+
+            del self.open_keys[cell]
+            self.num_expanded += 1
+            self.expanded.append(cell)
+
+            if self.g.get(cell, INFINITY) > self.rhs.get(cell, INFINITY):
+                self.g[cell] = self.rhs[cell]
+                for neighbor in self._neighbors(cell):
+                    self._update_vertex(neighbor)
+            else:
+                self.g[cell] = INFINITY
+                self._update_vertex(cell)
+                for neighbor in self._neighbors(cell):
+                    self._update_vertex(neighbor)
+
+    def move_start(self, start: int):
+        """Move the start of the search (the agent) to another cell."""
+        if start == self.start:
+            return
+        self.key_modifier += self._heuristic(self.last_start, start)
+        self.last_start = start
+        self.start = start
+
+    def notify_changes(self, cells: List[int]):
+        """Repair the search after the given cells changed between wall and free."""
+        for cell in set(cells):
+            self._update_vertex(cell)
+            for neighbor in self._neighbors(cell):
+                self._update_vertex(neighbor)
+
+    def sync_with_maze(self):
+        """Apply the changes made to the maze since the last call."""
+        if self.maze.version != self.maze_version:
+            self.notify_changes(self.maze.get_changes_since(self.maze_version, self))
+            self.maze_version = self.maze.version
+
+    def get_path_indices(self) -> List[int]:
+        """Follow the g-values greedily from the start to the goal.
+
+        Returns:
+            Cell indices from the start to the goal, empty if the goal is unreachable
+        """
+        if self.g.get(self.start, INFINITY) == INFINITY:
+            return []
+
+        cells = [self.start]
+        cell = self.start
+        while cell != self.goal:
+            best_cost = INFINITY
+            best_cell = None
+            for neighbor in self._neighbors(cell):
+                cost = self._cost(cell, neighbor) + self.g.get(neighbor, INFINITY)
+                if cost < best_cost:
+                    best_cost, best_cell = cost, neighbor
+            if best_cell is None or len(cells) > len(self.maze.grid):
+                return []
+            cell = best_cell
+            cells.append(cell)
+
+        return cells
+
+
+class DStarLiteSearch(BaseSearch):
+    """
+    Search wrapper around a DStarLite planner.
+
+    The planner is kept between calls to ``search``. As long as the maze and the goal
+    stay the same, later searches only move the start, apply the maze changes and repair
+    the previous solution.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.planner: Optional[DStarLite] = None
+        self._problem: Optional[SearchProblem] = None
+
+    def search(self, problem: SearchProblem) -> List[SearchNode]:
+        self.path = []
+        self._problem = problem
+        maze = problem.world.maze
+
+        if (
+            self.planner is None
+            or self.planner.maze is not maze
+            or self.planner.goal != problem.goal_index
+        ):
+            self.planner = DStarLite(maze, problem.initial_index, problem.goal_index)
+        else:
+            self.planner.move_start(problem.initial_index)
+            self.planner.sync_with_maze()
+
+        expanded_before = self.planner.num_expanded
+        self.planner.compute_shortest_path()
+        problem.add_expanded_nodes(self.planner.num_expanded - expanded_before)
+
+        cells = self.planner.get_path_indices()
+        if not cells:
+            return []
+
+        self.path = SearchNode.path_from_states([problem.get_state(c) for c in cells])
+        return self.path
+
+    def _make_node(self, cell: int) -> SearchNode:
+        return SearchNode(
+            self._problem.get_state(cell), None, None, self.planner.g.get(cell, INFINITY)
+        )
+
+    def get_frontier_nodes(self) -> List[SearchNode]:
+        if self.planner is None:
+            return []
+        return [self._make_node(cell) for cell in self.planner.open_keys]
+
+    def get_explored_nodes(self) -> List[SearchNode]:
+        if self.planner is None:
+            return []
+        return [self._make_node(cell) for cell in self.planner.expanded]
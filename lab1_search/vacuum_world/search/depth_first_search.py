@@ -11,6 +11,7 @@ class DepthFirstSearch(BaseSearch):
     def search(self, problem: SearchProblem) -> List[SearchNode]:
         self.path = []
 
+        metrics = problem.metrics
         initial_state = problem.get_initial_state()
         initial_node = SearchNode(initial_state, None, None, 0.0)
 
@@ -41,6 +42,8 @@ class DepthFirstSearch(BaseSearch):
                 if child_node not in self.explored:
                     self.explored.append(child_node)
                     self.frontier.append(child_node)
+                else:
+                    metrics.duplicates += 1
 
         return []
 
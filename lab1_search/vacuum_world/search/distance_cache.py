@@ -0,0 +1,103 @@
+"""
+Cache of goal distance fields, so that repeated plans to the same goal need no search.
+"""
+
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+import numpy as np
+from ..world.maze import Maze
+from .search_node import SearchNode
+from .problem import SearchProblem
+from .base_search import BaseSearch
+from .wavefront_search import UNREACHED, compute_distance_field, walk_distance_gradient
+
+
+class DistanceFieldCache:
+    """
+    LRU cache of reverse distance fields (distance from every cell to a goal cell).
+
+    Fields are keyed by (maze uid, maze version, goal cell), so a field is never reused
+    after the maze has changed. The least recently used fields are evicted once the
+    cached fields take more than ``max_bytes``.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024):
+        """Initialize an empty cache.
+
+        Args:
+            max_bytes: Memory cap for the cached fields
+        """
+        self.max_bytes = max_bytes
+        self.fields: "OrderedDict[Tuple[int, int, int], np.ndarray]" = OrderedDict()
+        self.num_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self.fields)
+
+    def get_field(self, maze: Maze, goal: int) -> Tuple[np.ndarray, bool]:
+        """Get the distance field of a goal cell, computing it on a cache miss.
+
+        Args:
+            maze: The maze the goal is in
+            goal: Cell index of the goal
+
+        Returns:
+            Tuple of (field, whether it was found in the cache)
+        """
+        key = (maze.uid, maze.version, goal)
+        field = self.fields.get(key)
+        if field is not None:
+            self.hits += 1
+            self.fields.move_to_end(key)
+            return field, True
+
+        self.misses += 1
+        field = compute_distance_field(maze, goal)
+        if field.nbytes <= self.max_bytes:
+            self.fields[key] = field
+            self.num_bytes += field.nbytes
+            while self.num_bytes > self.max_bytes:
+                _, evicted = self.fields.popitem(last=False)
+                self.num_bytes -= evicted.nbytes
+        return field, False
+
+    def clear(self):
+        self.fields.clear()
+        self.num_bytes = 0
+
+
+class DistanceFieldSearch(BaseSearch):
+    """
+    Plans by walking down the goal's cached distance field from the start.
+
+    A cache miss costs one full wavefront BFS from the goal; any later plan to the same
+    goal on the same maze is a gradient walk with no search at all.
+    """
+
+    def __init__(self, cache: Optional[DistanceFieldCache] = None):
+        super().__init__()
+        self.cache = cache if cache is not None else DistanceFieldCache()
+        self.cache_hit = False
+
+    def search(self, problem: SearchProblem) -> List[SearchNode]:
+        self.path = []
+        maze = problem.world.maze
+
+        field, self.cache_hit = self.cache.get_field(maze, problem.goal_index)
+        if not self.cache_hit:
+            problem.add_expanded_nodes(int(np.count_nonzero(field != UNREACHED)))
+
+        cells = walk_distance_gradient(maze, field, problem.initial_index)
+        if not cells:
+            return []
+
+        self.path = SearchNode.path_from_states([problem.get_state(c) for c in cells])
+        return self.path
+
+    def get_frontier_nodes(self) -> List[SearchNode]:
+        return []
+
+    def get_explored_nodes(self) -> List[SearchNode]:
+        return []
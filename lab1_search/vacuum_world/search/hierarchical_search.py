@@ -0,0 +1,392 @@
+"""
+Hierarchical pathfinding (HPA*) for large mazes.
+
+The maze is split into square clusters. Entrances are placed on the free stretches of
+every border between two neighbouring clusters, and the distances between the entrances
+of a cluster (computed by a search restricted to that cluster) form an abstract graph.
+Plans are first found on this small abstract graph, then refined into single steps one
+cluster at a time, only when the agent is about to walk that part of the plan.
+
+Reference: A. Botea, M. Müller and J. Schaeffer, "Near Optimal Hierarchical
+Path-Finding", Journal of Game Development, 2004.
+"""
+
+import heapq
+from collections import deque
+from typing import Dict, List, Optional, Set, Tuple
+from ..world.maze import Maze
+from .search_node import SearchNode
+from .problem import SearchProblem
+from .base_search import BaseSearch
+
+NO_PARENT = -1
+
+# Free stretches of a border at least this long get an entrance at both ends
+LONG_ENTRANCE_LENGTH = 6
+
+
+class ClusterGraph:
+    """
+    Abstract graph of a maze: clusters, their entrances and intra-cluster distances.
+
+    Entrances are computed for the whole maze up front. The distances between the
+    entrances of a cluster are computed the first time a plan goes through the cluster,
+    then kept until the cluster changes. ``sync`` applies the maze changes by rebuilding
+    only the borders and clusters around the changed cells.
+    """
+
+    def __init__(self, maze: Maze, cluster_size: int = 16):
+        """Build the entrances of every cluster border.
+
+        Args:
+            maze: The maze to build the abstract graph of
+            cluster_size: Width and height of a cluster, in cells
+        """
+        self.maze = maze
+        self.cluster_size = cluster_size
+        self.columns = -(-maze.width // cluster_size)
+        self.rows = -(-maze.height // cluster_size)
+        self.version = maze.version
+        maze.watch_changes(self)
+        self.num_expanded = 0
+
+        # Entrance pairs (cell in the first cluster, cell in the second) of every border
+        self.border_entrances: Dict[Tuple[int, int], List[Tuple[int, int]]] = {}
+        # Cells on the other side of the borders, for every entrance cell
+        self.transitions: Dict[int, List[int]] = {}
+        # Distances between the entrances of a cluster: {cluster: {cell: [(cell, distance)]}}
+        self.intra_edges: Dict[int, Dict[int, List[Tuple[int, int]]]] = {}
+
+        for cluster in range(self.columns * self.rows):
+            for border in self._borders(cluster):
+                if border[0] == cluster:
+                    self._build_border(border)
+
+    def cluster_of(self, cell: int) -> int:
+        width = self.maze.width
+        return (cell // width // self.cluster_size) * self.columns + (
+            cell % width // self.cluster_size
+        )
+
+    def _bounds(self, cluster: int) -> Tuple[int, int, int, int]:
+        """Get the (x0, y0, x1, y1) cell bounds of a cluster, x1 and y1 excluded."""
+        x0 = (cluster % self.columns) * self.cluster_size
+        y0 = (cluster // self.columns) * self.cluster_size
+        return (
+            x0,
+            y0,
+            min(x0 + self.cluster_size, self.maze.width),
+            min(y0 + self.cluster_size, self.maze.height),
+        )
+
+    def _borders(self, cluster: int) -> List[Tuple[int, int]]:
+        """Get the borders of a cluster, as (cluster, neighbour) pairs in index order."""
+        column, row = cluster % self.columns, cluster // self.columns
+        borders = []
+        if column > 0:
+            borders.append((cluster - 1, cluster))
+        if column < self.columns - 1:
+            borders.append((cluster, cluster + 1))
+        if row > 0:
+            borders.append((cluster - self.columns, cluster))
+        if row < self.rows - 1:
+            borders.append((cluster, cluster + self.columns))
+        return borders
+
+    def _build_border(self, border: Tuple[int, int]):
+        """(Re)compute the entrances on the border between two neighbouring clusters."""
+        for first, second in self.border_entrances.pop(border, []):
+            self.transitions[first].remove(second)
+            self.transitions[second].remove(first)
+
+        grid = self.maze.grid
+        width = self.maze.width
+        x0, y0, x1, y1 = self._bounds(border[0])
+        if border[1] == border[0] + 1:
+            # Vertical border: pairs of horizontally adjacent cells
+            pairs = [(y * width + x1 - 1, y * width + x1) for y in range(y0, y1)]
+        else:
+            # Horizontal border: pairs of vertically adjacent cells
+            pairs = [((y1 - 1) * width + x, y1 * width + x) for x in range(x0, x1)]
+
+        entrances = []
+        run: List[Tuple[int, int]] = []
+        for pair in pairs + [None]:
+            if pair is not None and not grid[pair[0]] and not grid[pair[1]]:
+                run.append(pair)
+                continue
+            if len(run) >= LONG_ENTRANCE_LENGTH:
+                entrances += [run[0], run[-1]]
+            elif run:
+                entrances.append(run[len(run) // 2])
+            run = []
+
+        self.border_entrances[border] = entrances
+        for first, second in entrances:
+            self.transitions.setdefault(first, []).append(second)
+            self.transitions.setdefault(second, []).append(first)
+
+    def sync(self):
+        """Apply the maze changes made since the graph was built or last synced."""
+        if self.maze.version == self.version:
+            return
+
+        changes = self.maze.get_changes_since(self.version, self)
+        changed_clusters = {self.cluster_of(cell) for cell in changes}
+        for cluster in changed_clusters:
+            self.intra_edges.pop(cluster, None)
+            for border in self._borders(cluster):
+                self._build_border(border)
+                # The entrances of the neighbour may have changed as well
+                self.intra_edges.pop(border[0] if border[1] == cluster else border[1], None)
+
+        self.version = self.maze.version
+
+    def get_entrances(self, cluster: int) -> Set[int]:
+        entrances = set()
+        for border in self._borders(cluster):
+            side = 0 if border[0] == cluster else 1
+            entrances.update(pair[side] for pair in self.border_entrances[border])
+        return entrances
+
+    def cluster_search(self, source: int, target: int = NO_PARENT) -> Dict[int, int]:
+        """Breadth-first search from a cell, without leaving its cluster.
+
+        Args:
+            source: Cell index to search from
+            target: Optional cell index at which to stop the search
+
+        Returns:
+            Dict of parent cell for every reached cell (NO_PARENT for the source)
+        """
+        x0, y0, x1, y1 = self._bounds(self.cluster_of(source))
+        width = self.maze.width
+        parents = {source: NO_PARENT}
+        queue = deque([source])
+
+        while queue:
+            cell = queue.popleft()
+            self.num_expanded += 1
+            if cell == target:
+                break
+            for child in self.maze.get_successor_indices(cell):
+                if child in parents:
+                    continue
+                x, y = child % width, child // width
+                if x0 <= x < x1 and y0 <= y < y1:
+                    parents[child] = cell
+                    queue.append(child)
+
+        return parents
+
+    def cluster_distances(self, source: int) -> Dict[int, int]:
+        """Get the distances from a cell to all cells of its cluster reachable within it."""
+        x0, y0, x1, y1 = self._bounds(self.cluster_of(source))
+        width = self.maze.width
+        get_successor_indices = self.maze.get_successor_indices
+        distances = {source: 0}
+        layer = [source]
+        distance = 0
+
+        while layer:
+            self.num_expanded += len(layer)
+            distance += 1
+            next_layer = []
+            for cell in layer:
+                for child in get_successor_indices(cell):
+                    if child in distances:
+                        continue
+                    if x0 <= child % width < x1 and y0 <= child // width < y1:
+                        distances[child] = distance
+                        next_layer.append(child)
+            layer = next_layer
+
+        return distances
+
+    def get_intra_edges(self, cluster: int) -> Dict[int, List[Tuple[int, int]]]:
+        """Get the distances between the entrances of a cluster, computing them if needed."""
+        edges = self.intra_edges.get(cluster)
+        if edges is None:
+            entrances = self.get_entrances(cluster)
+            edges = {}
+            for entrance in entrances:
+                distances = self.cluster_distances(entrance)
+                edges[entrance] = [
+                    (other, distances[other])
+                    for other in entrances
+                    if other != entrance and other in distances
+                ]
+            self.intra_edges[cluster] = edges
+        return edges
+
+    def find_abstract_path(self, start: int, goal: int) -> Tuple[List[int], int]:
+        """A* on the abstract graph, with the start and goal cells inserted temporarily.
+
+        Returns:
+            Cells of the abstract path from start to goal, empty if there is none, and its
+            length in steps (also the length of the refined path)
+        """
+        width = self.maze.width
+        goal_x, goal_y = goal % width, goal // width
+        goal_cluster = self.cluster_of(goal)
+        goal_distances = self.cluster_distances(goal)
+
+        start_distances = self.cluster_distances(start)
+        start_cluster = self.cluster_of(start)
+        start_edges = [
+            (entrance, start_distances[entrance])
+            for entrance in self.get_entrances(start_cluster)
+            if entrance in start_distances
+        ]
+        if goal in start_distances:
+            start_edges.append((goal, start_distances[goal]))
+
+        best_g = {start: 0}
+        parents = {start: NO_PARENT}
+        closed = set()
+        h = abs(start % width - goal_x) + abs(start // width - goal_y)
+        open_list = [(h, h, start, 0)]
+
+        while open_list:
+            _, _, cell, g = heapq.heappop(open_list)
+            if cell in closed or g != best_g[cell]:
+                continue
+            closed.add(cell)
+            self.num_expanded += 1
+
+            if cell == goal:
+                path = []
+                while cell != NO_PARENT:
+                    path.append(cell)
+                    cell = parents[cell]
+                path.reverse()
+                return path, g
+
+            edges = [(other, 1) for other in self.transitions.get(cell, [])]
+            if cell == start:
+                edges += start_edges
+            else:
+                cluster = self.cluster_of(cell)
+                edges += self.get_intra_edges(cluster).get(cell, [])
+                if cluster == goal_cluster and cell in goal_distances:
+                    edges.append((goal, goal_distances[cell]))
+
+            for child, distance in edges:
+                child_g = g + distance
+                if child in closed or child_g >= best_g.get(child, child_g + 1):
+                    continue
+                best_g[child] = child_g
+                parents[child] = cell
+                h = abs(child % width - goal_x) + abs(child // width - goal_y)
+                heapq.heappush(open_list, (child_g + h, h, child, child_g))
+
+        return [], 0
+
+    def refine(self, source: int, target: int) -> List[int]:
+        """Turn an abstract edge into single steps.
+
+        Returns:
+            Cells after the source up to and including the target
+        """
+        if self.cluster_of(source) != self.cluster_of(target):
+            # Transition between two neighbouring clusters
+            return [target]
+
+        parents = self.cluster_search(source, target)
+        cells = []
+        cell = target
+        while cell != source:
+            cells.append(cell)
+            cell = parents[cell]
+        cells.reverse()
+        return cells
+
+
+class HierarchicalSearch(BaseSearch):
+    """
+    HPA* search, keeping its cluster graph for all plans on the same maze.
+
+    ``search`` only returns the path up to the first cluster transition (or to the goal).
+    When the agent has walked it, searching again from the end of that path to the same
+    goal refines the next part of the abstract path, without a new abstract search; such
+    a search sets ``continues_plan``, and get_plan_length gives the length of the whole
+    refined path. Paths are near-optimal: they go through the entrances chosen on the
+    cluster borders.
+    """
+
+    def __init__(self, cluster_size: int = 16):
+        super().__init__()
+        self.cluster_size = cluster_size
+        self.graph: Optional[ClusterGraph] = None
+        self._problem: Optional[SearchProblem] = None
+        # Abstract path still to be refined, and what it was planned for
+        self.waypoints: List[int] = []
+        self._next_waypoint = 0
+        # Number of cells of the whole refined path
+        self._plan_length = 0
+        self._plan_key: Tuple[int, int] = (NO_PARENT, NO_PARENT)
+
+    def get_graph(self, maze: Maze) -> ClusterGraph:
+        """Get the cluster graph of a maze, building or syncing it as needed."""
+        if self.graph is None or self.graph.maze is not maze:
+            self.graph = ClusterGraph(maze, self.cluster_size)
+        else:
+            self.graph.sync()
+        return self.graph
+
+    def search(self, problem: SearchProblem) -> List[SearchNode]:
+        self.path = []
+        self._problem = problem
+        maze = problem.world.maze
+        graph = self.get_graph(maze)
+        graph.num_expanded = 0
+
+        start = problem.initial_index
+        goal = problem.goal_index
+        plan_key = (goal, maze.version)
+
+        self.continues_plan = (
+            plan_key == self._plan_key
+            and self._next_waypoint < len(self.waypoints) - 1
+            and self.waypoints[self._next_waypoint] == start
+        )
+        if not self.continues_plan:
+            self.waypoints, steps = graph.find_abstract_path(start, goal)
+            self._plan_length = steps + 1 if self.waypoints else 0
+            self._next_waypoint = 0
+            self._plan_key = plan_key
+            self.explored = list(self.waypoints)
+
+        if not self.waypoints:
+            problem.add_expanded_nodes(graph.num_expanded)
+            return []
+
+        # Refine the abstract path up to the next cluster transition
+        cells = [start]
+        while self._next_waypoint < len(self.waypoints) - 1:
+            source = self.waypoints[self._next_waypoint]
+            target = self.waypoints[self._next_waypoint + 1]
+            self._next_waypoint += 1
+            cells += graph.refine(source, target)
+            if graph.cluster_of(source) != graph.cluster_of(target):
+                break
+
+        problem.add_expanded_nodes(graph.num_expanded)
+        self.path = SearchNode.path_from_states([problem.get_state(c) for c in cells])
+        return self.path
+
+    def get_plan_length(self) -> int:
+        return self._plan_length
+
+    def _make_node(self, cell: int) -> SearchNode:
+        return SearchNode(self._problem.get_state(cell), None, None, 0.0)
+
+    def get_frontier_nodes(self) -> List[SearchNode]:
+        if self._problem is None:
+            return []
+        return [self._make_node(cell) for cell in self.waypoints[self._next_waypoint:]]
+
+    def get_explored_nodes(self) -> List[SearchNode]:
+        if self._problem is None:
+            return []
+        return [self._make_node(cell) for cell in self.explored]
@@ -0,0 +1,318 @@
+"""
+Jump Point Search for the 4-connected vacuum world grid.
+
+On open uniform-cost grids, many shortest paths are symmetric permutations of the same
+moves. JPS only expands the "jump points" where a shortest path may need to turn, and
+skips over the straight runs in between.
+
+With 4-connected moves, paths are made canonical by always moving vertically before
+horizontally when both orders are possible:
+
+- A horizontal run only stops at the goal or at a cell with a forced vertical neighbour
+  (free above/below while the cell above/below the previous one is a wall).
+- A vertical run stops at the goal or at any cell from which a horizontal run finds a
+  jump point.
+
+Scanning the runs cell by cell makes a vertical run cost a horizontal scan per cell, so
+the stops that do not depend on the goal are precomputed for every cell (as in JPS+), and
+a run only has to check the one cell it crosses on the goal's row.
+"""
+
+import heapq
+import weakref
+from array import array
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from ..world.maze import FREE, Maze
+from .search_node import SearchNode
+from .problem import SearchProblem
+from .base_search import BaseSearch
+
+NO_PARENT = -1
+
+
+def _to_array(values: np.ndarray) -> array:
+    table = array('i')
+    table.frombytes(values.astype(np.int32).reshape(-1).tobytes())
+    return table
+
+
+class JumpTable:
+    """
+    The first stop of the straight run from every cell in each direction, goal aside.
+
+    A run stops at a wall or at a static jump point: a forced neighbour for horizontal
+    runs, a cell with a horizontal jump point for vertical runs. The table is valid for
+    the maze version it was built on.
+    """
+
+    def __init__(self, maze: Maze):
+        self.version = maze.version
+        self.grid = maze.grid
+        self.width = width = maze.width
+        wall = maze.as_array() != FREE
+        height = maze.height
+        cells = np.arange(width * height, dtype=np.int64).reshape(height, width)
+
+        # Walls above and below each cell (outside the grid counts as walls)
+        wall_up = np.ones_like(wall)
+        wall_up[1:] = wall[:-1]
+        wall_down = np.ones_like(wall)
+        wall_down[:-1] = wall[1:]
+
+        # A horizontal run stops at a free cell above/below while the one behind is a wall
+        stops_right = wall.copy()
+        stops_right[:, 1:] |= ((~wall_up[:, 1:] & wall_up[:, :-1])
+                               | (~wall_down[:, 1:] & wall_down[:, :-1]))
+        stops_left = wall.copy()
+        stops_left[:, :-1] |= ((~wall_up[:, :-1] & wall_up[:, 1:])
+                               | (~wall_down[:, :-1] & wall_down[:, 1:]))
+
+        # Cells past the border keep themselves, runs never start on the border walls
+        right = cells.copy()
+        nearest = np.minimum.accumulate(np.where(stops_right, cells, cells.size)[:, ::-1],
+                                        axis=1)[:, ::-1]
+        right[:, :-1] = nearest[:, 1:]
+        left = cells.copy()
+        nearest = np.maximum.accumulate(np.where(stops_left, cells, -1), axis=1)
+        left[:, 1:] = nearest[:, :-1]
+
+        flat_wall = wall.reshape(-1)
+        has_jump_point = ~flat_wall[right] | ~flat_wall[left]
+        stops_vertical = wall | has_jump_point
+
+        down = cells.copy()
+        nearest = np.minimum.accumulate(np.where(stops_vertical, cells, cells.size)[::-1],
+                                        axis=0)[::-1]
+        down[:-1] = nearest[1:]
+        up = cells.copy()
+        nearest = np.maximum.accumulate(np.where(stops_vertical, cells, -1), axis=0)
+        up[1:] = nearest[:-1]
+
+        self.right = _to_array(right)
+        self.left = _to_array(left)
+        self.down = _to_array(down)
+        self.up = _to_array(up)
+
+    def jump_horizontal(self, cell: int, step: int, goal: int) -> int:
+        stop = (self.right if step == 1 else self.left)[cell]
+        if (goal // self.width == cell // self.width
+                and 0 < (goal - cell) * step <= (stop - cell) * step):
+            return goal
+        return NO_PARENT if self.grid[stop] else stop
+
+    def jump_vertical(self, cell: int, step: int, goal: int) -> int:
+        stop = (self.down if step > 0 else self.up)[cell]
+        # The cell crossed on the goal's row stops the run if a horizontal run reaches the goal
+        width = self.width
+        crossed = goal - goal % width + cell % width
+        if 0 < (crossed - cell) * step and 0 < (stop - crossed) * step:
+            if crossed == goal or self.jump_horizontal(
+                crossed, 1 if goal > crossed else -1, goal
+            ) == goal:
+                return crossed
+        return NO_PARENT if self.grid[stop] else stop
+
+
+# Jump tables of the mazes searched so far, rebuilt when their version changes
+_jump_tables: "weakref.WeakKeyDictionary[Maze, JumpTable]" = weakref.WeakKeyDictionary()
+
+
+def get_jump_table(maze: Maze) -> Optional[JumpTable]:
+    """
+    Get the jump table of a maze, building it if needed.
+
+    Returns:
+        The table, or None for mazes that cannot give their whole grid (TiledMaze),
+        whose runs are then scanned
+    """
+    table = _jump_tables.get(maze)
+    if table is None or table.version != maze.version:
+        try:
+            table = JumpTable(maze)
+        except TypeError:
+            return None
+        _jump_tables[maze] = table
+    return table
+
+
+class JumpPointSearch(BaseSearch):
+    """
+    A* over jump points, working on maze cell indices.
+
+    The maze border must be walls (every generator guarantees it), so runs always stop
+    inside the grid. ``explored`` holds the expanded jump points and ``frontier`` the
+    heap entries; the returned path is expanded back to one node per cell.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._problem: Optional[SearchProblem] = None
+        self.best_g: Dict[int, int] = {}
+
+    def search(self, problem: SearchProblem) -> List[SearchNode]:
+        self.path = []
+        self.frontier = []
+        self.explored = []
+        self._problem = problem
+
+        maze = problem.world.maze
+        self._grid = maze.grid
+        self._width = width = maze.width
+        self._goal = goal = problem.goal_index
+        goal_x, goal_y = goal % width, goal // width
+        self._table = get_jump_table(maze)
+
+        start = problem.initial_index
+        self.best_g = best_g = {start: 0}
+        parents = {start: NO_PARENT}
+        closed = maze.acquire_cell_marks()
+        metrics = problem.metrics
+
+        # Entries are (f, h, cell, g, direction), direction 0 meaning "any"
+        h = abs(start % width - goal_x) + abs(start // width - goal_y)
+        metrics.heuristic_evaluations += 1
+        heapq.heappush(self.frontier, (h, h, start, 0, 0))
+
+        try:
+            while self.frontier:
+                _, _, cell, g, direction = heapq.heappop(self.frontier)
+                if closed[cell] or g != best_g[cell]:
+                    continue
+                closed[cell] = 1
+                self.explored.append(cell)
+
+                if cell == goal:
+                    self.path = self._build_path(cell, parents)
+                    return self.path
+
+                successors = self._jump_successors(cell, direction)
+                problem.add_expanded_nodes(len(successors), expansions=1)
+
+                for jump_point, step, distance in successors:
+                    if closed[jump_point]:
+                        metrics.duplicates += 1
+                        continue
+                    child_g = g + distance
+                    known_g = best_g.get(jump_point)
+                    if known_g is not None and known_g <= child_g:
+                        metrics.duplicates += 1
+                        continue
+                    best_g[jump_point] = child_g
+                    parents[jump_point] = cell
+                    h = abs(jump_point % width - goal_x) + abs(jump_point // width - goal_y)
+                    metrics.heuristic_evaluations += 1
+                    heapq.heappush(self.frontier, (child_g + h, h, jump_point, child_g, step))
+
+            return []
+        finally:
+            # Closed cells all have a best cost
+            maze.release_cell_marks(closed, best_g)
+
+    def _jump_successors(self, cell: int, direction: int) -> List[Tuple[int, int, int]]:
+        """
+        Get the jump points reachable from a cell, given the step it was reached with.
+
+        Returns:
+            List of (jump point, step, distance) tuples, ``step`` being the index offset
+            of the move that leads to the jump point
+        """
+        grid = self._grid
+        width = self._width
+
+        if direction == 0:
+            steps = [-width, width, 1, -1]
+        elif direction in (width, -width):
+            # Vertical moves may always turn horizontally
+            steps = [direction, 1, -1]
+        else:
+            # Horizontal moves only turn at forced neighbours
+            steps = [direction]
+            for vertical in (-width, width):
+                if not grid[cell + vertical] and grid[cell - direction + vertical]:
+                    steps.append(vertical)
+
+        table = self._table
+        successors = []
+        for step in steps:
+            if table is not None:
+                if step in (1, -1):
+                    jump_point = table.jump_horizontal(cell, step, self._goal)
+                else:
+                    jump_point = table.jump_vertical(cell, step, self._goal)
+            elif step in (1, -1):
+                jump_point = self._jump_horizontal(cell, step)
+            else:
+                jump_point = self._jump_vertical(cell, step)
+            if jump_point != NO_PARENT:
+                distance = abs(jump_point - cell)
+                if step not in (1, -1):
+                    distance //= width
+                successors.append((jump_point, step, distance))
+
+        return successors
+
+    def _jump_horizontal(self, cell: int, step: int) -> int:
+        grid = self._grid
+        width = self._width
+        goal = self._goal
+
+        while True:
+            cell += step
+            if grid[cell]:
+                return NO_PARENT
+            if cell == goal:
+                return cell
+            # Forced neighbour: free above/below while the cell behind it is a wall
+            if (not grid[cell - width] and grid[cell - step - width]) or (
+                not grid[cell + width] and grid[cell - step + width]
+            ):
+                return cell
+
+    def _jump_vertical(self, cell: int, step: int) -> int:
+        grid = self._grid
+        goal = self._goal
+
+        while True:
+            cell += step
+            if grid[cell]:
+                return NO_PARENT
+            if cell == goal:
+                return cell
+            if (
+                self._jump_horizontal(cell, 1) != NO_PARENT
+                or self._jump_horizontal(cell, -1) != NO_PARENT
+            ):
+                return cell
+
+    def _build_path(self, cell: int, parents: Dict[int, int]) -> List[SearchNode]:
+        jump_points = []
+        while cell != NO_PARENT:
+            jump_points.append(cell)
+            cell = parents[cell]
+        jump_points.reverse()
+
+        # Expand the straight runs between jump points into single steps
+        width = self._width
+        cells = [jump_points[0]]
+        for source, target in zip(jump_points, jump_points[1:]):
+            if source // width == target // width:
+                step = 1 if target > source else -1
+            else:
+                step = width if target > source else -width
+            cells.extend(range(source + step, target + step, step))
+
+        return SearchNode.path_from_states([self._problem.get_state(c) for c in cells])
+
+    def _make_node(self, cell: int) -> SearchNode:
+        return SearchNode(self._problem.get_state(cell), None, None, self.best_g[cell])
+
+    def get_frontier_nodes(self) -> List[SearchNode]:
+        if self._problem is None:
+            return []
+        return [self._make_node(cell) for _, _, cell, _, _ in self.frontier]
+
+    def get_explored_nodes(self) -> List[SearchNode]:
+        if self._problem is None:
+            return []
+        return [self._make_node(cell) for cell in self.explored]
@@ -0,0 +1,103 @@
+"""
+Measurements of search runs, and hooks to observe a search while it runs.
+"""
+
+import time
+from typing import Callable, Optional
+from ..world.grid_pos import GridPos
+
+
+class SearchMetrics:
+    """
+    Counters and timings of a search run, or totals over several runs (see add).
+
+    - ``expansions``: nodes whose successors were generated
+    - ``generated``: successor nodes generated (what the agent prints as NumExpNodes)
+    - ``duplicates``: generated nodes skipped because their state was already known
+    - ``peak_frontier`` and ``peak_explored``: largest frontier and explored sizes
+    - ``heuristic_evaluations``: heuristic values computed by informed searches
+
+    Searches that do not track a counter leave it at 0. Timings come from
+    ``time.perf_counter_ns``.
+    """
+
+    __slots__ = (
+        "expansions",
+        "generated",
+        "duplicates",
+        "peak_frontier",
+        "peak_explored",
+        "heuristic_evaluations",
+        "path_length",
+        "num_searches",
+        "start_ns",
+        "elapsed_ns",
+    )
+
+    def __init__(self):
+        self.expansions = 0
+        self.generated = 0
+        self.duplicates = 0
+        self.peak_frontier = 0
+        self.peak_explored = 0
+        self.heuristic_evaluations = 0
+        self.path_length = 0
+        self.num_searches = 0
+        self.start_ns = 0
+        self.elapsed_ns = 0
+
+    def start(self):
+        self.start_ns = time.perf_counter_ns()
+
+    def stop(self):
+        self.elapsed_ns += time.perf_counter_ns() - self.start_ns
+        self.num_searches += 1
+
+    @property
+    def elapsed_ms(self) -> float:
+        return self.elapsed_ns / 1e6
+
+    def add(self, other: "SearchMetrics"):
+        """Add the metrics of another run to these totals (peaks are maxima)."""
+        self.expansions += other.expansions
+        self.generated += other.generated
+        self.duplicates += other.duplicates
+        self.peak_frontier = max(self.peak_frontier, other.peak_frontier)
+        self.peak_explored = max(self.peak_explored, other.peak_explored)
+        self.heuristic_evaluations += other.heuristic_evaluations
+        self.path_length += other.path_length
+        self.num_searches += other.num_searches
+        self.elapsed_ns += other.elapsed_ns
+
+    def as_dict(self) -> dict:
+        result = {name: getattr(self, name) for name in self.__slots__ if name != "start_ns"}
+        result["elapsed_ms"] = self.elapsed_ms
+        return result
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={value}" for name, value in self.as_dict().items())
+        return f"SearchMetrics({fields})"
+
+
+class SearchHooks:
+    """
+    Callbacks run by a SearchProblem while a search runs.
+
+    - ``on_expand(state)``: the successors of ``state`` are generated
+    - ``on_generate(state, parent_state)``: ``state`` was generated from ``parent_state``
+    - ``on_goal(state)``: a goal test succeeded on ``state``
+
+    Hooks are called from the successor and goal test methods of the problem, so searches
+    that work on the whole grid at once (wavefront, distance fields) do not report every
+    node.
+    """
+
+    def __init__(
+        self,
+        on_expand: Optional[Callable[[GridPos], None]] = None,
+        on_generate: Optional[Callable[[GridPos, GridPos], None]] = None,
+        on_goal: Optional[Callable[[GridPos], None]] = None,
+    ):
+        self.on_expand = on_expand
+        self.on_generate = on_generate
+        self.on_goal = on_goal
@@ -0,0 +1,133 @@
+"""
+Array-backed pool of search nodes, used instead of one SearchNode object per expansion.
+"""
+
+from array import array
+from typing import Dict, List
+from .search_node import SearchNode
+from .problem import SearchProblem
+
+NO_PARENT = -1
+
+
+class NodePool:
+    """
+    Stores a search tree as parallel columns.
+
+    Node ``i`` of the pool is described by ``states[i]`` (the maze cell index of its
+    state), ``parents[i]`` (the pool index of its parent, ``NO_PARENT`` for the root) and
+    ``costs[i]`` (the path cost to reach it). The columns are preallocated and doubled
+    when full, so adding a node never allocates a Python object.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        """Initialize an empty pool.
+
+        Args:
+            capacity: Number of nodes to preallocate room for
+        """
+        capacity = max(1, capacity)
+        self.states = array("i", bytes(4 * capacity))
+        self.parents = array("i", bytes(4 * capacity))
+        self.costs = array("d", bytes(8 * capacity))
+        self.size = 0
+
+    def __len__(self) -> int:
+        return self.size
+
+    def add(self, state: int, parent: int, cost: float) -> int:
+        """Add a node to the pool.
+
+        Args:
+            state: Maze cell index of the node's state
+            parent: Pool index of the parent node (NO_PARENT for the root)
+            cost: Path cost to reach this node
+
+        Returns:
+            The pool index of the new node
+        """
+        index = self.size
+        if index == len(self.states):
+            self._grow()
+        self.states[index] = state
+        self.parents[index] = parent
+        self.costs[index] = cost
+        self.size = index + 1
+        return index
+
+    def _grow(self):
+        capacity = len(self.states)
+        self.states.frombytes(bytes(4 * capacity))
+        self.parents.frombytes(bytes(4 * capacity))
+        self.costs.frombytes(bytes(8 * capacity))
+
+    def get_path_from_root(self, node: int) -> List[int]:
+        """Backtrack through the parent column from a node to the root.
+
+        Args:
+            node: Pool index of the last node of the path
+
+        Returns:
+            Pool indices of the nodes from the root to ``node``
+        """
+        path = []
+        parents = self.parents
+
+        while node != NO_PARENT:
+            path.append(node)
+            node = parents[node]
+
+        path.reverse()
+        return path
+
+
+class NodeBuilder:
+    """
+    Lazily turns pool nodes into SearchNode objects.
+
+    Built nodes are memoized, so nodes sharing an ancestor also share its SearchNode.
+    """
+
+    def __init__(self, pool: NodePool, problem: SearchProblem):
+        self.pool = pool
+        self.problem = problem
+        self.nodes: Dict[int, SearchNode] = {}
+
+    def build(self, node: int) -> SearchNode:
+        """Get the SearchNode for a pool node, building its missing ancestors as well.
+
+        Args:
+            node: Pool index of the node
+
+        Returns:
+            The corresponding SearchNode
+        """
+        pool = self.pool
+        chain = []
+
+        while node != NO_PARENT and node not in self.nodes:
+            chain.append(node)
+            node = pool.parents[node]
+
+        parent = self.nodes.get(node)
+        for index in reversed(chain):
+            parent = SearchNode(
+                self.problem.get_state(pool.states[index]),
+                parent,
+                None,
+                pool.costs[index],
+            )
+            self.nodes[index] = parent
+
+        return parent
+
+    def build_path(self, node: int) -> List[SearchNode]:
+        """Get the SearchNode path from the root to a pool node.
+
+        Args:
+            node: Pool index of the last node of the path
+
+        Returns:
+            List of SearchNode objects from the root to ``node``
+        """
+        return [self.build(index) for index in self.pool.get_path_from_root(node)]
@@ -0,0 +1,216 @@
+"""
+Node-pool search engine.
+
+These searches behave like BreadthFirstSearch, DepthFirstSearch and AStarSearch, but keep
+their search tree in a NodePool (state, parent and cost columns) and work on maze cell
+indices. SearchNode objects are only built when the path or the frontier/explored nodes
+are requested.
+"""
+
+import heapq
+from abc import abstractmethod
+from collections import deque
+from typing import Dict, List, Optional
+from .search_node import SearchNode
+from .problem import SearchProblem
+from .base_search import BaseSearch
+from .node_pool import NO_PARENT, NodeBuilder, NodePool
+
+
+class PooledSearch(BaseSearch):
+    """
+    Base class for searches storing their tree in a NodePool.
+
+    ``frontier`` and ``explored`` hold pool indices instead of SearchNode objects.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.pool = NodePool()
+        self.goal_node = NO_PARENT
+        self._builder: Optional[NodeBuilder] = None
+
+    def search(self, problem: SearchProblem) -> List[SearchNode]:
+        maze = problem.world.maze
+        # The pool grows with the search, a small query must not pay for the whole maze
+        self.pool = NodePool()
+        self.path = []
+        self._builder = NodeBuilder(self.pool, problem)
+
+        marks = maze.acquire_cell_marks()
+        try:
+            self.goal_node = self._search(problem, marks)
+        finally:
+            # Searches only mark the states of pool nodes
+            maze.release_cell_marks(marks, self.pool.states[:len(self.pool)])
+        return self.get_path()
+
+    @abstractmethod
+    def _search(self, problem: SearchProblem, marks: bytearray) -> int:
+        """
+        Run the search, filling ``pool``, ``frontier`` and ``explored``.
+
+        Args:
+            problem: The problem to solve
+            marks: One zeroed byte per maze cell (see Maze.acquire_cell_marks), to mark
+                the states that were seen or closed
+
+        Returns:
+            Pool index of the goal node, NO_PARENT if no path exists
+        """
+        pass
+
+    def get_path(self) -> List[SearchNode]:
+        if not self.path and self.goal_node != NO_PARENT:
+            self.path = self._builder.build_path(self.goal_node)
+        return self.path
+
+    def _build_nodes(self, nodes) -> List[SearchNode]:
+        if self._builder is None:
+            return []
+        return [self._builder.build(node) for node in nodes]
+
+    def get_frontier_nodes(self) -> List[SearchNode]:
+        return self._build_nodes(self.frontier)
+
+    def get_explored_nodes(self) -> List[SearchNode]:
+        return self._build_nodes(self.explored)
+
+
+class PooledBreadthFirstSearch(PooledSearch):
+    def _search(self, problem: SearchProblem, marks: bytearray) -> int:
+        pool = self.pool
+        metrics = problem.metrics
+        self.frontier = deque()
+        self.explored = []
+
+        start = problem.initial_index
+        root = pool.add(start, NO_PARENT, 0.0)
+
+        if problem.is_goal_index(start):
+            return root
+
+        visited = marks
+        visited[start] = 1
+        self.frontier.append(root)
+        self.explored.append(root)
+
+        while self.frontier:
+            node = self.frontier.popleft()
+            cost = pool.costs[node] + 1
+
+            for child in problem.get_successor_indices(pool.states[node]):
+                if visited[child]:
+                    metrics.duplicates += 1
+                    continue
+                visited[child] = 1
+
+                child_node = pool.add(child, node, cost)
+                if problem.is_goal_index(child):
+                    return child_node
+
+                self.explored.append(child_node)
+                self.frontier.append(child_node)
+
+        return NO_PARENT
+
+
+class PooledDepthFirstSearch(PooledSearch):
+    def _search(self, problem: SearchProblem, marks: bytearray) -> int:
+        pool = self.pool
+        metrics = problem.metrics
+        self.frontier = []
+        self.explored = []
+
+        start = problem.initial_index
+        root = pool.add(start, NO_PARENT, 0.0)
+
+        if problem.is_goal_index(start):
+            return root
+
+        visited = marks
+        visited[start] = 1
+        self.frontier.append(root)
+        self.explored.append(root)
+
+        while self.frontier:
+            node = self.frontier.pop()
+            cost = pool.costs[node] + 1
+
+            for child in problem.get_successor_indices(pool.states[node]):
+                if visited[child]:
+                    metrics.duplicates += 1
+                    continue
+                visited[child] = 1
+
+                child_node = pool.add(child, node, cost)
+                if problem.is_goal_index(child):
+                    return child_node
+
+                self.explored.append(child_node)
+                self.frontier.append(child_node)
+
+        return NO_PARENT
+
+
+class PooledAStarSearch(PooledSearch):
+    """
+    A* with a Manhattan heuristic. Frontier entries are ``(f, h, node)`` tuples, so ties
+    on f are broken in favour of the node closest to the goal.
+
+    Children are only added to the pool when they improve the best known cost of their
+    cell (``best_g``), so the pool holds no node that could never be expanded.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.best_g: Dict[int, float] = {}
+
+    def _search(self, problem: SearchProblem, marks: bytearray) -> int:
+        pool = self.pool
+        metrics = problem.metrics
+        self.frontier = []
+        self.explored = []
+
+        width = problem.world.maze.width
+        goal_x = problem.goal_index % width
+        goal_y = problem.goal_index // width
+
+        start = problem.initial_index
+        root = pool.add(start, NO_PARENT, 0.0)
+        self.best_g = best_g = {start: 0.0}
+
+        if problem.is_goal_index(start):
+            return root
+
+        closed = marks
+        h = abs(start % width - goal_x) + abs(start // width - goal_y)
+        metrics.heuristic_evaluations += 1
+        heapq.heappush(self.frontier, (h, h, root))
+
+        while self.frontier:
+            _, _, node = heapq.heappop(self.frontier)
+            state = pool.states[node]
+            if closed[state]:
+                continue
+            closed[state] = 1
+            self.explored.append(node)
+
+            if problem.is_goal_index(state):
+                return node
+
+            cost = pool.costs[node] + 1
+            for child in problem.get_successor_indices(state):
+                if closed[child] or best_g.get(child, cost + 1) <= cost:
+                    metrics.duplicates += 1
+                    continue
+                best_g[child] = cost
+                h = abs(child % width - goal_x) + abs(child // width - goal_y)
+                metrics.heuristic_evaluations += 1
+                child_node = pool.add(child, node, cost)
+                heapq.heappush(self.frontier, (cost + h, h, child_node))
+
+        return NO_PARENT
+
+    def get_frontier_nodes(self) -> List[SearchNode]:
+        return self._build_nodes(node for _, _, node in self.frontier)
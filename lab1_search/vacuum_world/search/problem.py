@@ -1,26 +1,49 @@
 """
 Representation of a search problem, which contains the world, the initial state, and the goal.
 """
-from typing import List
+from typing import List, Optional, Sequence
 from ..world.grid_pos import GridPos
 from ..world.world import World
+from .metrics import SearchHooks, SearchMetrics
 
 
 class SearchProblem:
     """Search problem for navigating in the grid world."""
     
-    def __init__(self, world: World, initial_state: GridPos, goal_state: GridPos):
+    def __init__(self,
+                 world: World,
+                 initial_state: GridPos,
+                 goal_state: GridPos,
+                 hooks: Optional[SearchHooks] = None):
         """Initialize the grid search problem.
         
         Args:
             world: The world instance
             initial_state: The starting position
             goal_state: The target position
+            hooks: Callbacks to run while searching
         """
         self.world = world
         self.initial_state = initial_state
         self.goal_state = goal_state
-        self.num_expanded_nodes = 0  # A counter that is automatically managed
+        self.metrics = SearchMetrics()  # Counters that are automatically managed
+        # Search currently running on this problem (see BaseSearch.run), to sample its frontier
+        self.search = None
+        
+        # The hooked methods are only bound when hooks are installed, so that searches
+        # without hooks run the plain methods at no extra cost
+        self.hooks = hooks
+        if hooks is not None:
+            if hooks.on_expand is not None or hooks.on_generate is not None:
+                self.get_successors = self._get_successors_hooked
+                self.get_successor_indices = self._get_successor_indices_hooked
+            if hooks.on_goal is not None:
+                self.is_goal_state = self._is_goal_state_hooked
+                self.is_goal_index = self._is_goal_index_hooked
+        
+        # Index-based view of the problem, for searches working on maze cell indices
+        self.initial_index = world.maze.index_of(initial_state)
+        self.goal_index = world.maze.index_of(goal_state) if goal_state is not None else -1
     
     def get_initial_state(self) -> GridPos:
         """Get the initial state.
@@ -41,6 +64,16 @@ class SearchProblem:
         """
         return state == self.goal_state
     
+    def is_solvable(self) -> bool:
+        """Check in constant time whether the goal can be reached at all.
+        
+        Returns:
+            False if the initial state and the goal lie in different connected components
+        """
+        if self.goal_state is None:
+            return True
+        return self.world.maze.same_component(self.initial_state, self.goal_state)
+    
     def get_successors(self, state: GridPos) -> List[GridPos]:
         """Get all reachable states from the given state.
         
@@ -51,11 +84,127 @@ class SearchProblem:
             List of reachable GridPos objects
         """
         successors = self.world.maze.get_reachable_positions(state)
-        self.num_expanded_nodes += len(successors)
+        self._count_expansion(len(successors))
+        return successors
+    
+    def is_goal_index(self, index: int) -> bool:
+        """Check if a maze cell index is the goal state.
+        
+        Args:
+            index: The cell index to check
+        
+        Returns:
+            True if it's the goal state, False otherwise
+        """
+        return index == self.goal_index
+    
+    def get_successor_indices(self, index: int) -> Sequence[int]:
+        """Get the cell indices of all states reachable from the given cell index.
+        
+        This is a slice of the maze's precompiled adjacency table, so no GridPos is built.
+        
+        Args:
+            index: The current cell index
+        
+        Returns:
+            Sequence of reachable cell indices
+        """
+        successors = self.world.maze.get_successor_indices(index)
+        self._count_expansion(len(successors))
+        return successors
+    
+    def get_state(self, index: int) -> GridPos:
+        """Get the state (GridPos) of a maze cell index.
+        
+        Args:
+            index: The cell index
+        
+        Returns:
+            The corresponding GridPos
+        """
+        return self.world.maze.position_of(index)
+    
+    def add_expanded_nodes(self, count: int, expansions: int = 0):
+        """Account for nodes expanded by searches that do not go through get_successors.
+        
+        Args:
+            count: Number of nodes to add to the counter
+            expansions: Number of expansions that generated them, if the search tracks it
+        """
+        self.metrics.generated += count
+        self.metrics.expansions += expansions
+    
+    def _count_expansion(self, num_successors: int):
+        metrics = self.metrics
+        metrics.expansions += 1
+        metrics.generated += num_successors
+        
+        if self.search is not None:
+            frontier_size = self.search.frontier_size()
+            if frontier_size > metrics.peak_frontier:
+                metrics.peak_frontier = frontier_size
+    
+    def _get_successors_hooked(self, state: GridPos) -> List[GridPos]:
+        successors = type(self).get_successors(self, state)
+        self._run_expansion_hooks(state, successors)
+        return successors
+    
+    def _get_successor_indices_hooked(self, index: int) -> Sequence[int]:
+        successors = type(self).get_successor_indices(self, index)
+        if self.hooks.on_generate is not None:
+            states = [self.get_state(successor) for successor in successors]
+        else:
+            states = []
+        self._run_expansion_hooks(self.get_state(index), states)
         return successors
     
+    def _run_expansion_hooks(self, state: GridPos, successors: List[GridPos]):
+        hooks = self.hooks
+        if hooks.on_expand is not None:
+            hooks.on_expand(state)
+        if hooks.on_generate is not None:
+            for successor in successors:
+                hooks.on_generate(successor, state)
+    
+    def _is_goal_state_hooked(self, state: GridPos) -> bool:
+        is_goal = type(self).is_goal_state(self, state)
+        if is_goal:
+            self.hooks.on_goal(state)
+        return is_goal
+    
+    def _is_goal_index_hooked(self, index: int) -> bool:
+        is_goal = type(self).is_goal_index(self, index)
+        if is_goal:
+            self.hooks.on_goal(self.get_state(index))
+        return is_goal
+    
     def reset_expanded_count(self):
-        self.num_expanded_nodes = 0
+        self.metrics = SearchMetrics()
     
     def get_num_expanded_nodes(self) -> int:
-        return self.num_expanded_nodes
\ No newline at end of file
+        return self.metrics.generated
+    
+    @property
+    def num_expanded_nodes(self) -> int:
+        return self.metrics.generated
+
+
+class NearestDirtProblem(SearchProblem):
+    """
+    Multi-goal search problem: every cell with uncleaned dirt is a goal.
+    
+    An uninformed search (BFS) on this problem stops at the dirt nearest to the initial
+    state by path distance, so one search both picks the target and plans the path to it.
+    Searches that aim at ``goal_index`` (A* and the like) do not apply, there is no goal
+    state.
+    """
+    
+    def __init__(self, world: World, initial_state: GridPos,
+                 hooks: Optional[SearchHooks] = None):
+        super().__init__(world, initial_state, None, hooks)
+    
+    def is_goal_state(self, state: GridPos) -> bool:
+        return self.world.get_dirt_at_position(state) is not None
+    
+    def is_goal_index(self, index: int) -> bool:
+        return self.world.get_dirt_at_position(self.world.maze.position_of(index)) is not None
@@ -9,6 +9,8 @@ from ..world.grid_pos import GridPos
 class SearchNode:
     """Represents a node in the search tree."""
 
+    __slots__ = ("state", "parent", "cost")
+
     def __init__(
         self,
         state: GridPos,
@@ -28,6 +30,27 @@ class SearchNode:
         self.parent = parent
         self.cost = cost
 
+    @staticmethod
+    def path_from_states(states: List[GridPos], cost: float = 0.0) -> List["SearchNode"]:
+        """Build a linked path of nodes from consecutive, unit-cost states.
+
+        Args:
+            states: The states along the path, starting with the root
+            cost: The path cost of the first state
+
+        Returns:
+            List of SearchNode objects from the root to the last state
+        """
+        path = []
+        parent = None
+
+        for state in states:
+            parent = SearchNode(state, parent, None, cost)
+            path.append(parent)
+            cost += 1
+
+        return path
+
     def get_path_from_root(self) -> List["SearchNode"]:
         """Get the path from the root to this node.
 
@@ -0,0 +1,141 @@
+"""
+Vectorized (wavefront) Breadth First Search.
+
+Instead of expanding one node at a time, the whole BFS layer is expanded at once with
+NumPy array operations over the maze grid. This produces a distance field, and the path
+is recovered by walking down its gradient.
+"""
+
+from typing import List, Optional
+import numpy as np
+from ..world.maze import FREE, Maze
+from .search_node import SearchNode
+from .problem import SearchProblem
+from .base_search import BaseSearch
+
+UNREACHED = -1
+
+
+def compute_distance_field(maze: Maze, source: int, target: int = -1) -> np.ndarray:
+    """Compute the number of steps from a cell to every cell of the maze.
+
+    The unvisited cells are a boolean mask over the flattened grid, and each BFS layer is
+    expanded at once by shifting the layer's cell indices by the four neighbour offsets.
+    This relies on the maze border being walls, which every generator guarantees.
+
+    Args:
+        maze: The maze to compute the field on
+        source: Cell index the distances are measured from
+        target: If given, stop as soon as this cell index has been reached
+
+    Returns:
+        (height, width) int32 array of distances, UNREACHED for cells not reached
+    """
+    width = maze.width
+    unvisited = (maze.as_array() == FREE).reshape(-1)
+    distances = np.full(unvisited.size, UNREACHED, dtype=np.int32)
+
+    if not unvisited[source]:
+        return distances.reshape(maze.height, width)
+
+    distances[source] = 0
+    unvisited[source] = False
+    layer = np.array([source], dtype=np.int64)
+    offsets = np.array([-width, width, 1, -1], dtype=np.int64)
+    step = 0
+
+    while target < 0 or distances[target] == UNREACHED:
+        reached = (layer[:, None] + offsets).reshape(-1)
+        reached = reached[unvisited[reached]]
+        if reached.size == 0:
+            break
+
+        step += 1
+        unvisited[reached] = False
+        distances[reached] = step
+        layer = np.unique(reached)
+
+    return distances.reshape(maze.height, width)
+
+
+def walk_distance_gradient(maze: Maze, distances: np.ndarray, start: int) -> List[int]:
+    """Follow a distance field downhill from a cell to its source.
+
+    Args:
+        maze: The maze the field was computed on
+        distances: Field returned by compute_distance_field
+        start: Cell index to start walking from
+
+    Returns:
+        Cell indices from ``start`` to the source of the field, empty if ``start`` was
+        not reached by the field
+    """
+    flat = distances.reshape(-1)
+    distance = int(flat[start])
+    if distance == UNREACHED:
+        return []
+
+    cells = [start]
+    current = start
+
+    while distance > 0:
+        distance -= 1
+        for neighbor in maze.get_successor_indices(current):
+            if flat[neighbor] == distance:
+                current = neighbor
+                break
+        cells.append(current)
+
+    return cells
+
+
+class WavefrontSearch(BaseSearch):
+    """
+    Breadth First Search expanding a whole layer per step on the maze grid.
+
+    Only valid for unit step costs. ``distances`` holds the field computed by the last
+    search.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.distances: Optional[np.ndarray] = None
+        self._problem: Optional[SearchProblem] = None
+
+    def search(self, problem: SearchProblem) -> List[SearchNode]:
+        self.path = []
+        self._problem = problem
+        maze = problem.world.maze
+
+        self.distances = compute_distance_field(
+            maze, problem.initial_index, problem.goal_index
+        )
+        problem.add_expanded_nodes(int(np.count_nonzero(self.distances != UNREACHED)))
+
+        cells = walk_distance_gradient(maze, self.distances, problem.goal_index)
+        if not cells:
+            return []
+
+        cells.reverse()
+        self.path = SearchNode.path_from_states(
+            [problem.get_state(cell) for cell in cells]
+        )
+        return self.path
+
+    def _nodes_where(self, mask: np.ndarray) -> List[SearchNode]:
+        flat = self.distances.reshape(-1)
+        return [
+            SearchNode(self._problem.get_state(int(cell)), None, None, float(flat[cell]))
+            for cell in np.flatnonzero(mask)
+        ]
+
+    def get_frontier_nodes(self) -> List[SearchNode]:
+        if self.distances is None:
+            return []
+        return self._nodes_where(self.distances == self.distances.max())
+
+    def get_explored_nodes(self) -> List[SearchNode]:
+        if self.distances is None:
+            return []
+        reached = self.distances != UNREACHED
+        return self._nodes_where(reached & (self.distances < self.distances.max()))
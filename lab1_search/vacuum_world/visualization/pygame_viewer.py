@@ -4,9 +4,10 @@ PyGame-based visualization for the vacuum world.
 import pygame
 import sys
 import time
-from typing import Optional, Tuple
+from typing import List, Optional, Tuple
 from ..world.world import World
 from ..world.grid_pos import GridPos
+from ..world.changes import ChangeSet, ChangeType
 from .colors import COLORS
 
 
@@ -50,6 +51,25 @@ class PygameViewer:
         self.paused = False
         self.show_expanded = True
         self.show_path = True
+        # Cells changed since the last frame, reported by the world
+        self.dirty_cells = set()
+        # Cells of the current path, to redraw single cells without scanning the path
+        self.path_cells = set()
+        # Static maze layer, drawn once and patched when the maze changes
+        self.maze_surface: Optional[pygame.Surface] = None
+        self.maze_surface_version = 0
+        # Redraw the whole window on the next frame, not only the dirty cells
+        self.full_redraw = True
+        # Screen areas of the UI text drawn in the last frame
+        self.ui_rects = []
+        self.frame_time_ms = 0.0
+        # Cells that the dirt and agent circles reach into past their own cell, on small
+        # cells (the agent circle is the larger one)
+        center = self.cell_size // 2
+        overflow = max(0, max(4, self.cell_size // 4) - center)
+        self.overdraw_cells = (overflow + self.cell_size - 1) // self.cell_size
+        # Dirty cells whose circle appeared, moved or disappeared
+        self.circle_cells = set()
         
         # Initial simulation timing
         self.simulation_speed = 5  # Steps per second
@@ -68,21 +88,51 @@ class PygameViewer:
         screen_y = self.grid_offset_y + grid_pos.y * self.cell_size
         return (screen_x, screen_y)
     
-    def draw_grid(self):
-        for x in range(self.world.width):
+    def draw_maze_cell(self, surface: pygame.Surface, x: int, y: int):
+        """Draw the background and border of a cell to the maze surface."""
+        maze = self.world.maze
+        rect = pygame.Rect(x * self.cell_size, y * self.cell_size, self.cell_size, self.cell_size)
+        
+        # Draw cell background, reading the maze's occupancy grid directly
+        if maze.grid[y * maze.width + x]:
+            pygame.draw.rect(surface, COLORS['wall'], rect)
+        else:
+            pygame.draw.rect(surface, COLORS['floor'], rect)
+        
+        # Draw cell border
+        pygame.draw.rect(surface, COLORS['border'], rect, 1)
+    
+    def update_maze_surface(self) -> bool:
+        """Build the maze surface, or redraw the cells changed since it was drawn.
+        
+        Returns:
+            True if the surface was built from scratch
+        """
+        maze = self.world.maze
+        if self.maze_surface is None:
+            self.maze_surface = pygame.Surface((self.grid_width, self.grid_height))
             for y in range(self.world.height):
-                pos = GridPos(x, y)
-                screen_x, screen_y = self.grid_to_screen(pos)
-                rect = pygame.Rect(screen_x, screen_y, self.cell_size, self.cell_size)
-                
-                # Draw cell background
-                if self.world.maze.is_wall(pos):
-                    pygame.draw.rect(self.screen, COLORS['wall'], rect)
-                else:
-                    pygame.draw.rect(self.screen, COLORS['floor'], rect)
+                for x in range(self.world.width):
+                    self.draw_maze_cell(self.maze_surface, x, y)
+            self.maze_surface_version = maze.version
+            maze.watch_changes(self)
+            return True
+        
+        if self.maze_surface_version != maze.version:
+            for index in maze.get_changes_since(self.maze_surface_version, self):
+                self.draw_maze_cell(self.maze_surface, index % maze.width, index // maze.width)
+                self.dirty_cells.add(maze.position_of(index))
+            self.maze_surface_version = maze.version
+        return False
+    
+    def draw_grid(self):
+        self.screen.blit(self.maze_surface, (self.grid_offset_x, self.grid_offset_y))
                 
-                # Draw cell border
-                pygame.draw.rect(self.screen, COLORS['border'], rect, 1)
+    def draw_expanded_cell(self, pos: GridPos):
+        screen_x, screen_y = self.grid_to_screen(pos)
+        rect = pygame.Rect(screen_x + 2, screen_y + 2,
+                         self.cell_size - 4, self.cell_size - 4)
+        pygame.draw.rect(self.screen, COLORS['expanded'], rect)
     
     def draw_expanded_nodes(self):
         if not self.show_expanded:
@@ -90,10 +140,13 @@ class PygameViewer:
             
         for pos in self.world.expanded_nodes:
             if not self.world.maze.is_wall(pos):
-                screen_x, screen_y = self.grid_to_screen(pos)
-                rect = pygame.Rect(screen_x + 2, screen_y + 2, 
-                                 self.cell_size - 4, self.cell_size - 4)
-                pygame.draw.rect(self.screen, COLORS['expanded'], rect)
+                self.draw_expanded_cell(pos)
+    
+    def draw_path_cell(self, pos: GridPos):
+        screen_x, screen_y = self.grid_to_screen(pos)
+        rect = pygame.Rect(screen_x + 4, screen_y + 4,
+                         self.cell_size - 8, self.cell_size - 8)
+        pygame.draw.rect(self.screen, COLORS['path'], rect)
     
     def draw_path(self):
         if not self.show_path:
@@ -101,18 +154,18 @@ class PygameViewer:
             
         for pos in self.world.current_path:
             if not self.world.maze.is_wall(pos):
-                screen_x, screen_y = self.grid_to_screen(pos)
-                rect = pygame.Rect(screen_x + 4, screen_y + 4, 
-                                 self.cell_size - 8, self.cell_size - 8)
-                pygame.draw.rect(self.screen, COLORS['path'], rect)
+                self.draw_path_cell(pos)
+    
+    def draw_dirt_particle(self, pos: GridPos):
+        screen_x, screen_y = self.grid_to_screen(pos)
+        center_x = screen_x + self.cell_size // 2
+        center_y = screen_y + self.cell_size // 2
+        radius = max(3, self.cell_size // 6)
+        pygame.draw.circle(self.screen, COLORS['dirt'], (center_x, center_y), radius)
     
     def draw_dirt(self):
-        for dirt in self.world.get_all_uncleaned_dirt():
-            screen_x, screen_y = self.grid_to_screen(dirt)
-            center_x = screen_x + self.cell_size // 2
-            center_y = screen_y + self.cell_size // 2
-            radius = max(3, self.cell_size // 6)
-            pygame.draw.circle(self.screen, COLORS['dirt'], (center_x, center_y), radius)
+        for dirt in self.world.iter_uncleaned_dirt():
+            self.draw_dirt_particle(dirt)
     
     def draw_agent(self):
         if self.world.agent:
@@ -128,14 +181,78 @@ class PygameViewer:
             
             pygame.draw.circle(self.screen, color, (center_x, center_y), radius)
     
-    def draw_ui(self):
+    def draw_cell(self, pos: GridPos) -> pygame.Rect:
+        """Redraw all the layers of a single cell, in the order of a full frame.
+        
+        Returns:
+            The screen rectangle of the cell
+        """
+        screen_x, screen_y = self.grid_to_screen(pos)
+        rect = pygame.Rect(screen_x, screen_y, self.cell_size, self.cell_size)
+        reach = self.overdraw_cells
+        if reach:
+            self.screen.set_clip(rect)
+        area = rect.move(-self.grid_offset_x, -self.grid_offset_y)
+        self.screen.blit(self.maze_surface, rect, area)
+        
+        if not self.world.maze.is_wall(pos):
+            if self.show_expanded and pos in self.world.expanded_nodes:
+                self.draw_expanded_cell(pos)
+            if self.show_path and pos in self.path_cells:
+                self.draw_path_cell(pos)
+        # Circles of the neighbours may reach into the cell
+        for source in self.cells_around(pos, reach):
+            if self.world.get_dirt_at_position(source):
+                self.draw_dirt_particle(source)
+        agent = self.world.agent
+        if agent and abs(agent.x - pos.x) <= reach and abs(agent.y - pos.y) <= reach:
+            self.draw_agent()
+        
+        if reach:
+            self.screen.set_clip(None)
+        return rect
+    
+    def cells_around(self, pos: GridPos, reach: int) -> List[GridPos]:
+        """Grid positions within a Chebyshev distance of a cell, the cell included."""
+        if not reach:
+            return [pos]
+        get_position = self.world.maze.get_position
+        return [get_position(x, y)
+                for y in range(max(0, pos.y - reach), min(self.world.height, pos.y + reach + 1))
+                for x in range(max(0, pos.x - reach), min(self.world.width, pos.x + reach + 1))]
+    
+    def cells_in_rect(self, rect: pygame.Rect):
+        """Grid positions of the cells overlapping a screen rectangle."""
+        size = self.cell_size
+        first_x = max(0, (rect.left - self.grid_offset_x) // size)
+        last_x = min(self.world.width - 1, (rect.right - 1 - self.grid_offset_x) // size)
+        first_y = max(0, (rect.top - self.grid_offset_y) // size)
+        last_y = min(self.world.height - 1, (rect.bottom - 1 - self.grid_offset_y) // size)
+        get_position = self.world.maze.get_position
+        return [get_position(x, y)
+                for y in range(first_y, last_y + 1)
+                for x in range(first_x, last_x + 1)]
+    
+    def draw_ui(self) -> List[pygame.Rect]:
+        """Draw the text of the UI.
+        
+        Returns:
+            The screen rectangles covered by the text
+        """
+        rects = []
         if self.world.agent:
             info_lines = [
                 f"Agent: ({self.world.agent.x}, {self.world.agent.y})",
                 f"Dirt collected: {self.world.agent.get_dirt_collected()}",
-                f"Remaining dirt: {len(self.world.get_all_uncleaned_dirt())}",
+                f"Remaining dirt: {self.world.num_uncleaned_dirt()}",
                 f"Status: {'COMPLETED' if self.world.is_terminated() else 'RUNNING'}"
             ]
+            if self.agent is not None and hasattr(self.agent, 'metrics'):
+                metrics = self.agent.metrics
+                info_lines.append(
+                    f"Searches: {metrics.num_searches}, {metrics.elapsed_ms:.1f} ms, "
+                    f"{metrics.expansions} expanded"
+                )
             
         else:
             info_lines = ["No agent present"]
@@ -143,7 +260,7 @@ class PygameViewer:
         y_offset = 10
         for line in info_lines:
             text_surface = self.font.render(line, True, COLORS['text'])
-            self.screen.blit(text_surface, (10, y_offset))
+            rects.append(self.screen.blit(text_surface, (10, y_offset)))
             y_offset += 25
         
         # Controls
@@ -159,7 +276,7 @@ class PygameViewer:
         y_offset = self.window_height - len(controls) * 20 - 10
         for line in controls:
             text_surface = self.small_font.render(line, True, COLORS['text'])
-            self.screen.blit(text_surface, (10, y_offset))
+            rects.append(self.screen.blit(text_surface, (10, y_offset)))
             y_offset += 16
         
         # Draw mode indicators
@@ -167,10 +284,12 @@ class PygameViewer:
         if self.paused:
             mode_text.append("PAUSED")
         mode_text.append(f"Speed: {self.simulation_speed}/sec")
+        mode_text.append(f"Frame: {self.frame_time_ms:.1f} ms")
         
         for i, text in enumerate(mode_text):
             surface = self.font.render(text, True, COLORS['text'])
-            self.screen.blit(surface, (self.window_width - 200, 10 + i * 25))
+            rects.append(self.screen.blit(surface, (self.window_width - 200, 10 + i * 25)))
+        return rects
     
     def handle_events(self):
         """Handle PyGame events."""
@@ -178,6 +297,9 @@ class PygameViewer:
             if event.type == pygame.QUIT:
                 self.running = False
             
+            elif event.type == pygame.WINDOWEXPOSED:
+                self.full_redraw = True
+            
             elif event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_ESCAPE:
                     self.running = False
@@ -187,9 +309,11 @@ class PygameViewer:
 
                 elif event.key == pygame.K_e:
                     self.show_expanded = not self.show_expanded
+                    self.full_redraw = True
 
                 elif event.key == pygame.K_p:
                     self.show_path = not self.show_path
+                    self.full_redraw = True
 
                 elif event.key == pygame.K_PLUS or event.key == pygame.K_EQUALS:
                     # (Quick fix for some non-standard keyboard layouts)
@@ -203,26 +327,66 @@ class PygameViewer:
     
     def update(self):
         """Update the visualization (called by world when it changes)."""
-        # TODO: Find out where this is used
-        # This method is called by the world when it changes
-        # We don't need to do anything here as we redraw everything each frame
-        pass
+        # World.notify_observers does not say what changed, so redraw everything
+        self.full_redraw = True
+    
+    def on_world_changes(self, changes: ChangeSet):
+        """Collect the cells changed during a tick (called by World.flush_changes)."""
+        self.dirty_cells.update(changes.dirty_cells)
+        if self.overdraw_cells:
+            for change in changes:
+                if change.change_type in (ChangeType.AGENT_MOVED, ChangeType.DIRT_CLEANED):
+                    self.circle_cells.update(change.cells)
+        if ChangeType.PATH_REPLACED in changes.types():
+            self.path_cells = set(self.world.current_path)
     
     def render(self):
-        """Render one frame of the visualization."""
-        # Clear screen
-        self.screen.fill(COLORS['background'])
+        """Render one frame of the visualization.
         
-        # Draw world elements
-        self.draw_grid()
-        self.draw_expanded_nodes()
-        self.draw_path()
-        self.draw_dirt()
-        self.draw_agent()
-        self.draw_ui()
+        The static maze comes from the cached maze surface. After the first frame, only
+        the cells reported by the world and the text of the UI are redrawn and updated
+        on the display.
+        """
+        frame_start = time.perf_counter()
+        if self.update_maze_surface():
+            self.full_redraw = True
         
-        # Update display
-        pygame.display.flip()
+        if self.full_redraw:
+            # Clear screen
+            self.screen.fill(COLORS['background'])
+            
+            # Draw world elements
+            self.path_cells = set(self.world.current_path)
+            self.draw_grid()
+            self.draw_expanded_nodes()
+            self.draw_path()
+            self.draw_dirt()
+            self.draw_agent()
+            self.ui_rects = self.draw_ui()
+            
+            # Update display
+            pygame.display.flip()
+            self.full_redraw = False
+        else:
+            # Erase the text of the last frame, with the cells it was drawn over
+            dirty_rects = list(self.ui_rects)
+            for rect in self.ui_rects:
+                self.screen.fill(COLORS['background'], rect)
+                self.dirty_cells.update(self.cells_in_rect(rect))
+            
+            # The changed circles may also have covered the neighbours of their cells
+            cells = self.dirty_cells.union(*(self.cells_around(pos, self.overdraw_cells)
+                                             for pos in self.circle_cells))
+            for pos in cells:
+                dirty_rects.append(self.draw_cell(pos))
+            self.ui_rects = self.draw_ui()
+            dirty_rects.extend(self.ui_rects)
+            
+            # Update display
+            pygame.display.update(dirty_rects)
+        self.dirty_cells.clear()
+        self.circle_cells.clear()
+        self.frame_time_ms = (time.perf_counter() - frame_start) * 1000
     
     def run(self, target_fps: int = 30):
         """Run the visualization main loop.
@@ -240,6 +404,7 @@ class PygameViewer:
                 if current_time - self.last_step_time >= step_interval:
                     if not self.world.is_terminated():
                         self.agent.step(self.world)
+                        self.world.flush_changes()
                         self.last_step_time = current_time
             
             self.render()
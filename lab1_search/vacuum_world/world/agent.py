@@ -1,7 +1,8 @@
-from .grid_pos import GridPos
+from .grid_pos import GridPos, MutableGridPos
 
 
-class VacuumAgent(GridPos):
+class VacuumAgent(MutableGridPos):
+    __slots__ = ("dirt_collected",)
     
     def __init__(self, x: int, y: int):
         super().__init__(x, y)
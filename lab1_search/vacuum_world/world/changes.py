@@ -0,0 +1,51 @@
+"""
+Typed deltas of the changes of a world, collected between two notifications of its
+observers (see World.flush_changes).
+"""
+
+from enum import Enum
+from typing import Iterable, Iterator, List, Set
+from .grid_pos import GridPos
+
+
+class ChangeType(Enum):
+    AGENT_MOVED = "agent_moved"
+    DIRT_CLEANED = "dirt_cleaned"
+    WALL_CHANGED = "wall_changed"
+    PATH_REPLACED = "path_replaced"
+    EXPANDED_REPLACED = "expanded_replaced"
+
+
+class WorldChange:
+    """One change, with the cells whose appearance it changed."""
+
+    __slots__ = ("change_type", "cells")
+
+    def __init__(self, change_type: ChangeType, cells: List[GridPos]):
+        self.change_type = change_type
+        self.cells = cells
+
+    def __repr__(self) -> str:
+        return f"WorldChange({self.change_type.value}, {len(self.cells)} cells)"
+
+
+class ChangeSet:
+    """The changes since the last flush, in order, and the union of their cells."""
+
+    def __init__(self):
+        self.changes: List[WorldChange] = []
+        self.dirty_cells: Set[GridPos] = set()
+
+    def add(self, change_type: ChangeType, cells: Iterable[GridPos]):
+        cells = list(cells)
+        self.changes.append(WorldChange(change_type, cells))
+        self.dirty_cells.update(cells)
+
+    def types(self) -> Set[ChangeType]:
+        return {change.change_type for change in self.changes}
+
+    def __bool__(self) -> bool:
+        return bool(self.changes)
+
+    def __iter__(self) -> Iterator[WorldChange]:
+        return iter(self.changes)
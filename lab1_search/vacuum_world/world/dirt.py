@@ -2,6 +2,8 @@ from .grid_pos import GridPos
 
 
 class Dirt(GridPos):
+    """Dirt particle; its position is fixed, only its cleaned flag changes."""
+    __slots__ = ("cleaned",)
     
     def __init__(self, x: int, y: int):
         super().__init__(x, y)
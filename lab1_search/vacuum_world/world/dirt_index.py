@@ -0,0 +1,137 @@
+"""
+Spatial index of dirt particles for nearest-neighbour queries.
+"""
+
+import heapq
+from enum import Enum
+from typing import Dict, Iterator, List, Tuple
+from .grid_pos import GridPos
+
+
+class Metric(Enum):
+    EUCLIDEAN = "euclidean"
+    MANHATTAN = "manhattan"
+
+
+class DirtSpatialIndex:
+    """
+    Uniform grid of buckets over the positions of the dirt.
+
+    Nearest-neighbour queries visit square rings of buckets around the query position, and
+    only return a candidate once every bucket that could hold a closer particle has been
+    visited. A query therefore looks at the dirt near the answer, not at all the dirt.
+
+    Every particle gets a sequence number when it is inserted, and particles at the same
+    distance come out in sequence order, like a scan over the particles in insertion
+    order that keeps the first strictly closer one.
+    """
+
+    def __init__(self, width: int, height: int, bucket_size: int = 8):
+        self.bucket_size = bucket_size
+        self.columns = (width + bucket_size - 1) // bucket_size
+        self.rows = (height + bucket_size - 1) // bucket_size
+        # Bucket index -> {position: (sequence number, particle)}
+        self.buckets: Dict[int, Dict[GridPos, Tuple[int, GridPos]]] = {}
+        self.next_sequence = 0
+        self.size = 0
+
+    def __len__(self) -> int:
+        return self.size
+
+    def _bucket_of(self, pos: GridPos) -> int:
+        return (pos.y // self.bucket_size) * self.columns + pos.x // self.bucket_size
+
+    def insert(self, item: GridPos):
+        """Add a particle (any GridPos, e.g. Dirt), at most one per position."""
+        bucket = self.buckets.setdefault(self._bucket_of(item), {})
+        if item not in bucket:
+            bucket[item] = (self.next_sequence, item)
+            self.next_sequence += 1
+            self.size += 1
+
+    def remove(self, pos: GridPos) -> bool:
+        """Remove the particle on a position.
+
+        Returns:
+            True if there was one
+        """
+        key = self._bucket_of(pos)
+        bucket = self.buckets.get(key)
+        if bucket is None or pos not in bucket:
+            return False
+        del bucket[pos]
+        if not bucket:
+            del self.buckets[key]
+        self.size -= 1
+        return True
+
+    def iter_nearest(self, pos: GridPos, metric: Metric = Metric.EUCLIDEAN) -> Iterator[GridPos]:
+        """Iterate over the particles by increasing distance to a position.
+
+        The index must not be changed while iterating.
+        """
+        size = self.bucket_size
+        column, row = pos.x // size, pos.y // size
+        max_radius = max(column, row, self.columns - 1 - column, self.rows - 1 - row)
+        x, y = pos.x, pos.y
+        euclidean = metric == Metric.EUCLIDEAN
+
+        candidates: List[Tuple[int, int, GridPos]] = []
+        for radius in range(max_radius + 1):
+            for key in self._ring(column, row, radius):
+                bucket = self.buckets.get(key)
+                if bucket is None:
+                    continue
+                for sequence, item in bucket.values():
+                    dx = abs(item.x - x)
+                    dy = abs(item.y - y)
+                    distance = dx * dx + dy * dy if euclidean else dx + dy
+                    heapq.heappush(candidates, (distance, sequence, item))
+
+            # Any particle outside the visited square is at least this far along one axis
+            if radius < max_radius:
+                gap = min(
+                    x - (column - radius) * size + 1,
+                    (column + radius + 1) * size - x,
+                    y - (row - radius) * size + 1,
+                    (row + radius + 1) * size - y,
+                )
+                bound = gap * gap if euclidean else gap
+            else:
+                bound = None
+
+            while candidates and (bound is None or candidates[0][0] < bound):
+                yield heapq.heappop(candidates)[2]
+
+    def k_nearest(
+        self, pos: GridPos, k: int, metric: Metric = Metric.EUCLIDEAN
+    ) -> List[GridPos]:
+        """Get the k particles closest to a position, closest first."""
+        nearest = []
+        if k <= 0:
+            return nearest
+        for item in self.iter_nearest(pos, metric):
+            nearest.append(item)
+            if len(nearest) == k:
+                break
+        return nearest
+
+    def _ring(self, column: int, row: int, radius: int) -> Iterator[int]:
+        """Bucket indices on the square ring at a Chebyshev radius around a bucket."""
+        columns, rows = self.columns, self.rows
+        if radius == 0:
+            yield row * columns + column
+            return
+
+        left, right = column - radius, column + radius
+        top, bottom = row - radius, row + radius
+        first_column, last_column = max(left, 0), min(right, columns - 1)
+
+        for ring_row in (top, bottom):
+            if 0 <= ring_row < rows:
+                for ring_column in range(first_column, last_column + 1):
+                    yield ring_row * columns + ring_column
+        for ring_column in (left, right):
+            if 0 <= ring_column < columns:
+                for ring_row in range(max(top + 1, 0), min(bottom - 1, rows - 1) + 1):
+                    yield ring_row * columns + ring_column
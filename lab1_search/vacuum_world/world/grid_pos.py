@@ -6,9 +6,30 @@ from typing import Tuple
 
 
 class GridPos:
+    """
+    Immutable grid position.
+    
+    Positions use __slots__ and cache their hash, and the Maze hands out one shared
+    instance per cell (see Maze.position_of), so they must never be modified in place.
+    Objects that move around the grid derive from MutableGridPos instead.
+    """
+    __slots__ = ("x", "y", "_hash")
+    
     def __init__(self, x: int, y: int):
-        self.x = x
-        self.y = y
+        object.__setattr__(self, "x", x)
+        object.__setattr__(self, "y", y)
+        object.__setattr__(self, "_hash", hash((x, y)))
+    
+    def __setattr__(self, name, value):
+        if name in GridPos.__slots__:
+            raise AttributeError(f"{type(self).__name__} coordinates are immutable")
+        object.__setattr__(self, name, value)
+    
+    def __setstate__(self, state):
+        # Slot values are restored directly, bypassing the immutability check
+        _, slots = state
+        for name, value in slots.items():
+            object.__setattr__(self, name, value)
     
     def __eq__(self, other) -> bool:
         if not isinstance(other, GridPos):
@@ -16,7 +37,7 @@ class GridPos:
         return self.x == other.x and self.y == other.y
     
     def __hash__(self) -> int:
-        return hash((self.x, self.y))
+        return self._hash
     
     def __str__(self) -> str:
         return f"({self.x}, {self.y})"
@@ -57,4 +78,18 @@ class GridPos:
         Returns:
             Simpler tuple representation of the position
         """
-        return (self.x, self.y)
\ No newline at end of file
+        return (self.x, self.y)
+
+class MutableGridPos(GridPos):
+    """
+    Grid position whose coordinates can change (e.g. the agent).
+    
+    Mutable positions are never interned, and their hash is computed on demand.
+    """
+    __slots__ = ()
+    
+    def __setattr__(self, name, value):
+        object.__setattr__(self, name, value)
+    
+    def __hash__(self) -> int:
+        return hash((self.x, self.y))
\ No newline at end of file
@@ -1,10 +1,18 @@
 """
 Maze generation and representation for the vacuum world.
 """
+import itertools
 import random
+import weakref
+from array import array
+from bisect import bisect_right
+from collections import deque
 from enum import Enum
-from typing import List, Set
+from operator import itemgetter
+from typing import Dict, Iterable, List, MutableSequence, Optional, Sequence, Set, Tuple
+import numpy as np
 from .grid_pos import GridPos
+from . import maze_generation
 
 
 class MazeType(Enum):
@@ -15,19 +23,88 @@ class MazeType(Enum):
     MAZE_CAVES = "caves"
 
 
+FREE = 0
+WALL = 1
+
+# Version of the maze generators, to be bumped whenever a change makes them produce other
+# mazes for the same seed (cached mazes from older versions are then regenerated)
+GENERATOR_VERSION = 1
+
+_maze_ids = itertools.count()
+
+
 class Maze:
-    """Represents the maze structure of the world."""
+    """Represents the maze structure of the world.
+    
+    The maze is stored as a flat, row-major occupancy grid with one byte per cell
+    (``WALL`` or ``FREE``), so the cell (x, y) lives at index ``y * width + x``.
+    """
     
-    def __init__(self, width: int, height: int, maze_type: MazeType = MazeType.MAZE_LABYRINTH):
+    def __init__(self, width: int, height: int, maze_type: MazeType = MazeType.MAZE_LABYRINTH,
+                 connected: bool = False, rng: Optional[np.random.Generator] = None,
+                 grid: Optional[bytes] = None,
+                 tables: Optional[Tuple[Sequence[int], Sequence[int],
+                                        MutableSequence[int]]] = None):
+        """
+        Generate a maze.
+        
+        Args:
+            width: Width of the maze
+            height: Height of the maze
+            maze_type: Type of maze to generate
+            connected: Carve bridges through walls so that all free cells are connected
+            rng: If given, generate the maze with the vectorized generators of
+                maze_generation, drawing from this generator instead of the random module
+            grid: Occupancy grid (one byte per cell, row-major) to use instead of generating
+                one, e.g. when loading a cached maze
+            tables: Adjacency offsets, adjacency indices and component labels of ``grid``,
+                as built by _build_adjacency and _label_components, to use instead of
+                computing them (arrays, or int views of a mapped file, see MazeCache)
+        """
         self.width = width
         self.height = height
         self.maze_type = maze_type
-        self.walls: Set[GridPos] = set()
-        self._generate_maze()
+        self.rng = rng
+        # Identifies this maze and its current layout, e.g. for caching search results
+        self.uid = next(_maze_ids)
+        self.version = 0
+        # (version, cell index) of the runtime changes not yet seen by every reader, in
+        # version order, see set_wall and watch_changes
+        self.changes: List[Tuple[int, int]] = []
+        # Last version seen by each reader of the changes
+        self._change_readers: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+        # Changes up to this version are no longer in the log
+        self._dropped_changes_version = 0
+        # Zeroed cell marks given back by the last search, see acquire_cell_marks
+        self._spare_marks: Optional[bytearray] = None
+        self._init_cells(connected, grid, tables)
+    
+    def _init_cells(self, connected: bool, grid: Optional[bytes],
+                    tables: Optional[Tuple[Sequence[int], Sequence[int], MutableSequence[int]]]):
+        """Fill the occupancy grid, and build the tables derived from it."""
+        self.grid = bytearray(self.width * self.height)
+        # Interned positions, one shared GridPos per cell, created on first use
+        self._positions: List[Optional[GridPos]] = [None] * (self.width * self.height)
+        if grid is not None:
+            self.grid[:] = grid
+        else:
+            self._generate_maze()
+            if connected:
+                self._connect_components()
+        if tables is not None:
+            self.adjacency_offsets, self.adjacency_indices, self.components = tables
+            self._patched_rows = {}
+        else:
+            self._build_adjacency()
+            self._label_components()
+        # Labels given to the regions split off by runtime walls, distinct from all cell indices
+        self._next_component_label = self.width * self.height
     
     def _generate_maze(self):
         """Generate the maze structure based on the maze type."""
-        if self.maze_type == MazeType.MAZE_ONLY_BORDER:
+        if self.rng is not None:
+            self._generate_maze_vectorized()
+        elif self.maze_type == MazeType.MAZE_ONLY_BORDER:
             self._generate_border_only()
         elif self.maze_type == MazeType.MAZE_OFFICE:
             self._generate_office_maze()
@@ -36,15 +113,29 @@ class Maze:
         else:
             self._generate_labyrinth()
     
+    def _generate_maze_vectorized(self):
+        grid = self.as_array()
+        if self.maze_type == MazeType.MAZE_ONLY_BORDER:
+            maze_generation.generate_border_only(grid)
+        elif self.maze_type == MazeType.MAZE_OFFICE:
+            maze_generation.generate_office(grid, self.rng)
+        elif self.maze_type == MazeType.MAZE_CAVES:
+            maze_generation.generate_caves(grid, self.rng)
+        else:
+            maze_generation.generate_labyrinth(grid, self.rng)
+    
+    def _set_wall(self, x: int, y: int):
+        self.grid[y * self.width + x] = WALL
+    
     def _generate_border_only(self):
         """Generate a maze with walls only on the border."""
         for x in range(self.width):
-            self.walls.add(GridPos(x, 0))
-            self.walls.add(GridPos(x, self.height - 1))
+            self._set_wall(x, 0)
+            self._set_wall(x, self.height - 1)
         
         for y in range(self.height):
-            self.walls.add(GridPos(0, y))
-            self.walls.add(GridPos(self.width - 1, y))
+            self._set_wall(0, y)
+            self._set_wall(self.width - 1, y)
     
     def _generate_office_maze(self):
         """
@@ -60,12 +151,12 @@ class Maze:
         for x in range(room_size, self.width - room_size + 1, room_size):
             for y in range(1, self.height - 1):
                 if random.random() < WALL_CHANCE:
-                    self.walls.add(GridPos(x, y))
+                    self._set_wall(x, y)
         
         for y in range(room_size, self.height - room_size + 1, room_size):
             for x in range(1, self.width - 1):
                 if random.random() < WALL_CHANCE:
-                    self.walls.add(GridPos(x, y))
+                    self._set_wall(x, y)
     
     def _generate_labyrinth(self):
         """
@@ -79,7 +170,7 @@ class Maze:
         for x in range(2, self.width - 2):
             for y in range(2, self.height - 2):
                 if random.random() < WALL_CHANCE:
-                    self.walls.add(GridPos(x, y))
+                    self._set_wall(x, y)
     
     def _generate_caves(self):
         """
@@ -94,7 +185,7 @@ class Maze:
         for x in range(self.width):
             for y in range(self.height):
                 if random.random() < INITIAL_WALL_CHANCE:
-                    self.walls.add(GridPos(x, y))
+                    self._set_wall(x, y)
         
         for _ in range(5):
             self._cellular_automata_step(WALL_THRESHOLD)
@@ -102,69 +193,508 @@ class Maze:
         self._generate_border_only()
     
     def _cellular_automata_step(self, wall_threshold = 5):
-        new_walls = set()
+        new_grid = maze_generation.cellular_automata_step(self.as_array(), wall_threshold)
+        self.grid = bytearray(new_grid.tobytes())
+    
+    def _connect_components(self):
+        """
+        Carve minimal bridges through walls until all free cells are connected.
         
-        for x in range(1, self.width - 1):
-            for y in range(1, self.height - 1):
-                wall_neighbors = self._count_wall_neighbors(x, y)
-                
-                if wall_neighbors >= wall_threshold:
-                    new_walls.add(GridPos(x, y))
+        A 0-1 BFS grows from the first free cell: moving onto a free cell costs nothing and
+        onto an inner wall costs one carved wall. Whenever it reaches a free cell that is not
+        connected yet, the walls on the way there are carved and that cell is connected at
+        cost 0 again. This does not draw from the random module, so seeded worlds still
+        place the agent and the dirt from the same random sequence.
+        """
+        width, height = self.width, self.height
+        grid = self.grid
+        start = next((i for i, cell in enumerate(grid) if not cell), None)
+        if start is None:
+            return
+        
+        costs = [-1] * len(grid)
+        parents = [-1] * len(grid)
+        connected = bytearray(len(grid))
+        costs[start] = 0
+        connected[start] = 1
+        queue = deque([(0, start)])
+        
+        while queue:
+            cost, cell = queue.popleft()
+            if cost != costs[cell]:
+                continue
+            
+            if not grid[cell] and not connected[cell]:
+                # Reached a new free region: carve the walls on the way and connect it
+                bridge = cell
+                while not connected[bridge]:
+                    grid[bridge] = FREE
+                    connected[bridge] = 1
+                    costs[bridge] = 0
+                    queue.appendleft((0, bridge))
+                    bridge = parents[bridge]
+                continue
+            
+            x, y = cell % width, cell // width
+            for neighbor_x, neighbor_y in ((x, y - 1), (x, y + 1), (x + 1, y), (x - 1, y)):
+                if not (0 < neighbor_x < width - 1 and 0 < neighbor_y < height - 1):
+                    continue
+                neighbor = neighbor_y * width + neighbor_x
+                neighbor_cost = cost + grid[neighbor]
+                if costs[neighbor] == -1 or neighbor_cost < costs[neighbor]:
+                    costs[neighbor] = neighbor_cost
+                    parents[neighbor] = cell
+                    if grid[neighbor]:
+                        queue.append((neighbor_cost, neighbor))
+                    else:
+                        queue.appendleft((neighbor_cost, neighbor))
+    
+    def _build_adjacency(self):
+        """
+        Compile the 4-connected neighbourhood of every cell into a CSR table.
+        
+        The free neighbours of cell ``i`` are
+        ``adjacency_indices[adjacency_offsets[i]:adjacency_offsets[i + 1]]``, listed in the
+        same North, South, East, West order as ``GridPos.get_neighbors``. Wall cells have
+        empty rows.
+        """
+        width = self.width
+        num_cells = width * self.height
+        free = self.as_array() == FREE
+        cells = np.arange(num_cells, dtype=np.int64).reshape(self.height, width)
+        
+        valid = np.zeros((4, self.height, width), dtype=bool)
+        valid[0, 1:, :] = free[1:, :] & free[:-1, :]    # North
+        valid[1, :-1, :] = free[:-1, :] & free[1:, :]   # South
+        valid[2, :, :-1] = free[:, :-1] & free[:, 1:]   # East
+        valid[3, :, 1:] = free[:, 1:] & free[:, :-1]    # West
+        neighbors = np.stack([cells - width, cells + width, cells + 1, cells - 1])
+        
+        valid = valid.reshape(4, num_cells).T
+        neighbors = neighbors.reshape(4, num_cells).T
+        
+        offsets = np.zeros(num_cells + 1, dtype=np.int32)
+        np.cumsum(valid.sum(axis=1), out=offsets[1:])
+        
+        self.adjacency_offsets = array('i')
+        self.adjacency_offsets.frombytes(offsets.tobytes())
+        self.adjacency_indices = array('i')
+        self.adjacency_indices.frombytes(neighbors[valid].astype(np.int32).tobytes())
+        # Rows recomputed after runtime changes, taking precedence over the CSR table
+        self._patched_rows: Dict[int, array] = {}
+    
+    def _label_components(self):
+        """
+        Label the connected components of the free cells (vectorized union-find).
+        
+        Every edge between two free cells hooks the larger root onto the smaller one, then
+        the label forest is fully compressed; this repeats until no edge joins two roots.
+        ``components`` holds the root of each free cell, -1 for walls.
+        """
+        width = self.width
+        free = self.as_array() == FREE
+        cells = np.arange(width * self.height, dtype=np.int64).reshape(self.height, width)
+        horizontal = free[:, :-1] & free[:, 1:]
+        vertical = free[:-1, :] & free[1:, :]
+        first = np.concatenate([cells[:, :-1][horizontal], cells[:-1, :][vertical]])
+        second = np.concatenate([cells[:, 1:][horizontal], cells[1:, :][vertical]])
+        
+        labels = cells.reshape(-1).copy()
+        while len(first):
+            roots_first, roots_second = labels[first], labels[second]
+            joining = roots_first != roots_second
+            first, second = first[joining], second[joining]
+            roots_first, roots_second = roots_first[joining], roots_second[joining]
+            labels[np.maximum(roots_first, roots_second)] = np.minimum(roots_first, roots_second)
+            while True:
+                parents = labels[labels]
+                if np.array_equal(parents, labels):
+                    break
+                labels = parents
         
-        self.walls = new_walls
+        labels[~free.reshape(-1)] = -1
+        self.components = array('i')
+        self.components.frombytes(labels.astype(np.int32).tobytes())
     
-    def _count_wall_neighbors(self, x: int, y: int) -> int:
-        count = 0
+    def component_of(self, index: int) -> int:
+        """
+        Get the connected component label of a cell index (-1 for walls).
         
-        for dx in [-1, 0, 1]:
-            for dy in [-1, 0, 1]:
-                if dx == 0 and dy == 0:
+        Labels are kept up to date by set_wall, see _patch_components.
+        """
+        return self.components[index]
+    
+    def same_component(self, a: GridPos, b: GridPos) -> bool:
+        """
+        Check in constant time whether a path exists between two positions.
+        """
+        if not (self.is_valid_position(a) and self.is_valid_position(b)):
+            return False
+        return (self.component_of(a.y * self.width + a.x)
+                == self.component_of(b.y * self.width + b.x))
+    
+    def _patch_adjacency(self, index: int):
+        """
+        Recompute the adjacency rows of a changed cell and of its neighbours.
+        
+        The CSR table is rebuilt from scratch once too many rows have been patched.
+        """
+        if len(self._patched_rows) > len(self.grid) // 8:
+            self._build_adjacency()
+            return
+        
+        x, y = index % self.width, index // self.width
+        for cell_x, cell_y in ((x, y), (x, y - 1), (x, y + 1), (x + 1, y), (x - 1, y)):
+            if not (0 <= cell_x < self.width and 0 <= cell_y < self.height):
+                continue
+            row = array('i')
+            if not self.grid[cell_y * self.width + cell_x]:
+                for neighbor_x, neighbor_y in ((cell_x, cell_y - 1), (cell_x, cell_y + 1),
+                                               (cell_x + 1, cell_y), (cell_x - 1, cell_y)):
+                    neighbor = neighbor_y * self.width + neighbor_x
+                    if (0 <= neighbor_x < self.width and 0 <= neighbor_y < self.height
+                            and not self.grid[neighbor]):
+                        row.append(neighbor)
+            self._patched_rows[cell_y * self.width + cell_x] = row
+    
+    def _patch_components(self, index: int):
+        """
+        Update the component labels after a runtime change of a cell.
+        
+        A freed cell merges the components of its free neighbours: all of them but the
+        largest take its label. A new wall may split its component in up to four regions:
+        all of them but the largest get new labels. Only the smaller regions are visited.
+        """
+        components = self.components
+        x, y = index % self.width, index // self.width
+        neighbors = [neighbor_y * self.width + neighbor_x
+                     for neighbor_x, neighbor_y in ((x, y - 1), (x, y + 1), (x + 1, y), (x - 1, y))
+                     if 0 <= neighbor_x < self.width and 0 <= neighbor_y < self.height
+                     and not self.grid[neighbor_y * self.width + neighbor_x]]
+        if self.grid[index] == WALL:
+            components[index] = -1
+            if len(neighbors) > 1:
+                for region in self._explore_regions(neighbors, False)[1]:
+                    label = self._next_component_label
+                    self._next_component_label += 1
+                    for cell in region:
+                        components[cell] = label
+            return
+        
+        seeds = {}
+        for neighbor in neighbors:
+            seeds.setdefault(components[neighbor], neighbor)
+        if not seeds:
+            components[index] = self._next_component_label
+            self._next_component_label += 1
+            return
+        survivor, regions = self._explore_regions(list(seeds.values()), True)
+        label = components[survivor]
+        for region in regions:
+            for cell in region:
+                components[cell] = label
+        components[index] = label
+    
+    def _explore_regions(self, seeds: List[int],
+                         within_label: bool) -> Tuple[int, List[List[int]]]:
+        """
+        Explore the regions around some free cells in lockstep, one cell per region per
+        round, until at most one of them is still growing.
+        
+        Regions that reach each other are merged. With ``within_label``, a region only
+        spreads over the cells labelled like its seed, so distinct labels never merge.
+        
+        Returns:
+            A seed of the largest region (the one still growing, if any), and the cells of
+            each other region
+        """
+        components = self.components
+        owners = {seed: group for group, seed in enumerate(seeds)}
+        roots = list(range(len(seeds)))
+        frontiers = [deque([seed]) for seed in seeds]
+        cells = [[seed] for seed in seeds]
+        
+        def find(group: int) -> int:
+            while roots[group] != group:
+                group = roots[group]
+            return group
+        
+        active = list(range(len(seeds)))
+        while len(active) > 1:
+            for group in active:
+                group = find(group)
+                frontier = frontiers[group]
+                if not frontier:
                     continue
-                
-                neighbor_x = x + dx
-                neighbor_y = y + dy
-                
-                if (neighbor_x < 0 or neighbor_x >= self.width or 
-                    neighbor_y < 0 or neighbor_y >= self.height):
-                    count += 1
-                elif GridPos(neighbor_x, neighbor_y) in self.walls:
-                    count += 1
-        
-        return count
+                current = frontier.popleft()
+                label = components[current]
+                for neighbor in self.get_successor_indices(current):
+                    if within_label and components[neighbor] != label:
+                        continue
+                    owner = owners.get(neighbor)
+                    if owner is None:
+                        owners[neighbor] = group
+                        frontier.append(neighbor)
+                        cells[group].append(neighbor)
+                        continue
+                    owner = find(owner)
+                    if owner != group:
+                        roots[owner] = group
+                        frontier.extend(frontiers[owner])
+                        cells[group].extend(cells[owner])
+                        frontiers[owner].clear()
+                        cells[owner] = []
+            active = [group for group in {find(group) for group in active} if frontiers[group]]
+        
+        groups = [group for group in range(len(seeds)) if roots[group] == group]
+        if active:
+            survivor = active[0]
+        else:
+            survivor = max(groups, key=lambda group: len(cells[group]))
+        return seeds[survivor], [cells[group] for group in groups if group != survivor]
+    
+    def get_successor_indices(self, index: int) -> array:
+        """
+        Get the grid indices of all free cells reachable in one step from a cell index.
+        """
+        if self._patched_rows:
+            row = self._patched_rows.get(index)
+            if row is not None:
+                return row
+        offsets = self.adjacency_offsets
+        return self.adjacency_indices[offsets[index]:offsets[index + 1]]
+    
+    def position_of(self, index: int) -> GridPos:
+        """
+        Get the interned position of a cell from its index in the flat occupancy grid.
+        
+        Every call for the same cell returns the same immutable GridPos instance.
+        """
+        pos = self._positions[index]
+        if pos is None:
+            pos = GridPos(index % self.width, index // self.width)
+            self._positions[index] = pos
+        return pos
+    
+    def get_position(self, x: int, y: int) -> GridPos:
+        """
+        Get the interned position for in-bounds coordinates.
+        """
+        return self.position_of(y * self.width + x)
+    
+    def index_of(self, pos: GridPos) -> int:
+        """
+        Get the index of a position in the flat occupancy grid.
+        """
+        return pos.y * self.width + pos.x
+    
+    def is_wall_index(self, index: int) -> bool:
+        return self.grid[index] == WALL
     
     def is_wall(self, pos: GridPos) -> bool:
-        return pos in self.walls
+        if not (0 <= pos.x < self.width and 0 <= pos.y < self.height):
+            return False
+        return self.grid[pos.y * self.width + pos.x] == WALL
     
     def is_valid_position(self, pos: GridPos) -> bool:
         """
         Check if a position is valid (within bounds and not a wall).
         """
-        return (0 <= pos.x < self.width and 
-                0 <= pos.y < self.height and 
-                not self.is_wall(pos))
+        x = pos.x
+        y = pos.y
+        return (0 <= x < self.width and
+                0 <= y < self.height and
+                not self.grid[y * self.width + x])
+    
+    def is_border(self, pos: GridPos) -> bool:
+        return pos.x in (0, self.width - 1) or pos.y in (0, self.height - 1)
+    
+    def set_wall(self, pos: GridPos, wall: bool) -> bool:
+        """
+        Add or remove a wall at runtime.
+        
+        Each effective change bumps ``version`` and, while some reader watches the changes,
+        is recorded in ``changes``, so that incremental planners can repair only the
+        affected region.
+        
+        Returns:
+            True if the cell changed, False if it already was in the requested state
+        """
+        if not (0 <= pos.x < self.width and 0 <= pos.y < self.height):
+            raise ValueError(f"Position {pos} is outside the maze")
+        if not wall and self.is_border(pos):
+            raise ValueError("The walls on the border of the maze cannot be removed")
+        
+        index = pos.y * self.width + pos.x
+        value = WALL if wall else FREE
+        if self.grid[index] == value:
+            return False
+        
+        self.grid[index] = value
+        self.version += 1
+        if self._change_readers:
+            self.changes.append((self.version, index))
+        else:
+            self._dropped_changes_version = self.version
+        self._patch_adjacency(index)
+        self._patch_components(index)
+        return True
+    
+    def add_wall(self, pos: GridPos) -> bool:
+        return self.set_wall(pos, True)
+    
+    def remove_wall(self, pos: GridPos) -> bool:
+        return self.set_wall(pos, False)
+    
+    def watch_changes(self, reader: object):
+        """
+        Keep the changes made from the current version on, until reader has seen them.
+        
+        The reader is only weakly referenced: the changes are no longer kept for it once it
+        has been garbage collected.
+        """
+        self._change_readers[reader] = self.version
+    
+    def get_changes_since(self, version: int, reader: Optional[object] = None) -> List[int]:
+        """
+        Get the indices of the cells changed after a given maze version.
+        
+        Args:
+            version: Maze version the caller is up to date with
+            reader: Reader registered with watch_changes, that has now seen all the changes;
+                the changes every reader has seen are dropped from the log
+        
+        Raises:
+            ValueError: If the changes made after that version are no longer in the log
+        """
+        if version < self._dropped_changes_version:
+            raise ValueError(f"The maze changes up to version {self._dropped_changes_version} "
+                             f"are no longer kept, watch_changes must be called before them")
+        start = bisect_right(self.changes, version, key=itemgetter(0))
+        indices = [index for _, index in self.changes[start:]]
+        if reader is not None:
+            self._change_readers[reader] = self.version
+            seen = min(self._change_readers.values())
+            if seen > self._dropped_changes_version:
+                del self.changes[:bisect_right(self.changes, seen, key=itemgetter(0))]
+                self._dropped_changes_version = seen
+        return indices
+    
+    @property
+    def walls(self) -> Set[GridPos]:
+        """
+        Set of all wall positions, built from the occupancy grid (kept for compatibility).
+        """
+        return {GridPos(i % self.width, i // self.width)
+                for i, cell in enumerate(self.grid) if cell == WALL}
+    
+    def as_array(self) -> np.ndarray:
+        """
+        Get a (height, width) uint8 NumPy view of the occupancy grid.
+        
+        The view shares memory with ``grid``, so it always reflects the current maze.
+        """
+        return np.frombuffer(self.grid, dtype=np.uint8).reshape(self.height, self.width)
     
     def get_reachable_positions(self, pos: GridPos) -> List[GridPos]:
         """
         Get all reachable positions from a given position.
         """
-        reachable = []
+        if not (0 <= pos.x < self.width and 0 <= pos.y < self.height):
+            return [neighbor for neighbor in pos.get_neighbors()
+                    if self.is_valid_position(neighbor)]
         
-        for neighbor in pos.get_neighbors():
-            if self.is_valid_position(neighbor):
-                reachable.append(neighbor)
-
-        return reachable
+        position_of = self.position_of
+        return [position_of(index)
+                for index in self.get_successor_indices(pos.y * self.width + pos.x)]
+    
+    def new_cell_array(self, typecode: str, fill: int) -> array:
+        """
+        Get an array with one ``fill`` item per cell, indexed like ``grid``.
+        
+        Args:
+            typecode: Type of the items, as for ``array.array``
+            fill: Initial value of every item
+        """
+        return array(typecode, [fill]) * (self.width * self.height)
+    
+    def acquire_cell_marks(self) -> bytearray:
+        """
+        Get one zeroed byte per cell, for a search to mark the cells it has seen.
+        
+        Searches give the buffer back with release_cell_marks, and the next search on this
+        maze gets it again instead of allocating a new one.
+        """
+        marks = self._spare_marks
+        if marks is None:
+            return bytearray(self.width * self.height)
+        self._spare_marks = None
+        return marks
+    
+    def release_cell_marks(self, marks: bytearray, marked: Iterable[int]):
+        """
+        Give back a buffer of acquire_cell_marks, zeroing the cells that were marked.
+        
+        Clearing only the marked cells keeps the cost proportional to the search.
+        """
+        for index in marked:
+            marks[index] = 0
+        self._spare_marks = marks
+    
+    def get_free_indices(self) -> np.ndarray:
+        """
+        Get the cell indices of all free positions, in the order of get_all_free_positions.
+        """
+        xs, ys = np.nonzero(self.as_array().T == FREE)
+        return ys * self.width + xs
+    
+    def choose_free_cell(self) -> int:
+        """
+        Pick a random free cell with the random module.
+        
+        Picking from the free cell indices draws the same random numbers as picking from
+        get_all_free_positions(), without building a GridPos per free cell.
+        
+        Returns:
+            The cell index, -1 if the maze has no free cell
+        """
+        free_cells = self.get_free_indices()
+        if not len(free_cells):
+            return -1
+        return int(random.choice(free_cells))
+    
+    def sample_free_cells(self, count: int, exclude: int = -1) -> List[int]:
+        """
+        Pick distinct random free cells with the random module.
+        
+        random.sample only depends on the population size, so sampling positions in the
+        free cell list gives the same choice as sampling get_all_free_positions() itself.
+        
+        Args:
+            count: Number of cells to pick (fewer if there are not enough free cells)
+            exclude: Cell index that must not be picked, -1 for none
+        
+        Returns:
+            The picked cell indices
+        """
+        free_cells = self.get_free_indices()
+        if exclude != -1:
+            free_cells = free_cells[free_cells != exclude]
+        
+        count = min(count, len(free_cells))
+        return [int(index) for index in free_cells[random.sample(range(len(free_cells)), count)]]
     
     def get_all_free_positions(self) -> List[GridPos]:
         """
         Get all free (non-wall) positions in the maze.
         """
         free_positions = []
+        grid = self.grid
 
         for x in range(self.width):
             for y in range(self.height):
-                pos = GridPos(x, y)
-                if self.is_valid_position(pos):
-                    free_positions.append(pos)
+                index = y * self.width + x
+                if not grid[index]:
+                    free_positions.append(self.position_of(index))
 
         return free_positions
\ No newline at end of file
@@ -0,0 +1,169 @@
+"""
+On-disk cache of generated mazes, keyed by (maze type, size, seed, generation options).
+
+Each maze is stored in its own file with a fixed-size header, the state of the random
+module right after the maze was generated, the bit-packed occupancy grid, and the tables
+derived from the grid: the CSR adjacency table (offsets, then indices) and the component
+labels. Restoring that random state on load means the agent and the dirt are then placed
+exactly as if the maze had been generated again.
+
+The tables take most of the time of building a maze, so they are stored rather than
+recomputed on every hit. A hit maps the file copy-on-write and uses the tables in place,
+so opening a huge maze only unpacks its grid, and only the pages a search touches are
+read. The tables also take most of the space of an entry, up to about 20 bytes per cell
+against one bit for the grid.
+"""
+
+import mmap
+import os
+import random
+import struct
+import sys
+import tempfile
+from array import array
+from typing import Optional, Sequence
+import numpy as np
+from .maze import GENERATOR_VERSION, Maze, MazeType
+
+MAGIC = b"VWMAZE\x00\x00"
+FORMAT_VERSION = 3
+
+# magic, format version, generator version, width, height, seed, maze type, flags,
+# random module version, whether gauss_next is set, gauss_next
+HEADER = struct.Struct("<8sHHIIqBBBBd")
+# Mersenne Twister state of the random module: 624 words plus the position
+RANDOM_STATE_WORDS = 625
+
+FLAG_CONNECTED = 1
+FLAG_VECTORIZED = 2
+
+MAZE_TYPES = list(MazeType)
+
+
+def _tables_offset(num_cells: int) -> int:
+    """Offset of the tables in an entry: after the packed grid, aligned on 4 bytes."""
+    end = HEADER.size + RANDOM_STATE_WORDS * 4 + (num_cells + 7) // 8
+    return -(-end // 4) * 4
+
+
+def _int32_table(data: memoryview) -> Sequence[int]:
+    """View little-endian int32 values of a mapped entry as ints, in place if possible."""
+    if sys.byteorder == "little":
+        return data.cast("i")
+    values = array("i")
+    values.frombytes(np.frombuffer(data, dtype="<i4").astype(np.int32).tobytes())
+    return values
+
+
+class MazeCache:
+    """A directory of cached mazes."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def get_path(
+        self,
+        width: int,
+        height: int,
+        maze_type: MazeType,
+        seed: int,
+        connected: bool = False,
+        vectorized: bool = False,
+    ) -> str:
+        options = ("-connected" if connected else "") + ("-vectorized" if vectorized else "")
+        name = f"{maze_type.value}-{width}x{height}-{seed}{options}.maze"
+        return os.path.join(self.directory, name)
+
+    def load(
+        self,
+        width: int,
+        height: int,
+        maze_type: MazeType,
+        seed: int,
+        connected: bool = False,
+        vectorized: bool = False,
+    ) -> Optional[Maze]:
+        """Load a cached maze, and restore the random module state saved with it.
+
+        Returns:
+            The maze, or None if there is no valid entry (missing, stale or corrupt file)
+        """
+        path = self.get_path(width, height, maze_type, seed, connected, vectorized)
+        try:
+            with open(path, "rb") as file:
+                # Copy-on-write, so that runtime changes to the labels stay out of the file
+                data = memoryview(mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_COPY))
+        except (OSError, ValueError):
+            # ValueError: empty files cannot be mapped
+            return None
+
+        num_cells = width * height
+        grid_offset = HEADER.size + RANDOM_STATE_WORDS * 4
+        offsets_offset = _tables_offset(num_cells)
+        labels_offset = offsets_offset + (num_cells + 1) * 4
+        indices_offset = labels_offset + num_cells * 4
+        if len(data) < indices_offset:
+            return None
+
+        flags = (FLAG_CONNECTED if connected else 0) | (FLAG_VECTORIZED if vectorized else 0)
+        header = HEADER.unpack(data[:HEADER.size])
+        expected = (
+            MAGIC, FORMAT_VERSION, GENERATOR_VERSION, width, height, seed,
+            MAZE_TYPES.index(maze_type), flags,
+        )
+        if header[:8] != expected:
+            return None
+
+        offsets = _int32_table(data[offsets_offset:labels_offset])
+        if len(data) != indices_offset + offsets[-1] * 4:
+            return None
+        components = _int32_table(data[labels_offset:indices_offset])
+        indices = _int32_table(data[indices_offset:])
+
+        random_version, has_gauss, gauss_next = header[8:]
+        words = np.frombuffer(data[HEADER.size:grid_offset], dtype="<u4")
+        random.setstate((
+            random_version,
+            tuple(int(word) for word in words),
+            gauss_next if has_gauss else None,
+        ))
+
+        grid = np.unpackbits(np.frombuffer(data[grid_offset:offsets_offset], dtype=np.uint8),
+                             count=num_cells)
+        # The tables keep the mapping alive as long as the maze uses them
+        return Maze(width, height, maze_type, grid=grid.tobytes(),
+                    tables=(offsets, indices, components))
+
+    def save(self, maze: Maze, seed: int, connected: bool = False, vectorized: bool = False):
+        """Store a maze, with the current state of the random module.
+
+        Call this right after generating the maze, before anything else draws from the
+        random module (and before any runtime change, the tables must match the grid).
+        """
+        random_version, words, gauss_next = random.getstate()
+        flags = (FLAG_CONNECTED if connected else 0) | (FLAG_VECTORIZED if vectorized else 0)
+        header = HEADER.pack(
+            MAGIC, FORMAT_VERSION, GENERATOR_VERSION, maze.width, maze.height, seed,
+            MAZE_TYPES.index(maze.maze_type), flags, random_version,
+            gauss_next is not None, gauss_next or 0.0,
+        )
+        grid = np.frombuffer(maze.grid, dtype=np.uint8)
+
+        path = self.get_path(maze.width, maze.height, maze.maze_type, seed, connected, vectorized)
+        # Write to a temporary file first, so that readers never see a partial entry
+        handle, temporary_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(handle, "wb") as file:
+                file.write(header)
+                file.write(np.array(words, dtype="<u4").tobytes())
+                file.write(np.packbits(grid).tobytes())
+                file.write(bytes(_tables_offset(len(grid)) - file.tell()))
+                for table in (maze.adjacency_offsets, maze.components, maze.adjacency_indices):
+                    file.write(np.frombuffer(table, dtype=np.int32).astype("<i4").tobytes())
+            # mkstemp creates the file readable by its owner only
+            os.chmod(temporary_path, 0o644)
+            os.replace(temporary_path, path)
+        except BaseException:
+            os.remove(temporary_path)
+            raise
@@ -0,0 +1,93 @@
+"""
+Vectorized maze generators.
+
+These work in place on a (height, width) uint8 occupancy array (``WALL``/``FREE``, e.g.
+``Maze.as_array()``) and draw all their random numbers in bulk from a seeded
+``numpy.random.Generator``. They produce the same maze families as the cell-by-cell
+generators of Maze, but not the same mazes for a given seed, since the random numbers
+come from another generator.
+"""
+
+import numpy as np
+
+FREE = 0
+WALL = 1
+
+
+def generate_border_only(grid: np.ndarray):
+    """Put walls on the border of the grid."""
+    grid[0, :] = WALL
+    grid[-1, :] = WALL
+    grid[:, 0] = WALL
+    grid[:, -1] = WALL
+
+
+def generate_labyrinth(grid: np.ndarray, rng: np.random.Generator, wall_chance: float = 0.3):
+    """Border walls plus random walls, keeping a free ring inside the border."""
+    generate_border_only(grid)
+    height, width = grid.shape
+    if height > 4 and width > 4:
+        inner = grid[2:height - 2, 2:width - 2]
+        inner |= (rng.random(inner.shape) < wall_chance).astype(np.uint8)
+
+
+def generate_office(grid: np.ndarray, rng: np.random.Generator, wall_chance: float = 0.6):
+    """Border walls plus randomly opened walls on a regular grid of rooms."""
+    generate_border_only(grid)
+    height, width = grid.shape
+
+    room_size = min(width, height) // 4
+    if room_size == 0:
+        return
+
+    columns = np.arange(room_size, width - room_size + 1, room_size)
+    walls = grid[1:height - 1, columns]
+    grid[1:height - 1, columns] = walls | (rng.random(walls.shape) < wall_chance)
+
+    rows = np.arange(room_size, height - room_size + 1, room_size)
+    walls = grid[rows, 1:width - 1]
+    grid[rows, 1:width - 1] = walls | (rng.random(walls.shape) < wall_chance)
+
+
+def count_wall_neighbors(grid: np.ndarray) -> np.ndarray:
+    """Count the walls among the 8 neighbours of every inner cell.
+
+    Returns:
+        (height - 2, width - 2) array of counts, for the cells not on the border
+    """
+    height, width = grid.shape
+    counts = np.zeros((height - 2, width - 2), dtype=np.uint8)
+    for dy in (-1, 0, 1):
+        for dx in (-1, 0, 1):
+            if dx or dy:
+                counts += grid[1 + dy:height - 1 + dy, 1 + dx:width - 1 + dx]
+    return counts
+
+
+def cellular_automata_step(grid: np.ndarray, wall_threshold: int = 5) -> np.ndarray:
+    """One cave smoothing step: an inner cell becomes a wall if enough neighbours are walls.
+
+    Border cells are left free, as in Maze._cellular_automata_step.
+
+    Returns:
+        The new grid
+    """
+    new_grid = np.zeros_like(grid)
+    if grid.shape[0] > 2 and grid.shape[1] > 2:
+        new_grid[1:-1, 1:-1] = count_wall_neighbors(grid) >= wall_threshold
+    return new_grid
+
+
+def generate_caves(
+    grid: np.ndarray,
+    rng: np.random.Generator,
+    initial_wall_chance: float = 0.61,
+    wall_threshold: int = 5,
+    steps: int = 5,
+):
+    """Random noise smoothed into caves by a cellular automaton, then border walls."""
+    cave = (rng.random(grid.shape) < initial_wall_chance).astype(np.uint8)
+    for _ in range(steps):
+        cave = cellular_automata_step(cave, wall_threshold)
+    grid[:] = cave
+    generate_border_only(grid)
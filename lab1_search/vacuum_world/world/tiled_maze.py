@@ -0,0 +1,397 @@
+"""
+Tiled maze storage for mazes larger than memory.
+
+The cells are stored in fixed-size square tiles, one byte per cell, in a memory-mapped
+file. Tiles are read from the file on first access and kept in a small LRU cache, so only
+the parts of the maze a search actually visits are ever loaded.
+
+The file only ever holds the generated maze, and is mapped read-only once generated.
+Runtime changes (set_wall) are kept in memory and applied to the tiles as they are
+loaded, so a file can be reused as the pristine maze of its seed by any later run.
+
+Tiles are generated in parallel by a process pool. Each tile draws its random numbers
+from its own generator, seeded from the world seed and the tile index, so the maze does
+not depend on the number of workers or on the order in which tiles are generated.
+"""
+
+import os
+import random
+import struct
+from array import array
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+from .grid_pos import GridPos
+from .maze import FREE, GENERATOR_VERSION, Maze, MazeType
+from .maze_generation import cellular_automata_step
+
+TILE_SIZE = 256
+# Number of tiles kept in memory
+TILE_CACHE_SIZE = 256
+
+MAGIC = b"VWTILES\x00"
+FORMAT_VERSION = 1
+# magic, format version, generator version, width, height, tile size, seed, maze type
+HEADER = struct.Struct("<8sHHIIIqB")
+# The tiles start on a page boundary
+HEADER_SIZE = 4096
+
+MAZE_TYPES = list(MazeType)
+
+# Same parameters as the generators of Maze
+LABYRINTH_WALL_CHANCE = 0.3
+OFFICE_WALL_CHANCE = 0.6
+CAVES_INITIAL_WALL_CHANCE = 0.61
+CAVES_WALL_THRESHOLD = 5
+CAVES_STEPS = 5
+
+
+def _tile_random(seed: int, tile_index: int, shape) -> np.ndarray:
+    """Random numbers of a tile, from a generator seeded by the world seed and tile index."""
+    rng = np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(tile_index,)))
+    return rng.random(shape)
+
+
+def generate_tile(
+    width: int, height: int, tile_size: int, maze_type: MazeType, seed: int, tx: int, ty: int
+) -> np.ndarray:
+    """Generate the cells of one tile of a tiled maze.
+
+    Cells outside the maze (in the last row and column of tiles) are walls.
+
+    Returns:
+        (tile_size, tile_size) uint8 array of WALL/FREE cells
+    """
+    tiles_x = -(-width // tile_size)
+    tiles_y = -(-height // tile_size)
+    x0, y0 = tx * tile_size, ty * tile_size
+    ys, xs = np.mgrid[y0:y0 + tile_size, x0:x0 + tile_size]
+    inside = (xs < width) & (ys < height)
+    border = (xs == 0) | (ys == 0) | (xs == width - 1) | (ys == height - 1)
+    tile_index = ty * tiles_x + tx
+
+    if maze_type == MazeType.MAZE_CAVES:
+        # The cellular automaton looks at neighbouring cells, so the tile is computed with a
+        # halo taken from the noise of the neighbouring tiles. Each step spoils one more
+        # cell at the edge of the halo, so a halo of CAVES_STEPS cells keeps the tile exact.
+        halo = CAVES_STEPS
+        noise = np.ones((3 * tile_size, 3 * tile_size))
+        for dy in (-1, 0, 1):
+            for dx in (-1, 0, 1):
+                if 0 <= tx + dx < tiles_x and 0 <= ty + dy < tiles_y:
+                    noise[
+                        (dy + 1) * tile_size:(dy + 2) * tile_size,
+                        (dx + 1) * tile_size:(dx + 2) * tile_size,
+                    ] = _tile_random(seed, tile_index + dy * tiles_x + dx, (tile_size, tile_size))
+        start, end = tile_size - halo, 2 * tile_size + halo
+        cave = (noise[start:end, start:end] < CAVES_INITIAL_WALL_CHANCE).astype(np.uint8)
+
+        ys, xs = np.mgrid[y0 - halo:y0 + tile_size + halo, x0 - halo:x0 + tile_size + halo]
+        # Like Maze._cellular_automata_step, the maze border is free after every step
+        inner = (xs > 0) & (ys > 0) & (xs < width - 1) & (ys < height - 1)
+        for _ in range(CAVES_STEPS):
+            cave = cellular_automata_step(cave, CAVES_WALL_THRESHOLD)
+            cave[~inner] = FREE
+        walls = cave[halo:-halo, halo:-halo].astype(bool)
+    elif maze_type == MazeType.MAZE_OFFICE:
+        noise = _tile_random(seed, tile_index, (2, tile_size, tile_size))
+        room_size = max(1, min(width, height) // 4)
+        columns = (xs % room_size == 0) & (xs >= room_size) & (xs <= width - room_size)
+        rows = (ys % room_size == 0) & (ys >= room_size) & (ys <= height - room_size)
+        walls = (columns & (noise[0] < OFFICE_WALL_CHANCE)) | (
+            rows & (noise[1] < OFFICE_WALL_CHANCE)
+        )
+    elif maze_type == MazeType.MAZE_ONLY_BORDER:
+        walls = np.zeros((tile_size, tile_size), dtype=bool)
+    else:
+        noise = _tile_random(seed, tile_index, (tile_size, tile_size))
+        inner = (xs >= 2) & (ys >= 2) & (xs < width - 2) & (ys < height - 2)
+        walls = inner & (noise < LABYRINTH_WALL_CHANCE)
+
+    walls |= border | ~inside
+    return walls.astype(np.uint8)
+
+
+# Tile array of the file being generated, opened once per worker process
+_worker_tiles: Optional[np.memmap] = None
+
+
+def _open_worker_tiles(path: str, shape):
+    global _worker_tiles
+    _worker_tiles = np.memmap(path, dtype=np.uint8, mode="r+", offset=HEADER_SIZE, shape=shape)
+
+
+def _generate_tile_task(task):
+    width, height, tile_size, maze_type, seed, tx, ty = task
+    _worker_tiles[ty, tx] = generate_tile(width, height, tile_size, maze_type, seed, tx, ty)
+
+
+class TiledGrid:
+    """
+    Flat, row-major view of the cells of a TiledMaze, indexed like ``Maze.grid``.
+
+    Code that reads or writes ``maze.grid[y * width + x]`` works unchanged on tiled mazes.
+    """
+
+    def __init__(self, maze: "TiledMaze"):
+        self.maze = maze
+
+    def __len__(self) -> int:
+        return self.maze.width * self.maze.height
+
+    def __getitem__(self, index: int) -> int:
+        if not 0 <= index < len(self):
+            raise IndexError("cell index out of range")
+        return self.maze.get_cell(index)
+
+    def __setitem__(self, index: int, value: int):
+        if not 0 <= index < len(self):
+            raise IndexError("cell index out of range")
+        self.maze.set_cell(index, value)
+
+
+class TiledCellArray:
+    """
+    Array with one item per cell of a TiledMaze, indexed like ``Maze.grid``.
+
+    Items are stored per tile, and a tile is only allocated when one of its items is
+    written, so a search only pays for the tiles it visits.
+    """
+
+    def __init__(self, maze: "TiledMaze", typecode: str, fill: int):
+        self.maze = maze
+        self.typecode = typecode
+        self.fill = fill
+        self.tiles: Dict[int, array] = {}
+
+    def __len__(self) -> int:
+        return self.maze.width * self.maze.height
+
+    def _locate(self, index: int):
+        y, x = divmod(index, self.maze.width)
+        size = self.maze.tile_size
+        return (y // size) * self.maze.tiles_x + x // size, (y % size) * size + x % size
+
+    def __getitem__(self, index: int) -> int:
+        tile_index, offset = self._locate(index)
+        tile = self.tiles.get(tile_index)
+        return self.fill if tile is None else tile[offset]
+
+    def __setitem__(self, index: int, value: int):
+        tile_index, offset = self._locate(index)
+        tile = self.tiles.get(tile_index)
+        if tile is None:
+            tile = array(self.typecode, [self.fill]) * self.maze.tile_size ** 2
+            self.tiles[tile_index] = tile
+        tile[offset] = value
+
+
+class TiledMaze(Maze):
+    """
+    Maze whose cells live in a memory-mapped tile file instead of a bytearray.
+
+    Cell indices are the same as for Maze (``y * width + x``). There is no precompiled
+    adjacency table and no component labelling, both of which would need memory
+    proportional to the maze: successors are computed from the neighbouring cells, and
+    same_component only checks that both positions are free. Per-cell search arrays
+    (new_cell_array, acquire_cell_marks) are allocated per tile.
+
+    Searches going through get_reachable_positions or get_successor_indices work
+    unchanged. The methods that need the whole maze in memory (as_array, walls,
+    get_free_indices, get_all_free_positions) raise TypeError, so the wavefront search,
+    the distance field cache and tour planning cannot be used on tiled mazes.
+    """
+
+    def __init__(self, width: int, height: int, maze_type: MazeType, seed: int, path: str,
+                 tile_size: int = TILE_SIZE, workers: Optional[int] = None):
+        """
+        Open the tile file of a maze, generating it first if needed.
+
+        Args:
+            width: Width of the maze
+            height: Height of the maze
+            maze_type: Type of maze to generate
+            seed: Seed of the tile generators
+            path: Tile file; it is reused if it holds this very maze, regenerated otherwise
+            tile_size: Width and height of a tile, in cells
+            workers: Number of processes generating tiles (default: number of CPUs)
+        """
+        self.seed = seed
+        self.path = path
+        self.tile_size = tile_size
+        self.tiles_x = -(-width // tile_size)
+        self.tiles_y = -(-height // tile_size)
+        self.workers = workers
+        super().__init__(width, height, maze_type)
+
+    def _init_cells(self, connected: bool, grid: Optional[bytes],
+                    tables: Optional[Tuple[array, array, array]]):
+        """Open the tile file, generating it first if it does not hold this maze."""
+        self.grid = TiledGrid(self)
+        self._tile_cache: "OrderedDict[int, bytearray]" = OrderedDict()
+        # Runtime changes, never written to the file: tile index -> {offset in tile: value}
+        self._edits: Dict[int, Dict[int, int]] = {}
+
+        header = HEADER.pack(
+            MAGIC, FORMAT_VERSION, GENERATOR_VERSION, self.width, self.height,
+            self.tile_size, self.seed, MAZE_TYPES.index(self.maze_type),
+        )
+        if not self._has_header(header):
+            self._generate_tiles(header, self.workers)
+
+        self.tiles = np.memmap(self.path, dtype=np.uint8, mode="r", offset=HEADER_SIZE,
+                               shape=self._tiles_shape())
+
+    def _tiles_shape(self):
+        return (self.tiles_y, self.tiles_x, self.tile_size, self.tile_size)
+
+    def _has_header(self, header: bytes) -> bool:
+        expected_size = HEADER_SIZE + self.tiles_x * self.tiles_y * self.tile_size ** 2
+        if not os.path.exists(self.path) or os.path.getsize(self.path) != expected_size:
+            return False
+        with open(self.path, "rb") as file:
+            return file.read(len(header)) == header
+
+    def _generate_tiles(self, header: bytes, workers: Optional[int]):
+        """Generate all tiles into the file, writing the header last."""
+        with open(self.path, "wb") as file:
+            file.truncate(HEADER_SIZE + self.tiles_x * self.tiles_y * self.tile_size ** 2)
+
+        tasks = [
+            (self.width, self.height, self.tile_size, self.maze_type, self.seed, tx, ty)
+            for ty in range(self.tiles_y)
+            for tx in range(self.tiles_x)
+        ]
+        if workers == 1 or len(tasks) == 1:
+            _open_worker_tiles(self.path, self._tiles_shape())
+            for task in tasks:
+                _generate_tile_task(task)
+            _worker_tiles.flush()
+        else:
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_open_worker_tiles,
+                initargs=(self.path, self._tiles_shape()),
+            ) as pool:
+                chunk_size = max(1, len(tasks) // (4 * (workers or os.cpu_count() or 1)))
+                for _ in pool.map(_generate_tile_task, tasks, chunksize=chunk_size):
+                    pass
+
+        # Only a completely generated file gets a valid header
+        with open(self.path, "r+b") as file:
+            file.write(header)
+
+    def _get_tile(self, tile_index: int) -> bytearray:
+        tile = self._tile_cache.get(tile_index)
+        if tile is None:
+            ty, tx = divmod(tile_index, self.tiles_x)
+            tile = bytearray(self.tiles[ty, tx].tobytes())
+            for offset, value in self._edits.get(tile_index, {}).items():
+                tile[offset] = value
+            self._tile_cache[tile_index] = tile
+            if len(self._tile_cache) > TILE_CACHE_SIZE:
+                self._tile_cache.popitem(last=False)
+        else:
+            self._tile_cache.move_to_end(tile_index)
+        return tile
+
+    def get_cell(self, index: int) -> int:
+        y, x = divmod(index, self.width)
+        size = self.tile_size
+        tile = self._get_tile((y // size) * self.tiles_x + x // size)
+        return tile[(y % size) * size + x % size]
+
+    def set_cell(self, index: int, value: int):
+        y, x = divmod(index, self.width)
+        size = self.tile_size
+        tile_index = (y // size) * self.tiles_x + x // size
+        offset = (y % size) * size + x % size
+        self._edits.setdefault(tile_index, {})[offset] = value
+        if tile_index in self._tile_cache:
+            self._tile_cache[tile_index][offset] = value
+
+    def get_successor_indices(self, index: int) -> List[int]:
+        width = self.width
+        x, y = index % width, index // width
+        successors = []
+        if y > 0 and not self.get_cell(index - width):
+            successors.append(index - width)
+        if y < self.height - 1 and not self.get_cell(index + width):
+            successors.append(index + width)
+        if x < width - 1 and not self.get_cell(index + 1):
+            successors.append(index + 1)
+        if x > 0 and not self.get_cell(index - 1):
+            successors.append(index - 1)
+        return successors
+
+    def position_of(self, index: int) -> GridPos:
+        # Positions are not interned, that would need one slot per cell
+        return GridPos(index % self.width, index // self.width)
+
+    def _patch_adjacency(self, index: int):
+        # Successors are computed from the cells, there is no table to patch
+        pass
+
+    def _patch_components(self, index: int):
+        # There are no component labels to patch either, see component_of
+        pass
+
+    def component_of(self, index: int) -> int:
+        """
+        Get the component label of a cell index (-1 for walls).
+
+        Without labels, every free cell gets the same label 0: any two free cells may be
+        connected, so same_component only checks that both positions are free.
+        """
+        return -1 if self.get_cell(index) else 0
+
+    def new_cell_array(self, typecode: str, fill: int) -> TiledCellArray:
+        return TiledCellArray(self, typecode, fill)
+
+    def acquire_cell_marks(self) -> TiledCellArray:
+        # Marks are allocated per visited tile, there is no buffer worth keeping
+        return TiledCellArray(self, "B", 0)
+
+    def release_cell_marks(self, marks: TiledCellArray, marked: Iterable[int]):
+        pass
+
+    def _whole_maze_error(self, name: str) -> TypeError:
+        return TypeError(
+            f"{name} needs the whole {self.width}x{self.height} maze in memory, "
+            "which tiled mazes do not support"
+        )
+
+    def as_array(self) -> np.ndarray:
+        raise self._whole_maze_error("as_array")
+
+    @property
+    def walls(self):
+        raise self._whole_maze_error("walls")
+
+    def get_free_indices(self) -> np.ndarray:
+        raise self._whole_maze_error("get_free_indices")
+
+    def get_all_free_positions(self) -> List[GridPos]:
+        raise self._whole_maze_error("get_all_free_positions")
+
+    def choose_free_cell(self) -> int:
+        """Pick a random free cell with the random module, by rejection sampling."""
+        for _ in range(1000):
+            index = random.randrange(self.width * self.height)
+            if not self.get_cell(index):
+                return index
+        return -1
+
+    def sample_free_cells(self, count: int, exclude: int = -1) -> List[int]:
+        """Pick distinct random free cells with the random module, by rejection sampling."""
+        cells: List[int] = []
+        chosen = {exclude}
+        for _ in range(1000 + 100 * count):
+            if len(cells) == count:
+                break
+            index = random.randrange(self.width * self.height)
+            if index not in chosen and self.get_cell(index) == FREE:
+                chosen.add(index)
+                cells.append(index)
+        return cells
@@ -2,12 +2,18 @@
 Main world class that coordinates all world components.
 """
 import random
-from typing import List, Optional, Set
+from typing import Dict, Iterator, List, Optional, Set
 from enum import Enum
+import numpy as np
 from .grid_pos import GridPos
 from .maze import Maze, MazeType
+from .maze_cache import MazeCache
+from .tiled_maze import TiledMaze
 from .dirt import Dirt
+from .dirt_index import DirtSpatialIndex, Metric
+from .changes import ChangeSet, ChangeType
 from .agent import VacuumAgent
+from ..events import Level, emit
 
 
 class Action(Enum):
@@ -27,7 +33,12 @@ class World:
                  height: int = 20, 
                  num_dirt: int = 10,
                  maze_type: MazeType = MazeType.MAZE_LABYRINTH,
-                 seed: Optional[int] = None):
+                 seed: Optional[int] = None,
+                 connected: bool = False,
+                 vectorized: bool = False,
+                 cache_dir: Optional[str] = None,
+                 tiled_path: Optional[str] = None,
+                 workers: Optional[int] = None):
         """Initialize the world.
         
         Args:
@@ -36,6 +47,13 @@ class World:
             num_dirt: Number of dirt particles to place
             maze_type: Type of maze to generate
             seed: Seed for the random number generator
+            connected: Carve bridges so that every free cell can be reached
+            vectorized: Generate the maze with the NumPy generators, seeded with ``seed``
+            cache_dir: Directory of a MazeCache to load the maze from, or to store it in
+                when it is not cached yet
+            tiled_path: Store the maze in this memory-mapped tile file (see TiledMaze),
+                for mazes too large for memory; the other maze options are then ignored
+            workers: Number of processes generating the tiles of a tiled maze
         """
         # Handle random seed
         if seed is None:
@@ -45,53 +63,117 @@ class World:
             
         self.width = width
         self.height = height
-        self.maze = Maze(width, height, maze_type)
+        self.maze = None
+        cache = MazeCache(cache_dir) if cache_dir is not None else None
+        if tiled_path is not None:
+            self.maze = TiledMaze(width, height, maze_type, seed, tiled_path, workers=workers)
+        elif cache is not None:
+            self.maze = cache.load(width, height, maze_type, seed, connected, vectorized)
+        if self.maze is None:
+            rng = np.random.default_rng(seed) if vectorized else None
+            self.maze = Maze(width, height, maze_type, connected, rng)
+            if cache is not None:
+                cache.save(self.maze, seed, connected, vectorized)
         self.dirt_particles: Set[Dirt] = set()
+        # Dirt by position, and the dirt still to clean, kept up to date by add_dirt and
+        # suck_dirt so that the queries of every step take constant time
+        self._dirt_index: Dict[GridPos, Dirt] = {}
+        self._uncleaned_dirt: Set[Dirt] = set()
+        # Built on the first nearest-dirt query, see get_nearest_dirt
+        self._spatial_index: Optional[DirtSpatialIndex] = None
         self.agent: Optional[VacuumAgent] = None
         
         self._place_agent()
         self._place_dirt(num_dirt)
         
         self.current_path: List[GridPos] = []
-        self.expanded_nodes: Set[GridPos] = set()
+        # Expanded positions as marked, turned into a set only when asked (expanded_nodes)
+        self._expanded_positions: List[GridPos] = []
+        self._expanded_set: Optional[Set[GridPos]] = set()
         
         self.observers = []
+        # Changes since the last flush_changes, only recorded when there are observers
+        self.pending_changes = ChangeSet()
     
     def _place_agent(self):
         """Place the agent at a random free position."""
-        free_positions = self.maze.get_all_free_positions()
-        if free_positions:
-            pos = random.choice(free_positions)
+        index = self.maze.choose_free_cell()
+        if index != -1:
+            pos = self.maze.position_of(index)
             self.agent = VacuumAgent(pos.x, pos.y)
     
     def _place_dirt(self, num_dirt: int):
         """Place dirt particles at random free positions."""
-        free_positions = self.maze.get_all_free_positions()
+        agent_index = self.maze.index_of(self.agent) if self.agent else -1
         
-        if self.agent:
-            agent_pos = GridPos(self.agent.x, self.agent.y)
-            free_positions = [pos for pos in free_positions if pos != agent_pos]
+        for index in self.maze.sample_free_cells(num_dirt, agent_index):
+            pos = self.maze.position_of(index)
+            self.add_dirt(pos)
+    
+    def add_dirt(self, pos: GridPos) -> Optional[Dirt]:
+        """Put a dirt particle on a position.
         
-        num_to_place = min(num_dirt, len(free_positions))
-        chosen_positions = random.sample(free_positions, num_to_place)
+        Returns:
+            The new dirt, or None if there already is dirt on that position
+        """
+        if pos in self._dirt_index:
+            return None
         
-        for pos in chosen_positions:
-            self.dirt_particles.add(Dirt(pos.x, pos.y))
+        dirt = Dirt(pos.x, pos.y)
+        self.dirt_particles.add(dirt)
+        self._dirt_index[dirt] = dirt
+        self._uncleaned_dirt.add(dirt)
+        # Adding to the set may reorder it, the spatial index is rebuilt on the next query
+        self._spatial_index = None
+        return dirt
     
     def get_dirt_at_position(self, pos: GridPos) -> Optional[Dirt]:
-        """Get dirt at a specific position."""
-        for dirt in self.dirt_particles:
-            if dirt == pos and not dirt.is_cleaned():
-                return dirt
-        return None
+        """Get the uncleaned dirt at a specific position, in constant time."""
+        dirt = self._dirt_index.get(pos)
+        if dirt is None or dirt.is_cleaned():
+            return None
+        return dirt
     
     def get_all_uncleaned_dirt(self) -> List[Dirt]:
-        """Get all uncleaned dirt particles."""
-        return [dirt for dirt in self.dirt_particles if not dirt.is_cleaned()]
+        """Get all uncleaned dirt particles, in the iteration order of dirt_particles."""
+        return list(self._uncleaned_dirt)
+    
+    def iter_uncleaned_dirt(self) -> Iterator[Dirt]:
+        """Iterate over the uncleaned dirt particles without building a list.
+        
+        The dirt must not be sucked while iterating.
+        """
+        return iter(self._uncleaned_dirt)
+    
+    def iter_nearest_dirt(self, pos: GridPos,
+                          metric: Metric = Metric.EUCLIDEAN) -> Iterator[Dirt]:
+        """Iterate over the uncleaned dirt by increasing distance to a position.
+        
+        Dirt at the same distance comes in the iteration order of dirt_particles. The
+        dirt must not be sucked while iterating.
+        """
+        return self._get_spatial_index().iter_nearest(pos, metric)
+    
+    def get_nearest_dirt(self, pos: GridPos, k: int = 1,
+                         metric: Metric = Metric.EUCLIDEAN) -> List[Dirt]:
+        """Get the k uncleaned dirt particles closest to a position, closest first."""
+        return self._get_spatial_index().k_nearest(pos, k, metric)
+    
+    def _get_spatial_index(self) -> DirtSpatialIndex:
+        if self._spatial_index is None:
+            # Inserted in set order, so that ties are broken like a scan of the set
+            self._spatial_index = DirtSpatialIndex(self.width, self.height)
+            for dirt in self._uncleaned_dirt:
+                self._spatial_index.insert(dirt)
+        return self._spatial_index
+    
+    def num_uncleaned_dirt(self) -> int:
+        """Get the number of uncleaned dirt particles, in constant time."""
+        return len(self._uncleaned_dirt)
     
     def is_terminated(self) -> bool:
         """Check if the world is in a terminal state (all dirt cleaned)."""
-        return len(self.get_all_uncleaned_dirt()) == 0
+        return not self._uncleaned_dirt
     
     def move_agent(self, action: Action) -> bool:
         """Move the agent according to the specified action.
@@ -116,7 +198,7 @@ class World:
         
         if new_pos and self.maze.is_valid_position(new_pos):
             self.agent.move_to(new_pos)
-            self.notify_observers()
+            self._record_change(ChangeType.AGENT_MOVED, (current_pos, new_pos))
             return True
         
         return False
@@ -135,28 +217,113 @@ class World:
         
         if dirt:
             dirt.clean()
+            self._uncleaned_dirt.discard(dirt)
+            if self._spatial_index is not None:
+                self._spatial_index.remove(dirt)
             self.agent.collect_dirt()
-            self.notify_observers()
+            emit("World", f"dirt cleaned at {agent_pos}", Level.DEBUG,
+                 position=(agent_pos.x, agent_pos.y))
+            self._record_change(ChangeType.DIRT_CLEANED, (agent_pos,))
             return True
         
         return False
     
+    def set_wall(self, pos: GridPos, wall: bool) -> bool:
+        """Add or remove a wall while the world is running.
+        
+        Walls cannot be put on the agent or on uncleaned dirt.
+        
+        Returns:
+            True if the maze changed, False otherwise
+        """
+        if wall and ((self.agent and self.agent.at_position(pos))
+                     or self.get_dirt_at_position(pos)):
+            return False
+        
+        changed = self.maze.set_wall(pos, wall)
+        if changed:
+            emit("World", f"{'added' if wall else 'removed'} wall at {pos}", Level.DEBUG,
+                 position=(pos.x, pos.y), wall=wall)
+            self._record_change(ChangeType.WALL_CHANGED, (pos,))
+        return changed
+    
+    def add_wall(self, pos: GridPos) -> bool:
+        return self.set_wall(pos, True)
+    
+    def remove_wall(self, pos: GridPos) -> bool:
+        return self.set_wall(pos, False)
+    
+    def toggle_random_wall(self) -> Optional[GridPos]:
+        """Add or remove the wall of a random inner cell, for dynamic worlds.
+        
+        Returns:
+            The position that changed, or None if nothing changed
+        """
+        pos = GridPos(random.randint(1, self.width - 2), random.randint(1, self.height - 2))
+        if self.set_wall(pos, not self.maze.is_wall(pos)):
+            return pos
+        return None
+    
     def mark_current_path(self, path: List[GridPos]):
-        """Mark the current path for visualization."""
-        self.current_path = path.copy()
-        self.notify_observers()
+        """Mark the current path for visualization.
+        
+        The world keeps the list itself, it must not be modified afterwards.
+        """
+        if self.observers:
+            # Cells on both paths look the same before and after
+            changed = set(self.current_path).symmetric_difference(path)
+            self._record_change(ChangeType.PATH_REPLACED, changed)
+        self.current_path = path
     
     def mark_expanded_nodes(self, nodes: List[GridPos]):
-        """Mark the expanded nodes for visualization."""
-        self.expanded_nodes = set(nodes)
-        self.notify_observers()
+        """Mark the expanded nodes for visualization.
+        
+        The world keeps the list itself, it must not be modified afterwards.
+        """
+        if self.observers:
+            new_set = set(nodes)
+            changed = self.expanded_nodes.symmetric_difference(new_set)
+            self._expanded_set = new_set
+            self._record_change(ChangeType.EXPANDED_REPLACED, changed)
+        else:
+            self._expanded_set = None
+        self._expanded_positions = nodes
+    
+    @property
+    def expanded_nodes(self) -> Set[GridPos]:
+        """The expanded positions last marked, as a set."""
+        if self._expanded_set is None:
+            self._expanded_set = set(self._expanded_positions)
+        return self._expanded_set
     
     def add_observer(self, observer):
         """Add an observer for world changes."""
         self.observers.append(observer)
     
+    def _record_change(self, change_type: ChangeType, cells):
+        if self.observers:
+            self.pending_changes.add(change_type, cells)
+    
+    def flush_changes(self):
+        """Notify the observers once of all the changes since the last flush.
+        
+        Call this once per simulation tick. Observers with an ``on_world_changes(changes)``
+        method receive the ChangeSet, with the typed changes and the changed cells, the
+        others get a plain ``update()`` call.
+        """
+        changes = self.pending_changes
+        if not changes:
+            return
+        self.pending_changes = ChangeSet()
+        
+        for observer in self.observers:
+            if hasattr(observer, 'on_world_changes'):
+                observer.on_world_changes(changes)
+            elif hasattr(observer, 'update'):
+                observer.update()
+    
     def notify_observers(self):
-        """Notify all observers of world changes."""
+        """Notify all observers of world changes right away, without the changed cells."""
         for observer in self.observers:
             if hasattr(observer, 'update'):
                 observer.update()
@@ -166,6 +333,6 @@ class World:
         return {
             'agent_position': (self.agent.x, self.agent.y) if self.agent else None,
             'dirt_collected': self.agent.get_dirt_collected() if self.agent else 0,
-            'remaining_dirt': len(self.get_all_uncleaned_dirt()),
+            'remaining_dirt': self.num_uncleaned_dirt(),
             'is_terminated': self.is_terminated()
         }
\ No newline at end of file